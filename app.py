@@ -1,12 +1,19 @@
 import streamlit as st
-import requests
 import json
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
-from PIL import Image
 import time
 import traceback
+from config import Config
+from services.api_client import get_api_client
+from services.health_monitor import get_health_monitor
+from services.prediction_cache import get_prediction_cache, prediction_key, report_digest
+from services.report_store import forget_report_id, get_report_id, prepare_report_upload, start_report_upload
+from services.image_pipeline import get_image_normalizer, is_image_report
+from services.text_extraction import get_text_extractor, is_text_report
+from services.biomarkers import biomarker_fields, report_biomarkers
+from services.static_assets import inject_stylesheet
+from services.feature_encoder import encode_form_data, encode_record, pss_answered, pss_scores
+from services.session_store import open_session_file, release_upload, session_file_exists, store_session_file
+from services.metrics import metrics
 
 # MUST be the first Streamlit command
 st.set_page_config(
@@ -17,310 +24,43 @@ st.set_page_config(
 )
 
 # Backend configuration
-BACKEND_URL = "http://localhost:5000"
+BACKEND_URL = Config.BACKEND_BASE_URL
+
+# Each tab renders in its own fragment, so a widget only reruns its own tab.
+# Tabs that render from shared session state are rerun explicitly when it changes.
+HEALTH_TAB, REPORT_TAB, ANALYSIS_TAB, DASHBOARD_TAB = "health_assessment", "medical_report", "ai_analysis", "dashboard"
+STATE_DEPENDENT_TABS = {
+    "questionnaire_data": [HEALTH_TAB, ANALYSIS_TAB, DASHBOARD_TAB],
+    "medical_file": [REPORT_TAB, ANALYSIS_TAB],
+    "prediction_results": [ANALYSIS_TAB, DASHBOARD_TAB]
+}
 
 def inject_professional_css():
-    """Inject complete professional medical-grade CSS styling"""
-    st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    /* Hide default Streamlit elements */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    .stDeployButton {display:none;}
-    
-    /* Professional medical background */
-    .stApp {
-        background: linear-gradient(135deg, #f8fafc 0%, #e2e8f0 100%);
-        font-family: 'Inter', sans-serif;
-    }
-    
-    .main .block-container {
-        padding-top: 1rem;
-        padding-left: 2rem;
-        padding-right: 2rem;
-        max-width: 1400px;
-    }
-    
-    /* Professional header */
-    .medical-header {
-        background: linear-gradient(135deg, #1e40af 0%, #3b82f6 100%);
-        color: white;
-        padding: 2.5rem;
-        border-radius: 16px;
-        margin-bottom: 2rem;
-        text-align: center;
-        box-shadow: 0 10px 25px rgba(30, 64, 175, 0.15);
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
-    
-    .medical-title {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-        letter-spacing: -0.02em;
-    }
-    
-    .medical-subtitle {
-        font-size: 1.1rem;
-        opacity: 0.9;
-        font-weight: 400;
-    }
-    
-    /* Connection status */
-    .status-connected {
-        background: #dcfce7;
-        color: #166534;
-        border: 1px solid #bbf7d0;
-        padding: 0.75rem 1.5rem;
-        border-radius: 12px;
-        display: inline-flex;
-        align-items: center;
-        gap: 0.5rem;
-        font-weight: 600;
-        margin-bottom: 1.5rem;
-        font-size: 0.95rem;
-    }
-    
-    .status-disconnected {
-        background: #fef2f2;
-        color: #dc2626;
-        border: 1px solid #fecaca;
-        padding: 0.75rem 1.5rem;
-        border-radius: 12px;
-        display: inline-flex;
-        align-items: center;
-        gap: 0.5rem;
-        font-weight: 600;
-        margin-bottom: 1.5rem;
-        font-size: 0.95rem;
-    }
-    
-    /* Professional cards */
-    .medical-card {
-        background: white;
-        border: 1px solid #e2e8f0;
-        border-radius: 16px;
-        padding: 2rem;
-        margin: 1rem 0;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-        transition: all 0.2s ease;
-    }
-    
-    .medical-card:hover {
-        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        border-color: #cbd5e1;
-    }
-    
-    .card-title {
-        color: #1e293b;
-        font-size: 1.25rem;
-        font-weight: 600;
-        margin-bottom: 0.75rem;
-        display: flex;
-        align-items: center;
-        gap: 0.5rem;
-    }
-    
-    .card-text {
-        color: #64748b;
-        line-height: 1.6;
-        font-size: 0.95rem;
-    }
-    
-    /* Question styling */
-    .question-container {
-        background: #f8fafc;
-        border: 1px solid #e2e8f0;
-        border-radius: 12px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        border-left: 4px solid #3b82f6;
-    }
-    
-    .question-number {
-        background: #3b82f6;
-        color: white;
-        width: 28px;
-        height: 28px;
-        border-radius: 50%;
-        display: inline-flex;
-        align-items: center;
-        justify-content: center;
-        font-weight: 600;
-        font-size: 0.85rem;
-        margin-bottom: 0.75rem;
-    }
-    
-    .question-text {
-        color: #1e293b;
-        font-weight: 500;
-        line-height: 1.5;
-        margin-bottom: 1rem;
-    }
-    
-    /* Metric cards */
-    .metric-card {
-        background: white;
-        border: 1px solid #e2e8f0;
-        border-radius: 16px;
-        padding: 1.5rem;
-        text-align: center;
-        transition: all 0.2s ease;
-        box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(0, 0, 0, 0.1);
-    }
-    
-    .metric-value {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-        color: #1e293b;
-    }
-    
-    .metric-label {
-        color: #64748b;
-        font-size: 0.95rem;
-        font-weight: 500;
-    }
-    
-    /* Result cards with medical colors */
-    .result-excellent {
-        border-left: 4px solid #059669;
-        background: linear-gradient(90deg, #ecfdf5 0%, white 100%);
-    }
-    
-    .result-good {
-        border-left: 4px solid #0284c7;
-        background: linear-gradient(90deg, #f0f9ff 0%, white 100%);
-    }
-    
-    .result-warning {
-        border-left: 4px solid #d97706;
-        background: linear-gradient(90deg, #fffbeb 0%, white 100%);
-    }
-    
-    .result-danger {
-        border-left: 4px solid #dc2626;
-        background: linear-gradient(90deg, #fef2f2 0%, white 100%);
-    }
-    
-    /* Professional progress bar */
-    .progress-container {
-        background: #f1f5f9;
-        border-radius: 12px;
-        padding: 4px;
-        margin: 1.5rem 0;
-        border: 1px solid #e2e8f0;
-    }
-    
-    .progress-bar {
-        background: linear-gradient(90deg, #3b82f6, #1e40af);
-        border-radius: 8px;
-        height: 12px;
-        transition: width 0.6s ease;
-        position: relative;
-    }
-    
-    .progress-text {
-        color: #475569;
-        font-weight: 600;
-        text-align: center;
-        margin-top: 0.5rem;
-        font-size: 0.9rem;
-    }
-    
-    /* Professional buttons */
-    .stButton > button {
-        background: linear-gradient(135deg, #3b82f6, #1e40af);
-        color: white;
-        border: none;
-        border-radius: 12px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        font-size: 0.95rem;
-        transition: all 0.2s ease;
-        box-shadow: 0 2px 8px rgba(59, 130, 246, 0.2);
-        border: 1px solid rgba(59, 130, 246, 0.2);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-1px);
-        box-shadow: 0 4px 12px rgba(59, 130, 246, 0.3);
-        background: linear-gradient(135deg, #2563eb, #1d4ed8);
-    }
-    
-    /* Section headers */
-    .section-header {
-        color: #1e293b;
-        font-size: 1.5rem;
-        font-weight: 600;
-        margin: 2rem 0 1rem 0;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid #e2e8f0;
-    }
-    
-    /* Mobile responsiveness */
-    @media (max-width: 768px) {
-        .medical-title { font-size: 2rem; }
-        .medical-subtitle { font-size: 1rem; }
-        .metric-value { font-size: 2rem; }
-        .medical-card { padding: 1.5rem; }
-        .main .block-container { padding: 1rem; }
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    """Link the professional medical-grade stylesheet (served once as a static asset)"""
+    inject_stylesheet(Config.STYLESHEETS["main"])
 
 def check_backend_connection():
-    """Check if backend is running with proper error handling"""
+    """Get the last known backend health without blocking the rerun"""
     try:
-        response = requests.get(f"{BACKEND_URL}/health", timeout=5)
-        return response.status_code == 200
-    except requests.exceptions.RequestException as e:
-        st.error(f"Backend connection error: {str(e)}")
-        return False
+        return get_health_monitor(BACKEND_URL).get_status()
     except Exception as e:
         st.error(f"Unexpected error checking backend: {str(e)}")
-        return False
+        return None
 
-def make_prediction(form_data, uploaded_file=None):
-    """Make prediction request to backend with improved error handling"""
-    try:
-        files = {}
-        if uploaded_file:
-            uploaded_file.seek(0)
-            files['medical_report'] = (uploaded_file.name, uploaded_file, uploaded_file.type)
-        
-        response = requests.post(
-            f"{BACKEND_URL}/predict", 
-            data=form_data, 
-            files=files, 
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return {
-                "success": False, 
-                "error": f"Server returned status {response.status_code}: {response.text}"
-            }
-            
-    except requests.exceptions.Timeout:
-        return {"success": False, "error": "Request timed out. Please try again."}
-    except requests.exceptions.ConnectionError:
-        return {"success": False, "error": "Cannot connect to backend server. Please ensure it's running."}
-    except Exception as e:
-        return {"success": False, "error": f"Unexpected error: {str(e)}"}
+def submit_prediction_job(form_data, uploaded_file=None, report_id=None):
+    """Queue a prediction job through the shared pooled API client"""
+    return get_api_client(BACKEND_URL).submit_prediction_job(form_data, uploaded_file, report_id)
+
+def prediction_cache_key(form_data, uploaded_file=None):
+    """Content address of a prediction: questionnaire, report digest and model version"""
+    status = check_backend_connection()
+    model_version = status.payload.get("model_version") if status is not None else None
+    return prediction_key(form_data, report_digest(uploaded_file), model_version)
 
 def create_professional_gauge(value, title, max_value=100, color_scheme="blue"):
     """Create professional gauge chart with improved error handling"""
+    import plotly.graph_objects as go  # loaded on first chart, not at startup
+
     try:
         if color_scheme == "blue":
             colors = ["#dbeafe", "#3b82f6", "#1e40af"]
@@ -373,6 +113,8 @@ def create_professional_gauge(value, title, max_value=100, color_scheme="blue"):
 
 def create_professional_stage_chart(current_stage):
     """Create professional stage chart with improved error handling"""
+    import plotly.graph_objects as go
+
     try:
         stages = ['Stage 0', 'Stage 1', 'Stage 2', 'Stage 3', 'Stage 4', 'Stage 5']
         current_stage = max(0, min(current_stage, 5))  # Ensure stage is within bounds
@@ -438,6 +180,8 @@ def create_professional_stage_chart(current_stage):
 
 def create_professional_model_chart(model1_conf, model2_conf):
     """Create professional model comparison chart with error handling"""
+    import plotly.graph_objects as go
+
     try:
         models = ['Biochemical Analysis', 'Lifestyle Analysis']
         confidences = [
@@ -500,20 +244,41 @@ def display_professional_header():
 
 def display_connection_status():
     """Display professional connection status"""
-    if check_backend_connection():
-        st.markdown("""
+    status = check_backend_connection()
+    
+    freshness = ""
+    if status is not None and status.stale:
+        freshness = f" <small>(last checked {status.age:.0f}s ago, refreshing)</small>"
+    
+    if status is not None and status.healthy:
+        st.markdown(f"""
         <div class="status-connected">
-            ✅ AI Backend System Connected
+            ✅ AI Backend System Connected{freshness}
         </div>
         """, unsafe_allow_html=True)
         return True
-    else:
+    elif status is not None and not status.known:
         st.markdown("""
         <div class="status-disconnected">
-            ❌ AI Backend System Disconnected
+            ⏳ Checking AI Backend System...
         </div>
         """, unsafe_allow_html=True)
-        st.error("🚨 Cannot connect to AI backend server. Please ensure the backend is running on http://localhost:5000")
+        st.info("🔄 Still waiting for the AI backend to respond. This page will update on your next interaction.")
+        return False
+    else:
+        st.markdown(f"""
+        <div class="status-disconnected">
+            ❌ AI Backend System Disconnected{freshness}
+        </div>
+        """, unsafe_allow_html=True)
+        circuit = get_api_client(BACKEND_URL).breaker.snapshot()
+        if circuit.open:
+            retry = f"next probe in {circuit.retry_in:.0f}s" if circuit.retry_in else "probing now"
+            st.warning(f"⚡ Backend calls are paused after {circuit.failures} failed attempts "
+                       f"(last: {circuit.last_error}); {retry}. Requests fail fast until it recovers.")
+        elif status is not None and status.error:
+            st.error(f"Backend connection error: {status.error}")
+        st.error(f"🚨 Cannot connect to AI backend server. Please ensure the backend is running on {BACKEND_URL}")
         return False
 
 def initialize_session_state():
@@ -522,22 +287,79 @@ def initialize_session_state():
         st.session_state.questionnaire_data = {}
     if 'medical_file' not in st.session_state:
         st.session_state.medical_file = None
+    if 'medical_upload_version' not in st.session_state:
+        st.session_state.medical_upload_version = 0
     if 'prediction_results' not in st.session_state:
         st.session_state.prediction_results = None
+    if 'prediction_job' not in st.session_state:
+        st.session_state.prediction_job = None
+    if 'prediction_error' not in st.session_state:
+        st.session_state.prediction_error = None
+    if 'prediction_cached' not in st.session_state:
+        st.session_state.prediction_cached = False
+
+def invalidate_tabs(*state_names):
+    """Rerun every tab that renders from the changed session state (widget callbacks only)"""
+    tabs = []
+    for name in state_names:
+        tabs.extend(tab for tab in STATE_DEPENDENT_TABS[name] if tab not in tabs)
+    st.rerun(scope=tabs)
+
+def questionnaire_answer(field, response):
+    """Raw questionnaire value for a widget response; scoring happens in the feature encoder"""
+    if field.startswith("pss_"):
+        return Config.PSS_VALUES[Config.PSS_SCALE.index(response)]
+    return response
+
+def on_questionnaire_change(field):
+    """Record a changed answer before the dependent tabs rerun"""
+    st.session_state.questionnaire_data[field] = questionnaire_answer(field, st.session_state[field])
+    invalidate_tabs("questionnaire_data")
+
+def medical_upload_key():
+    """Key of the report uploader; a new key resets the widget"""
+    return f"medical_report_upload_{st.session_state.medical_upload_version}"
+
+def on_medical_file_change():
+    """Move the selected report into the session blob store before the dependent tabs rerun"""
+    upload_key = medical_upload_key()
+    upload = st.session_state[upload_key]
+    # Session state only keeps a reference; the bytes live in the session blob store
+    st.session_state.medical_file = store_session_file("medical_file", upload)
+    if upload is not None:
+        # ...and only there: Streamlit's copy is dropped and the uploader starts over empty
+        release_upload(upload)
+        del st.session_state[upload_key]
+        st.session_state.medical_upload_version += 1
+    invalidate_tabs("medical_file")
+
+def on_medical_file_remove():
+    """Forget the saved report before the dependent tabs rerun"""
+    st.session_state.medical_file = store_session_file("medical_file", None)
+    invalidate_tabs("medical_file")
+
+def medical_file_available():
+    """Whether the saved report still exists; one the idle sweep deleted is forgotten with a warning"""
+    if st.session_state.medical_file is not None and not session_file_exists(st.session_state.medical_file):
+        st.session_state.medical_file = None
+        st.warning("⚠️ Your saved medical report expired after a period of inactivity. Please upload it again.")
+    return st.session_state.medical_file is not None
 
 def get_pss_score():
     """Calculate PSS score with error handling"""
     try:
-        return sum(st.session_state.questionnaire_data.get(f"pss_{i}", 0) for i in range(1, 11))
+        return int(pss_scores(encode_record(st.session_state.questionnaire_data))[0])
     except Exception as e:
         st.error(f"Error calculating PSS score: {str(e)}")
         return 0
 
+@st.fragment(key=HEALTH_TAB)
+@metrics.timed("render_seconds", function="render_health_assessment_tab")
 def render_health_assessment_tab():
     """Render the health assessment tab"""
     try:
         # Progress tracking
-        completed_questions = len([k for k in st.session_state.questionnaire_data.keys() if k.startswith('pss_')])
+        completed_questions = int(pss_answered(encode_record(st.session_state.questionnaire_data))[0])
         progress_percentage = (completed_questions / 10) * 100
         
         st.markdown(f"""
@@ -572,8 +394,6 @@ def render_health_assessment_tab():
             "In the last month, how often have you felt difficulties were piling up so high that you could not overcome them?"
         ]
         
-        pss_options = ["Never", "Almost Never", "Sometimes", "Fairly Often", "Very Often"]
-        
         for i, question in enumerate(pss_questions, 1):
             st.markdown(f"""
             <div class="question-container">
@@ -584,16 +404,13 @@ def render_health_assessment_tab():
             
             response = st.select_slider(
                 f"Question {i} Response",
-                options=pss_options,
+                options=Config.PSS_SCALE,
                 key=f"pss_{i}",
-                label_visibility="collapsed"
+                label_visibility="collapsed",
+                on_change=on_questionnaire_change,
+                args=(f"pss_{i}",)
             )
-            
-            # Apply reverse scoring for questions 4, 5, 7, 8
-            if i in [4, 5, 7, 8]:
-                st.session_state.questionnaire_data[f"pss_{i}"] = 4 - pss_options.index(response)
-            else:
-                st.session_state.questionnaire_data[f"pss_{i}"] = pss_options.index(response)
+            st.session_state.questionnaire_data[f"pss_{i}"] = questionnaire_answer(f"pss_{i}", response)
         
         # Lifestyle Assessment
         st.markdown("""
@@ -610,33 +427,40 @@ def render_health_assessment_tab():
         
         with col1:
             st.markdown('<p class="section-header">🧬 Genetic & Family History</p>', unsafe_allow_html=True)
-            genetics = st.radio("Family History of Hair Loss:", ["No", "Yes"], key="genetics")
-            st.session_state.questionnaire_data["genetics"] = 1 if genetics == "Yes" else 0
+            genetics = st.radio("Family History of Hair Loss:", ["No", "Yes"], key="genetics",
+                                on_change=on_questionnaire_change, args=("genetics",))
+            st.session_state.questionnaire_data["genetics"] = genetics
             
             st.markdown('<p class="section-header">🚬 Lifestyle Factors</p>', unsafe_allow_html=True)
-            smoking = st.radio("Tobacco Use:", ["No", "Yes"], key="smoking")
-            st.session_state.questionnaire_data["smoking"] = 1 if smoking == "Yes" else 0
+            smoking = st.radio("Tobacco Use:", ["No", "Yes"], key="smoking",
+                               on_change=on_questionnaire_change, args=("smoking",))
+            st.session_state.questionnaire_data["smoking"] = smoking
             
             st.markdown('<p class="section-header">💇‍♀️ Hair Care Practices</p>', unsafe_allow_html=True)
-            hair_care = st.radio("Difficulty Maintaining Hair Health:", ["No", "Yes"], key="hair_care")
-            st.session_state.questionnaire_data["hair_care"] = 1 if hair_care == "Yes" else 0
+            hair_care = st.radio("Difficulty Maintaining Hair Health:", ["No", "Yes"], key="hair_care",
+                                 on_change=on_questionnaire_change, args=("hair_care",))
+            st.session_state.questionnaire_data["hair_care"] = hair_care
         
         with col2:
             st.markdown('<p class="section-header">🌍 Environmental Exposure</p>', unsafe_allow_html=True)
-            environment = st.radio("Environmental Stressors (Pollution, Extreme Weather):", ["No", "Yes"], key="environment")
-            st.session_state.questionnaire_data["environment"] = 1 if environment == "Yes" else 0
+            environment = st.radio("Environmental Stressors (Pollution, Extreme Weather):", ["No", "Yes"], key="environment",
+                                   on_change=on_questionnaire_change, args=("environment",))
+            st.session_state.questionnaire_data["environment"] = environment
             
             st.markdown('<p class="section-header">⚖️ Hormonal Status</p>', unsafe_allow_html=True)
-            hormonal = st.radio("Hormonal Changes (Pregnancy, Menopause, Thyroid):", ["No", "Yes"], key="hormonal_changes")
-            st.session_state.questionnaire_data["hormonal_changes"] = 1 if hormonal == "Yes" else 0
+            hormonal = st.radio("Hormonal Changes (Pregnancy, Menopause, Thyroid):", ["No", "Yes"], key="hormonal_changes",
+                                on_change=on_questionnaire_change, args=("hormonal_changes",))
+            st.session_state.questionnaire_data["hormonal_changes"] = hormonal
             
             st.markdown('<p class="section-header">📉 Recent Health Changes</p>', unsafe_allow_html=True)
-            weight_loss = st.radio("Significant Weight Loss Recently:", ["No", "Yes"], key="weight_loss")
-            st.session_state.questionnaire_data["weight_loss"] = 1 if weight_loss == "Yes" else 0
+            weight_loss = st.radio("Significant Weight Loss Recently:", ["No", "Yes"], key="weight_loss",
+                                   on_change=on_questionnaire_change, args=("weight_loss",))
+            st.session_state.questionnaire_data["weight_loss"] = weight_loss
         
         # Age input
         st.markdown('<p class="section-header">🎂 Demographics</p>', unsafe_allow_html=True)
-        age = st.number_input("Age (years)", min_value=1, max_value=100, value=30, key="age")
+        age = st.number_input("Age (years)", min_value=1, max_value=100, value=30, key="age",
+                              on_change=on_questionnaire_change, args=("age",))
         st.session_state.questionnaire_data["age"] = age
         
         # Assessment Results
@@ -685,6 +509,8 @@ def render_health_assessment_tab():
         st.error(f"Error in health assessment: {str(e)}")
         st.error(f"Traceback: {traceback.format_exc()}")
 
+@st.fragment(key=REPORT_TAB)
+@metrics.timed("render_seconds", function="render_medical_report_tab")
 def render_medical_report_tab():
     """Render the medical report tab"""
     try:
@@ -702,14 +528,21 @@ def render_medical_report_tab():
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            uploaded_file = st.file_uploader(
+            st.file_uploader(
                 "Select Medical Report",
                 type=["pdf", "txt", "png", "jpg", "jpeg"],
-                help="Supported formats: PDF, TXT, PNG, JPG, JPEG (Maximum: 16MB)"
+                help="Supported formats: PDF, TXT, PNG, JPG, JPEG (Maximum: 16MB)",
+                key=medical_upload_key(),
+                on_change=on_medical_file_change
             )
             
+            # The saved report is read back from the session blob store
+            uploaded_file = open_session_file(st.session_state.medical_file) if medical_file_available() else None
             if uploaded_file:
-                st.session_state.medical_file = uploaded_file
+                # Upload once now; later predictions only reference the report id
+                start_report_upload(uploaded_file, BACKEND_URL)
+                display_image_optimization(uploaded_file)
+                display_text_extraction(uploaded_file)
                 st.success(f"✅ Medical report uploaded successfully: {uploaded_file.name}")
                 
                 # File information display
@@ -739,6 +572,8 @@ def render_medical_report_tab():
                         <div class="card-text">{file_type}</div>
                     </div>
                     """, unsafe_allow_html=True)
+                
+                st.button("🗑️ Remove Report", on_click=on_medical_file_remove)
         
         with col2:
             st.markdown("""
@@ -760,12 +595,59 @@ def render_medical_report_tab():
     except Exception as e:
         st.error(f"Error in medical report tab: {str(e)}")
 
+def display_image_optimization(uploaded_file):
+    """Show what OCR pre-processing saved for an image report (non-blocking)"""
+    if not is_image_report(uploaded_file):
+        return
+    
+    normalized = get_image_normalizer().get(uploaded_file, timeout=0)
+    if normalized is None:
+        st.caption("⏳ Optimizing image for OCR...")
+        return
+    
+    saved_pct = normalized.bytes_saved / normalized.original_bytes if normalized.original_bytes else 0
+    st.caption(
+        f"🖼️ Optimized for OCR in {normalized.elapsed:.2f}s: "
+        f"{normalized.original_bytes / 1024:.0f} KB → {len(normalized.data) / 1024:.0f} KB ({saved_pct:.0%} smaller), "
+        f"{normalized.original_size[0]}×{normalized.original_size[1]} → {normalized.size[0]}×{normalized.size[1]} px "
+        f"({normalized.pixels_saved_ratio:.0%} fewer pixels to OCR)"
+    )
+
+def display_text_extraction(uploaded_file):
+    """Show whether a PDF/TXT report will be sent as extracted text (non-blocking)"""
+    if not is_text_report(uploaded_file):
+        return
+    
+    extracted = get_text_extractor().get(uploaded_file, timeout=0)
+    if extracted is None:
+        st.caption("⏳ Extracting report text...")
+    elif extracted.error:
+        st.caption(f"📄 {extracted.error}; the original file will be sent.")
+    elif extracted.scanned:
+        st.caption("📷 Scanned pages detected; the original file will be sent for OCR.")
+    elif extracted.usable:
+        if len(extracted.data) < extracted.original_bytes:
+            st.caption(
+                f"📝 Text extracted from {extracted.pages} page(s) in {extracted.elapsed:.2f}s: "
+                f"{extracted.original_bytes / 1024:.0f} KB → {len(extracted.data) / 1024:.1f} KB "
+                f"({extracted.reduction:.0f}× smaller upload)"
+            )
+        # The same values the analysis sends, so the UI never shows a different set
+        markers = [value for value in report_biomarkers(uploaded_file, timeout=0).values()
+                   if value.confidence >= Config.BIOMARKER_MIN_CONFIDENCE]
+        if markers:
+            st.caption("🧪 Recognized biomarkers: " + ", ".join(
+                f"{value.label} {value.qualifier or ''}{value.value:g} {value.unit or ''}".rstrip() for value in markers
+            ))
+
+@st.fragment(key=ANALYSIS_TAB)
+@metrics.timed("render_seconds", function="render_ai_analysis_tab")
 def render_ai_analysis_tab():
     """Render the AI analysis tab"""
     try:
         # Data readiness assessment
         has_questionnaire = len(st.session_state.questionnaire_data) > 0
-        has_medical = st.session_state.medical_file is not None
+        has_medical = medical_file_available()
         
         st.markdown("""
         <div class="medical-card">
@@ -782,7 +664,7 @@ def render_ai_analysis_tab():
         
         with status_col1:
             if has_questionnaire:
-                pss_completed = sum(1 for i in range(1, 11) if f"pss_{i}" in st.session_state.questionnaire_data)
+                pss_completed = int(pss_answered(encode_record(st.session_state.questionnaire_data))[0])
                 st.markdown(f"""
                 <div class="medical-card result-excellent">
                     <div class="card-title">✅ Clinical Assessment Complete</div>
@@ -826,138 +708,215 @@ def render_ai_analysis_tab():
             return
         
         # AI Analysis execution
-        if st.button("🚀 Initiate AI Clinical Analysis", type="primary", use_container_width=True):
-            
-            # Professional progress animation
-            progress_container = st.empty()
-            status_container = st.empty()
-            
-            analysis_stages = [
-                (20, "🤖 Initializing neural network models..."),
-                (40, "🧠 Processing clinical assessment data..."),
-                (60, "📄 Extracting biomarkers from medical reports..."),
-                (80, "🔬 Executing dual-model predictions..."),
-                (95, "📊 Compiling comprehensive analysis..."),
-                (100, "✅ Clinical analysis complete!")
-            ]
-            
-            for progress, status in analysis_stages:
-                progress_container.markdown(f"""
-                <div class="progress-container">
-                    <div class="progress-bar" style="width: {progress}%;"></div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                status_container.markdown(f"""
-                <div class="medical-card">
-                    <div class="card-text" style="text-align: center; font-weight: 600; color: #3b82f6;">
-                        {status}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        st.button("🚀 Initiate AI Clinical Analysis", type="primary", width="stretch",
+                  disabled=st.session_state.prediction_job is not None, on_click=start_ai_analysis)
+        
+        if st.session_state.prediction_job:
+            render_prediction_job_progress()
+        elif st.session_state.prediction_error:
+            st.error(f"❌ AI Analysis Failed: {st.session_state.prediction_error}")
+        elif st.session_state.prediction_results:
+            render_analysis_results(st.session_state.prediction_results)
                 
-                time.sleep(0.6)
-            
-            # Execute prediction
-            form_data = st.session_state.questionnaire_data.copy()
-            result = make_prediction(form_data, st.session_state.medical_file)
-            
-            progress_container.empty()
-            status_container.empty()
+    except Exception as e:
+        st.error(f"Error in AI analysis tab: {str(e)}")
+        st.error(f"Traceback: {traceback.format_exc()}")
+
+def start_ai_analysis():
+    """Serve the analysis from the result cache or queue a backend job"""
+    form_data = encode_form_data(st.session_state.questionnaire_data)
+    medical_file = open_session_file(st.session_state.medical_file)
+    if st.session_state.medical_file is not None and medical_file is None:
+        # The idle sweep deleted the saved report: don't run the analysis without it unannounced
+        st.session_state.medical_file = None
+        st.session_state.prediction_error = ("Your saved medical report expired after a period of inactivity. "
+                                             "Upload it again, or start the analysis once more to run it without the report.")
+        invalidate_tabs("medical_file")
+    # Text reports also carry their biomarkers as structured fields, so the backend can skip its text pipeline
+    # Neither waits longer than TEXT_EXTRACTION_WAIT: a slow PDF is sent as it is, without biomarkers
+    form_data.update(biomarker_fields(report_biomarkers(medical_file, Config.TEXT_EXTRACTION_WAIT)))
+    cache_key = prediction_cache_key(form_data, medical_file)
+    cached_result = get_prediction_cache().get(cache_key)
+    
+    if cached_result is not None:
+        # Identical questionnaire, report and model: reuse the earlier result
+        st.session_state.prediction_results = cached_result
+        st.session_state.prediction_error = None
+        st.session_state.prediction_cached = True
+        invalidate_tabs("prediction_results")
+    else:
+        # Only the analysis tab reruns; the job progress fragment takes it from here
+        # Never wait on the background upload here: until it has an id, the report goes inline
+        report_id = get_report_id(medical_file, BACKEND_URL, timeout=0)
+        # The report goes along with its id; it is only streamed if the backend has evicted the stored copy
+        submission = submit_prediction_job(form_data, prepare_report_upload(medical_file, timeout=Config.TEXT_EXTRACTION_WAIT), report_id)
+        if submission.get("report_resent"):
+            forget_report_id(medical_file, BACKEND_URL)
+        
+        if submission.get("success") and submission.get("job_id"):
+            job = st.session_state.prediction_job
+            if not (job and job["job_id"] == submission["job_id"]):
+                # A coalesced submission joins a job another click or tab already started
+                st.session_state.prediction_job = {
+                    "job_id": submission["job_id"],
+                    "submitted_at": time.time(),
+                    "cache_key": cache_key,
+                    "coalesced": submission.get("coalesced", False)
+                }
+            st.session_state.prediction_error = None
+            st.session_state.prediction_cached = False
+        else:
+            st.session_state.prediction_error = submission.get('error', 'Unknown system error occurred')
+
+def render_analysis_progress(progress, stage):
+    """Render the analysis progress bar for a backend pipeline stage"""
+    progress = max(0, min(int(progress), 100))
+    status = Config.PREDICTION_STAGES.get(stage, "🔬 Processing clinical analysis...")
+    
+    st.markdown(f"""
+    <div class="progress-container">
+        <div class="progress-bar" style="width: {progress}%;"></div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown(f"""
+    <div class="medical-card">
+        <div class="card-text" style="text-align: center; font-weight: 600; color: #3b82f6;">
+            {status}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+@st.fragment(run_every=Config.JOB_POLL_INTERVAL)
+def render_prediction_job_progress():
+    """Poll the in-flight prediction job; only this fragment reruns while it works"""
+    job = st.session_state.get("prediction_job")
+    if not job:
+        return
+    
+    client = get_api_client(BACKEND_URL)
+    status = client.get_job_status(job["job_id"])
+    state = status.get("status")
+    
+    if state == "done":
+        result = client.get_job_result(job["job_id"])
+        st.session_state.prediction_job = None
+        if result.get("success"):
+            st.session_state.prediction_results = result
+            get_prediction_cache().put(job["cache_key"], result)
+        else:
+            st.session_state.prediction_error = result.get('error', 'Unknown system error occurred')
+        # Full-app rerun: the dashboard renders from the new results too
+        st.rerun()
+    elif state == "failed" or status.get("status_code") == 404:
+        # The backend reported a failure or no longer knows this job
+        st.session_state.prediction_job = None
+        st.session_state.prediction_error = status.get('error') or 'Analysis job was lost by the backend'
+        st.rerun()
+    elif state is None:
+        # Transient connection problem: keep the job and try again next tick
+        render_analysis_progress(0, "queued")
+        st.warning(f"⚠️ Waiting for the AI backend: {status.get('error', 'no response')}")
+    else:
+        render_analysis_progress(status.get("progress", 0), "queued" if state == "queued" else status.get("stage"))
+        st.caption(f"⏱️ Running for {time.time() - job['submitted_at']:.0f}s — you can keep working in other tabs.")
+        if job.get("coalesced"):
+            st.caption("🔗 Joined an identical analysis that was already running.")
+
+def render_analysis_results(result):
+    """Render the clinical results of a completed analysis"""
+    try:
+        predictions = result.get("predictions", {})
+        
+        st.success("🎉 AI Clinical Analysis Successfully Completed!")
+        if st.session_state.get("prediction_cached"):
+            cache_stats = get_prediction_cache().stats()
+            st.caption(f"⚡ Served from the result cache for identical inputs "
+                       f"({cache_stats['hits']} hits / {cache_stats['misses']} misses)")
+        
+        # Extract clinical results with safe defaults
+        stage = predictions.get("stage", 0)
+        condition = predictions.get("condition", "No")
+        confidence = predictions.get("confidence", 0.0)
+        
+        # Ensure values are within expected ranges
+        stage = max(0, min(stage, 5))
+        confidence = max(0.0, min(confidence, 1.0))
+        
+        # Clinical results display
+        result_col1, result_col2, result_col3 = st.columns(3)
+        
+        with result_col1:
+            if stage <= 1:
+                stage_class, stage_icon = "result-excellent", "🟢"
+                stage_severity = "Minimal"
+            elif stage <= 2:
+                stage_class, stage_icon = "result-good", "🔵"
+                stage_severity = "Mild"
+            elif stage <= 3:
+                stage_class, stage_icon = "result-warning", "🟡"
+                stage_severity = "Moderate"
+            else:
+                stage_class, stage_icon = "result-danger", "🔴"
+                stage_severity = "Significant"
             
-            if result.get("success"):
-                st.session_state.prediction_results = result
-                predictions = result.get("predictions", {})
-                
-                st.success("🎉 AI Clinical Analysis Successfully Completed!")
-                
-                # Extract clinical results with safe defaults
-                stage = predictions.get("stage", 0)
-                condition = predictions.get("condition", "No")
-                confidence = predictions.get("confidence", 0.0)
-                
-                # Ensure values are within expected ranges
-                stage = max(0, min(stage, 5))
-                confidence = max(0.0, min(confidence, 1.0))
-                
-                # Clinical results display
-                result_col1, result_col2, result_col3 = st.columns(3)
-                
-                with result_col1:
-                    if stage <= 1:
-                        stage_class, stage_icon = "result-excellent", "🟢"
-                        stage_severity = "Minimal"
-                    elif stage <= 2:
-                        stage_class, stage_icon = "result-good", "🔵"
-                        stage_severity = "Mild"
-                    elif stage <= 3:
-                        stage_class, stage_icon = "result-warning", "🟡"
-                        stage_severity = "Moderate"
-                    else:
-                        stage_class, stage_icon = "result-danger", "🔴"
-                        stage_severity = "Significant"
-                    
-                    st.markdown(f"""
-                    <div class="metric-card {stage_class}">
-                        <div class="metric-value">{stage_icon} {stage}</div>
-                        <div class="metric-label">Hair Loss Stage<br><small>{stage_severity} Severity</small></div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with result_col2:
-                    condition_class = "result-danger" if condition == "Yes" else "result-excellent"
-                    condition_icon = "⚠️" if condition == "Yes" else "✅"
-                    condition_status = "Positive" if condition == "Yes" else "Negative"
-                    
-                    st.markdown(f"""
-                    <div class="metric-card {condition_class}">
-                        <div class="metric-value">{condition_icon}</div>
-                        <div class="metric-label">Clinical Finding<br><small>{condition_status} for Hair Loss</small></div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with result_col3:
-                    if confidence >= 0.8:
-                        conf_class, conf_icon = "result-excellent", "🎯"
-                        conf_level = "High"
-                    elif confidence >= 0.6:
-                        conf_class, conf_icon = "result-warning", "⚖️"
-                        conf_level = "Moderate"
-                    else:
-                        conf_class, conf_icon = "result-danger", "⚠️"
-                        conf_level = "Low"
-                    
-                    st.markdown(f"""
-                    <div class="metric-card {conf_class}">
-                        <div class="metric-value">{conf_icon}</div>
-                        <div class="metric-label">Diagnostic Confidence<br><small>{confidence:.1%} ({conf_level})</small></div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Clinical interpretation
-                interpretation = predictions.get("interpretation", "")
-                if interpretation:
-                    st.markdown(f"""
-                    <div class="medical-card">
-                        <div class="card-title">🤖 AI Clinical Interpretation</div>
-                        <div class="card-text" style="font-size: 1rem; line-height: 1.7; font-weight: 500;">
-                            {interpretation}
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                # Clinical recommendations based on stage
-                render_clinical_recommendations(stage)
-                
-                # Technical analysis details
-                render_technical_analysis(predictions)
+            st.markdown(f"""
+            <div class="metric-card {stage_class}">
+                <div class="metric-value">{stage_icon} {stage}</div>
+                <div class="metric-label">Hair Loss Stage<br><small>{stage_severity} Severity</small></div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with result_col2:
+            condition_class = "result-danger" if condition == "Yes" else "result-excellent"
+            condition_icon = "⚠️" if condition == "Yes" else "✅"
+            condition_status = "Positive" if condition == "Yes" else "Negative"
             
+            st.markdown(f"""
+            <div class="metric-card {condition_class}">
+                <div class="metric-value">{condition_icon}</div>
+                <div class="metric-label">Clinical Finding<br><small>{condition_status} for Hair Loss</small></div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with result_col3:
+            if confidence >= 0.8:
+                conf_class, conf_icon = "result-excellent", "🎯"
+                conf_level = "High"
+            elif confidence >= 0.6:
+                conf_class, conf_icon = "result-warning", "⚖️"
+                conf_level = "Moderate"
             else:
-                st.error(f"❌ AI Analysis Failed: {result.get('error', 'Unknown system error occurred')}")
-                
+                conf_class, conf_icon = "result-danger", "⚠️"
+                conf_level = "Low"
+            
+            st.markdown(f"""
+            <div class="metric-card {conf_class}">
+                <div class="metric-value">{conf_icon}</div>
+                <div class="metric-label">Diagnostic Confidence<br><small>{confidence:.1%} ({conf_level})</small></div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Clinical interpretation
+        interpretation = predictions.get("interpretation", "")
+        if interpretation:
+            st.markdown(f"""
+            <div class="medical-card">
+                <div class="card-title">🤖 AI Clinical Interpretation</div>
+                <div class="card-text" style="font-size: 1rem; line-height: 1.7; font-weight: 500;">
+                    {interpretation}
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Clinical recommendations based on stage
+        render_clinical_recommendations(stage)
+        
+        # Technical analysis details
+        render_technical_analysis(predictions)
+    
     except Exception as e:
-        st.error(f"Error in AI analysis tab: {str(e)}")
-        st.error(f"Traceback: {traceback.format_exc()}")
+        st.error(f"Error rendering analysis results: {str(e)}")
 
 def render_clinical_recommendations(stage):
     """Render clinical recommendations based on stage"""
@@ -1058,6 +1017,8 @@ def render_technical_analysis(predictions):
     except Exception as e:
         st.error(f"Error rendering technical analysis: {str(e)}")
 
+@st.fragment(key=DASHBOARD_TAB)
+@metrics.timed("render_seconds", function="render_dashboard_tab")
 def render_dashboard_tab():
     """Render the clinical dashboard tab"""
     try:
@@ -1080,12 +1041,12 @@ def render_dashboard_tab():
                 # Stage assessment chart
                 stage = predictions.get("stage", 0)
                 fig1 = create_professional_stage_chart(stage)
-                st.plotly_chart(fig1, use_container_width=True)
+                st.plotly_chart(fig1, width="stretch")
                 
                 # Overall confidence gauge
                 confidence = predictions.get("confidence", 0.0)
                 fig3 = create_professional_gauge(confidence * 100, "Overall Diagnostic Confidence", 100, "blue")
-                st.plotly_chart(fig3, use_container_width=True)
+                st.plotly_chart(fig3, width="stretch")
             
             with chart_col2:
                 # Model performance comparison
@@ -1093,12 +1054,12 @@ def render_dashboard_tab():
                 model1_conf = detailed.get("model1_confidence", 0)
                 model2_conf = detailed.get("model2_confidence", 0)
                 fig2 = create_professional_model_chart(model1_conf, model2_conf)
-                st.plotly_chart(fig2, use_container_width=True)
+                st.plotly_chart(fig2, width="stretch")
                 
                 # PSS stress assessment gauge
                 pss_score = get_pss_score()
                 fig4 = create_professional_gauge(pss_score, "PSS Stress Assessment", 40, "red")
-                st.plotly_chart(fig4, use_container_width=True)
+                st.plotly_chart(fig4, width="stretch")
             
             # Clinical data export
             st.markdown('<p class="section-header">📁 Clinical Data Export</p>', unsafe_allow_html=True)
@@ -1106,27 +1067,29 @@ def render_dashboard_tab():
             export_col1, export_col2, export_col3 = st.columns(3)
             
             with export_col1:
-                if st.button("📄 Generate Clinical Report", use_container_width=True):
+                if st.button("📄 Generate Clinical Report", width="stretch"):
                     st.info("📋 Clinical PDF report generation feature in development")
             
             with export_col2:
-                if st.button("📊 Export Analysis Data", use_container_width=True):
+                if st.button("📊 Export Analysis Data", width="stretch"):
                     json_data = json.dumps(st.session_state.prediction_results, indent=2)
                     st.download_button(
                         label="📥 Download Clinical Data (JSON)",
                         data=json_data,
                         file_name=f"clinical_hair_analysis_{int(time.time())}.json",
                         mime="application/json",
-                        use_container_width=True
+                        width="stretch"
                     )
             
             with export_col3:
-                if st.button("🔄 New Clinical Assessment", use_container_width=True):
+                if st.button("🔄 New Clinical Assessment", width="stretch"):
                     # Use a confirmation dialog
                     if st.button("✅ Confirm Data Reset", key="confirm_reset"):
                         st.session_state.questionnaire_data = {}
-                        st.session_state.medical_file = None
+                        st.session_state.medical_file = store_session_file("medical_file", None)
                         st.session_state.prediction_results = None
+                        st.session_state.prediction_job = None
+                        st.session_state.prediction_error = None
                         st.rerun()
         
         else:
@@ -1145,6 +1108,7 @@ def render_dashboard_tab():
     except Exception as e:
         st.error(f"Error in dashboard tab: {str(e)}")
 
+@metrics.timed("rerun_seconds")
 def main():
     """Main application with professional medical UI and improved error handling"""
     try:
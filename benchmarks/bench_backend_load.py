@@ -0,0 +1,181 @@
+"""
+End-to-end load test of the API client against a backend.
+
+    python benchmarks/bench_backend_load.py --users 20 --duration 15 \\
+        --latency /predict-questionnaire=lognormal:0.08,0.5 --error-rate 0.02
+
+Runs N virtual users, each looping over a weighted mix of the calls the app
+makes (health check, questionnaire prediction, prediction with a report,
+test upload) through one shared APIClient, just as Streamlit sessions share
+``get_api_client()``. Without ``--backend`` a stub backend is started in a
+separate process with the given latency/error options. Reports p50/p95/p99
+latency, throughput and error rate per operation.
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+from config import Config
+from services.api_client import APIClient
+
+SCENARIOS = {
+    "questionnaire": {"questionnaire": 1},
+    "report": {"predict": 1},
+    "mixed": {"health": 1, "questionnaire": 6, "predict": 2, "upload": 1},
+}
+
+
+def questionnaire(rng: random.Random) -> dict:
+    form = {f"pss_{i}": str(rng.randint(0, 4)) for i in range(1, 11)}
+    form.update({field: str(rng.randint(0, 1)) for field in Config.LIFESTYLE_FIELDS})
+    form["age"] = str(rng.randint(18, 80))
+    return form
+
+
+def report(size: int, user: int) -> io.BytesIO:
+    line = f"user {user}: Ferritin 25 ng/mL, Vitamin D 30 ng/mL\n".encode()
+    upload = io.BytesIO((line * (size // len(line) + 1))[:size])
+    upload.name = f"report_{user}.txt"
+    return upload
+
+
+def call(client: APIClient, operation: str, rng: random.Random, report_bytes: int, user: int) -> dict:
+    if operation == "health":
+        try:
+            response = client.health_check()
+        except requests.RequestException as e:
+            return {"success": False, "error": type(e).__name__}
+        if response.status_code == 200:
+            return {"success": True}
+        return {"success": False, "error": f"HTTP {response.status_code}"}
+    if operation == "questionnaire":
+        return client.make_questionnaire_prediction(questionnaire(rng))
+    if operation == "predict":
+        return client.make_prediction(questionnaire(rng), report(report_bytes, user))
+    return client.test_file_upload(report(report_bytes, user))
+
+
+def percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return float("nan")
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def virtual_user(user: int, client: APIClient, mix: dict, args, deadline: float, samples: dict, lock):
+    rng = random.Random(args.seed * 1000 + user)
+    operations, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        started = time.perf_counter()
+        result = call(client, operation, rng, args.report_kb * 1024, user)
+        elapsed = time.perf_counter() - started
+        with lock:
+            samples[operation].append((elapsed, result.get("success", False), result.get("error")))
+        if args.think:
+            time.sleep(rng.expovariate(1 / args.think))
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@contextlib.contextmanager
+def stub_process(args):
+    """Run the stub backend in its own interpreter so it doesn't share our GIL"""
+    port = free_port()
+    command = [sys.executable, "-m", "services.stub_backend", "--port", str(port),
+               "--stage-delay", str(args.stage_delay), "--seed", str(args.seed)]
+    for spec in args.latency:
+        command += ["--latency", spec]
+    for spec in args.error_rate:
+        command += ["--error-rate", spec]
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                requests.get(url + Config.ENDPOINTS["health"], timeout=0.5)
+                break
+            except requests.RequestException:
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=15, help="Seconds to run")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--think", type=float, default=0, help="Mean think time between a user's calls (s)")
+    parser.add_argument("--report-kb", type=int, default=256, help="Size of uploaded reports")
+    parser.add_argument("--pool-size", type=int, default=Config.API_POOL_SIZE,
+                        help="Client connection pool size (shared by all users)")
+    parser.add_argument("--backend", help="Backend URL; default: start a stub backend")
+    parser.add_argument("--stage-delay", type=float, default=0.05, help="Stub pipeline stage delay (s)")
+    parser.add_argument("--latency", action="append", default=[], metavar="[ROUTE=]DIST",
+                        help="Stub latency, see python -m services.stub_backend --help")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="[ROUTE=]RATE",
+                        help="Stub injected error rate")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    backend = contextlib.nullcontext(args.backend) if args.backend else stub_process(args)
+    samples, lock = defaultdict(list), threading.Lock()
+    with backend as url:
+        client = APIClient(url, pool_size=args.pool_size)
+        deadline = time.perf_counter() + args.duration
+        users = [threading.Thread(target=virtual_user,
+                                  args=(user, client, SCENARIOS[args.scenario], args, deadline, samples, lock))
+                 for user in range(args.users)]
+        started = time.perf_counter()
+        # The client logs every prediction request; keep the report readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for thread in users:
+                thread.start()
+            for thread in users:
+                thread.join()
+        elapsed = time.perf_counter() - started
+        client.close()
+
+    print(f"{args.users} users, {args.scenario} scenario, {elapsed:.1f} s against {url}\n")
+    print(f"{'operation':<14} {'requests':>9} {'req/s':>8} {'errors':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8}")
+    errors = Counter()
+    rows = sorted(samples.items()) + [("all", [sample for values in samples.values() for sample in values])]
+    for operation, values in rows:
+        latencies = sorted(sample[0] * 1000 for sample in values)
+        failed = [sample for sample in values if not sample[1]]
+        if operation != "all":
+            errors.update(f"{operation}: {sample[2]}" for sample in failed)
+        print(f"{operation:<14} {len(values):>9} {len(values) / elapsed:>8.1f} "
+              f"{len(failed) / len(values) if values else 0:>8.1%} {percentile(latencies, 50):>8.1f} "
+              f"{percentile(latencies, 95):>8.1f} {percentile(latencies, 99):>8.1f} "
+              f"{latencies[-1] if latencies else float('nan'):>8.1f}")
+
+    if errors:
+        print("\nMost common errors:")
+        for message, count in errors.most_common(5):
+            print(f"  {count:>6}  {message}")
+
+
+if __name__ == "__main__":
+    main()
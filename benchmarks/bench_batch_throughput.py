@@ -0,0 +1,66 @@
+"""
+Batch screening throughput against the local stand-in backend.
+
+    python benchmarks/bench_batch_throughput.py [rows]
+
+Writes a synthetic questionnaire CSV (with a few invalid rows), then scores
+it through ``BatchRunner`` for several chunk sizes and in-flight limits and
+prints rows/s for each. Everything runs offline against ``StubBackend``.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from services.api_client import APIClient
+from services.batch import BatchRunner, open_result_writer, read_rows
+from services.stub_backend import StubBackend
+
+SETTINGS = [(1, 1), (100, 1), (100, 4), (250, 4), (250, 8)]  # (chunk size, in flight)
+
+
+def synthetic_rows(count: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({f"pss_{i}": rng.integers(0, 5, count) for i in range(1, 11)})
+    for field in Config.LIFESTYLE_FIELDS:
+        frame[field] = rng.integers(0, 2, count)
+    frame["age"] = rng.integers(18, 80, count)
+    frame.insert(0, "patient_id", [f"P{i:06d}" for i in range(count)])
+    frame.loc[::97, "age"] = 150  # out of range -> per-row error
+    return frame
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    workdir = tempfile.mkdtemp(prefix="batch-bench-")
+    source = os.path.join(workdir, "patients.csv")
+    synthetic_rows(rows).to_csv(source, index=False)
+
+    print(f"{rows} rows, fields: {len(Config.QUESTIONNAIRE_FIELDS)}")
+    print(f"{'chunk':>6} {'in flight':>9} {'seconds':>8} {'rows/s':>8} {'failed':>7}")
+    with StubBackend(batch_row_delay=0.001) as backend:
+        for chunk_size, in_flight in SETTINGS:
+            if chunk_size == 1 and rows > 500:
+                sample = os.path.join(workdir, "sample.csv")
+                pd.read_csv(source, nrows=500).to_csv(sample, index=False)
+                path, label = sample, " (500-row sample)"
+            else:
+                path, label = source, ""
+
+            client = APIClient(backend.url, pool_size=in_flight)
+            runner = BatchRunner(client, chunk_size, in_flight)
+            with open_result_writer(os.path.join(workdir, "results.csv")) as write:
+                summary = runner.run(read_rows(path, chunk_size), write)
+            client.close()
+            print(f"{chunk_size:>6} {in_flight:>9} {summary.elapsed:>8.2f} "
+                  f"{summary.rows_per_second:>8.0f} {summary.failed:>7}{label}")
+
+
+if __name__ == "__main__":
+    main()
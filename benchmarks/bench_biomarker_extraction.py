@@ -0,0 +1,123 @@
+"""
+Throughput and accuracy of the client-side biomarker extractor.
+
+    python benchmarks/bench_biomarker_extraction.py [--reports 2000] [--repeat 3]
+
+Generates a synthetic corpus of report texts: lab-system exports, loosely
+typed manual notes and SI-unit reports, with reference ranges, dates,
+detection limits and unrelated analytes mixed in. Every report knows the
+values it contains, so besides reports/s and MB/s the benchmark prints recall
+(markers found with the right value) and precision of the confident values.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import Config
+from services.biomarkers import MARKERS_BY_KEY, extract_biomarkers
+
+# How markers are written, with the units they're reported in: (canonical value range, [(unit, factor to canonical)])
+VOCABULARY = {
+    "total_protein": (["Total Protein", "PROTEIN, TOTAL", "Serum protein"], (6, 8.5), [("g/dL", 1), ("g/L", 0.1)]),
+    "albumin": (["Albumin", "ALBUMIN", "Serum Albumin"], (3.4, 5.4), [("g/dL", 1), ("g/L", 0.1)]),
+    "vitamin_d": (["Vitamin D, 25-Hydroxy", "25-OH Vitamin D", "Vitamin D3", "25(OH)D"], (8, 90),
+                  [("ng/mL", 1), ("nmol/L", 0.4006)]),
+    "vitamin_b12": (["Vitamin B12", "VITAMIN B-12", "Cobalamin"], (150, 1100), [("pg/mL", 1), ("pmol/L", 1.355)]),
+    "folate": (["Folate", "Folic Acid"], (2, 25), [("ng/mL", 1), ("nmol/L", 0.441)]),
+    "biotin": (["Biotin"], (200, 1200), [("ng/L", 1)]),
+    "ferritin": (["Ferritin", "FERRITIN", "Serum Ferritin"], (5, 400), [("ng/mL", 1), ("µg/L", 1)]),
+    "iron": (["Serum Iron", "Iron", "IRON"], (30, 190), [("µg/dL", 1), ("umol/L", 5.585)]),
+    "hemoglobin": (["Hemoglobin", "Haemoglobin", "HGB", "Hb"], (9, 18), [("g/dL", 1), ("g/L", 0.1)]),
+    "zinc": (["Zinc", "Serum Zinc", "Zn"], (50, 150), [("µg/dL", 1), ("mcg/dL", 1), ("umol/L", 6.54)]),
+    "alt": (["ALT (SGPT)", "ALT", "Alanine Aminotransferase"], (7, 90), [("U/L", 1), ("IU/L", 1)]),
+    "ast": (["AST (SGOT)", "AST", "Aspartate Aminotransferase"], (8, 70), [("U/L", 1), ("IU/L", 1)]),
+    "alp": (["Alkaline Phosphatase", "ALP"], (40, 200), [("U/L", 1)]),
+    "ggt": (["GGT", "Gamma-GT"], (8, 90), [("U/L", 1)]),
+    "bilirubin": (["Total Bilirubin", "Bilirubin, Total"], (0.2, 2), [("mg/dL", 1), ("umol/L", 0.0585)]),
+    "tsh": (["TSH", "Thyroid Stimulating Hormone"], (0.3, 6), [("mIU/L", 1), ("uIU/mL", 1)]),
+    "free_t4": (["Free T4", "FT4"], (0.7, 2), [("ng/dL", 1), ("pmol/L", 0.0777)]),
+    "free_t3": (["Free T3", "FT3"], (2, 4.5), [("pg/mL", 1), ("pmol/L", 0.651)]),
+    "testosterone": (["Testosterone, Total", "Total Testosterone", "Testosterone"], (15, 900),
+                     [("ng/dL", 1), ("nmol/L", 28.84)]),
+    "dht": (["DHT", "Dihydrotestosterone"], (20, 900), [("pg/mL", 1)]),
+    "estradiol": (["Estradiol", "E2"], (10, 400), [("pg/mL", 1), ("pmol/L", 0.2724)]),
+    "cortisol": (["Cortisol"], (5, 25), [("µg/dL", 1), ("nmol/L", 0.03625)]),
+}
+DISTRACTORS = ["Glucose, Fasting {v} mg/dL", "Platelets {v},000 /uL", "Creatinine {v} mg/dL", "HbA1c {v} %",
+               "Iron Binding Capacity {v} ug/dL", "Free Testosterone {v} pg/mL", "Sodium {v} mmol/L"]
+LAYOUTS = [
+    "{name:<32}{value:>9} {unit:<8} {low} - {high}",
+    "{name}: {value} {unit} (ref {low}-{high})",
+    "{name} ........ {value} {unit}",
+    "{name} ({low}-{high}) {value} {unit}",
+    "{name} {value}",  # manual notes often leave the unit out
+]
+
+
+def make_report(rng: random.Random):
+    truth = {}
+    lines = [f"Patient report {rng.randint(10000, 99999)}  Collected: 2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"]
+    for key in rng.sample(sorted(VOCABULARY), rng.randint(4, 14)):
+        names, (low, high), units = VOCABULARY[key]
+        unit, factor = rng.choice(units)
+        canonical = rng.uniform(low, high)
+        reported = round(canonical / factor, 1 if canonical / factor < 100 else 0)
+        layout = rng.choice(LAYOUTS)
+        if "{unit}" not in layout and factor != 1:
+            layout = LAYOUTS[1]  # an SI value without its unit is genuinely ambiguous
+        value = f"{reported:g}"
+        if rng.random() < 0.05:
+            value = f"< {value}"
+        lines.append(layout.format(name=rng.choice(names), value=value, unit=unit,
+                                   low=round(low / factor, 1), high=round(high / factor, 1)))
+        truth[key] = reported * factor
+    for template in rng.sample(DISTRACTORS, rng.randint(1, 4)):
+        lines.insert(rng.randint(1, len(lines)), template.format(v=rng.randint(1, 300)))
+    lines.append("Comments: results reviewed by the laboratory director.")
+    return "\n".join(lines) + "\n", truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [make_report(rng) for _ in range(args.reports)]
+    texts = [text for text, _ in corpus]
+    size_mb = sum(len(text.encode()) for text in texts) / 2 ** 20
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        results = [extract_biomarkers(text) for text in texts]
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+
+    expected = correct = confident = confident_correct = 0
+    for (_, truth), found in zip(corpus, results):
+        expected += len(truth)
+        for key, value in found.items():
+            right = key in truth and abs(value.value - truth[key]) <= 0.01 * truth[key] + 1e-6
+            correct += right and key in truth
+            if value.confidence >= Config.BIOMARKER_MIN_CONFIDENCE:
+                confident += 1
+                confident_correct += right
+
+    print(f"{args.reports} reports, {size_mb:.2f} MB, {expected} markers, {len(MARKERS_BY_KEY)} marker types")
+    print(f"throughput: {args.reports / best:,.0f} reports/s, {size_mb / best:.1f} MB/s, "
+          f"{expected / best:,.0f} markers/s ({best * 1e6 / args.reports:.0f} µs per report)")
+    print(f"recall:     {correct / expected:.1%} of markers found with the right value")
+    print(f"precision:  {confident_correct / max(confident, 1):.1%} of values at confidence "
+          f">= {Config.BIOMARKER_MIN_CONFIDENCE} ({confident} sent)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Accuracy and lookup rate of the OCR-tolerant biomarker name index.
+
+    python benchmarks/bench_biomarker_index.py [--variants 20] [--synthetic 2000]
+
+Corrupts every catalog spelling the way OCR and manual typing do (0/o, 1/l,
+rn/m swaps, dropped or doubled letters, odd spacing and case) and resolves
+the variants with BiomarkerIndex: top-1 accuracy, misses, and false accepts
+of look-alike analytes and unrelated report words. Lookups/s are compared
+with a linear scan over the same OCR edit distance, at the real catalog size
+and with ``--synthetic`` extra names to show how each scales.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.biomarker_index import (NOT_MARKERS, OCR_CONFUSIONS, BiomarkerIndex, catalog_spellings,
+                                      normalize_name, ocr_distance)
+
+UNRELATED = ["Patient Name", "Reference Range", "Specimen", "Collected", "Cholesterol", "Triglycerides",
+             "Urea", "Calcium", "Magnesium", "Lab Director", "Fasting", "Page", "Result", "Phosphorus",
+             "Uric Acid", "Chloride", "LDL Cholesterol", "Hematocrit", "White Blood Cells", "Lymphocytes"]
+_SWAPS = [(b, a) for a, b in OCR_CONFUSIONS] + list(OCR_CONFUSIONS)
+
+
+def corrupt(name: str, rng: random.Random) -> str:
+    """One or two OCR/typing errors, plus random case and spacing"""
+    for _ in range(rng.choice([1, 1, 2])):
+        kind = rng.random()
+        if kind < 0.55:
+            present = [(a, b) for a, b in _SWAPS if a in name.lower()]
+            if present:
+                a, b = rng.choice(present)
+                at = rng.choice([i for i in range(len(name)) if name.lower().startswith(a, i)])
+                name = name[:at] + b + name[at + len(a):]
+                continue
+        at = rng.randrange(len(name))
+        if kind < 0.8:
+            name = name[:at] + name[at + 1:]  # dropped character
+        else:
+            name = name[:at] + name[at] + name[at:]  # doubled character
+    name = rng.choice([name, name.upper(), name.title()])
+    return name.replace(" ", rng.choice([" ", "  ", "-", ", "]))
+
+
+def synthetic_names(count: int, rng: random.Random):
+    """Pronounceable fake analyte names to inflate the catalog"""
+    consonants, vowels = "bcdfghklmnprstvz", "aeiou"
+    names = set()
+    while len(names) < count:
+        word = "".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 5)))
+        names.add(word + rng.choice(["", "ase", "in", "ol", " serum", " total"]))
+    return sorted(names)
+
+
+def linear_lookup(entries, query: str, min_similarity: float):
+    """Reference: OCR distance to every catalog spelling"""
+    best = None
+    for key, spelling in entries:
+        similarity = 1 - ocr_distance(query, spelling) / max(len(query), len(spelling))
+        if similarity >= min_similarity and (best is None or similarity > best[1]):
+            best = (key, similarity)
+    return best
+
+
+def rate(lookup, queries, budget: float = 2.0) -> float:
+    """Lookups per second, over at most ``budget`` seconds of queries"""
+    started = time.perf_counter()
+    done = 0
+    for query in queries:
+        lookup(query)
+        done += 1
+        if time.perf_counter() - started > budget:
+            break
+    return done / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--variants", type=int, default=20, help="Noisy variants per spelling")
+    parser.add_argument("--synthetic", type=int, default=2000, help="Extra names for the scaling run")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    spellings = catalog_spellings()
+    index = BiomarkerIndex(spellings, memo_size=0)
+
+    # Abbreviations ("hb", "tsh") only resolve exactly; their corruptions are other abbreviations
+    positives = [(key, corrupt(name, rng)) for key, names in spellings.items() if key is not None
+                 for name in names if len(normalize_name(name)) >= 5 for _ in range(args.variants)]
+    negatives = [corrupt(name, rng) for name in NOT_MARKERS for _ in range(args.variants)]
+    negatives += UNRELATED + [corrupt(name, rng) for name in UNRELATED for _ in range(args.variants)]
+
+    correct = missed = 0
+    for key, query in positives:
+        match = index.lookup(query)
+        correct += match is not None and match.key == key
+        missed += match is None or match.key is None
+    false_accepts = sum(1 for query in negatives if (match := index.lookup(query)) and match.key is not None)
+
+    print(f"catalog: {len(index)} spellings of {len([key for key in spellings if key])} markers "
+          f"+ {len(NOT_MARKERS)} look-alike analytes")
+    print(f"accuracy:      {correct / len(positives):.1%} of {len(positives)} noisy marker names "
+          f"resolved to the right marker ({missed / len(positives):.1%} unresolved, "
+          f"{(len(positives) - correct - missed) / len(positives):.1%} wrong)")
+    print(f"false accepts: {false_accepts / len(negatives):.1%} of {len(negatives)} look-alike/unrelated names")
+
+    queries = [query for _, query in positives] + negatives
+    rng.shuffle(queries)
+    print(f"\n{'catalog':>9} {'index lookups/s':>16} {'linear lookups/s':>17} {'speedup':>8}")
+    for extra in [0, args.synthetic]:
+        catalog = dict(spellings)
+        catalog["synthetic"] = synthetic_names(extra, random.Random(extra)) if extra else []
+        scaled = BiomarkerIndex(catalog, memo_size=0)
+        entries = [(key, normalize_name(name)) for key, names in catalog.items() for name in names]
+        index_rate = rate(scaled.lookup, queries)
+        linear_rate = rate(lambda query: linear_lookup(entries, normalize_name(query), scaled.min_similarity),
+                           queries)
+        print(f"{len(scaled):>9} {index_rate:>16,.0f} {linear_rate:>17,.0f} {index_rate / linear_rate:>7.0f}x")
+
+    memoized = BiomarkerIndex(spellings)
+    repeated = [rng.choice(queries[:200]) for _ in range(20000)]  # reports reuse a handful of labels
+    print(f"\nmemoized (repeated labels): {rate(memoized.lookup, repeated):,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Questionnaire feature encoding: single-record vs bulk, and parity between them.
+
+    python benchmarks/bench_feature_encoder.py [rows]
+
+Encodes synthetic raw questionnaires (numeric, label strings and a share of
+invalid answers) in bulk, times the single-record path used on every UI
+rerun, and checks that both paths produce identical feature rows.
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from services.feature_encoder import FEATURE_NAMES, encode_features, encode_record, pss_scores
+
+
+def synthetic_answers(count: int, labels: bool) -> pd.DataFrame:
+    """Raw answers as a form or an export would hold them, ~1% invalid"""
+    rng = np.random.default_rng(42)
+    frame = pd.DataFrame({f"pss_{i}": rng.integers(0, 5, count) for i in range(1, 11)})
+    for field in Config.LIFESTYLE_FIELDS:
+        frame[field] = rng.integers(0, 2, count)
+    frame["age"] = rng.integers(18, 80, count)
+    if labels:
+        for i in range(1, 11):
+            frame[f"pss_{i}"] = np.array(Config.PSS_SCALE, dtype=object)[frame[f"pss_{i}"]]
+        for field in Config.LIFESTYLE_FIELDS:
+            frame[field] = np.array(list(Config.BINARY_ANSWERS), dtype=object)[frame[field]]
+        frame = frame.astype(object)
+        frame.loc[::101, "pss_3"] = "Not sure"
+        frame.loc[::113, "genetics"] = None
+        frame.loc[::127, "age"] = "150"
+    return frame
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print(f"{'input':<28} {'rows':>9} {'seconds':>8} {'rows/s':>12}")
+    for labels in (False, True):
+        frame = synthetic_answers(rows, labels)
+        elapsed = timed(lambda: encode_features(frame), repeat=1 if labels else 3)
+        name = "DataFrame, label strings" if labels else "DataFrame, numeric"
+        print(f"{name:<28} {rows:>9} {elapsed:>8.3f} {rows / elapsed:>12,.0f}")
+
+    sample = synthetic_answers(2000, labels=True)
+    records = sample.to_dict("records")
+    elapsed = timed(lambda: [encode_record(record) for record in records])
+    print(f"{'encode_record() per call':<28} {len(records):>9} {elapsed:>8.3f} {len(records) / elapsed:>12,.0f}")
+
+    legacy = [{k: v for k, v in record.items() if k.startswith("pss_")} for record in
+              synthetic_answers(2000, labels=False).to_dict("records")]
+    elapsed = timed(lambda: [pss_scores(encode_record(record)) for record in legacy])
+    print(f"{'PSS score per call':<28} {len(legacy):>9} {elapsed:>8.3f} {len(legacy) / elapsed:>12,.0f}")
+
+    # Parity: the per-record path and the vectorized path must agree exactly
+    bulk = encode_features(sample)
+    single = np.vstack([encode_record(record) for record in records])
+    from_dicts = encode_features(records)
+    assert bulk.shape == (len(records), len(FEATURE_NAMES))
+    assert np.array_equal(bulk, single, equal_nan=True), "single-record and bulk encodings differ"
+    assert np.array_equal(bulk, from_dicts, equal_nan=True), "dict and DataFrame encodings differ"
+    # Unanswered questionnaires still get a (NaN) row each, as they do one at a time
+    blank = encode_features([{}, {}])
+    assert blank.shape == (2, len(FEATURE_NAMES)) and np.isnan(blank).all(), "empty records lost their rows"
+    assert np.array_equal(encode_features({}), encode_features([{}]), equal_nan=True)
+    print(f"\nParity OK on {len(records)} mixed records ({int(np.isnan(bulk).any(axis=1).sum())} with invalid answers)")
+
+
+if __name__ == "__main__":
+    main()
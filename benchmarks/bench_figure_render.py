@@ -0,0 +1,86 @@
+"""
+Chart render cost: building a figure vs copying or serializing one.
+
+    python benchmarks/bench_figure_render.py
+
+Times each figure builder, a deep copy of its figure (what a shared figure
+cache would need to hand every session its own mutable object) and the
+serialization ``st.plotly_chart`` does, then times full app reruns with
+results on the dashboard tab using AppTest. Copies cost as much as builds,
+which is why figures are rebuilt on every rerun rather than cached.
+"""
+import copy
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import plotly.io as pio
+from streamlit.testing.v1 import AppTest
+
+from services.stub_backend import StubBackend
+
+BUILDERS = [
+    ("app.create_professional_gauge", "create_professional_gauge", (72.5, "Overall Diagnostic Confidence", 100, "blue")),
+    ("app.create_professional_stage_chart", "create_professional_stage_chart", (3,)),
+    ("app.create_professional_model_chart", "create_professional_model_chart", (0.81, 0.74)),
+    ("results_display._stage_figure", "_stage_figure", (3,)),
+    ("results_display._model_comparison_figure", "_model_comparison_figure", (0.81, 0.74, 0.67, 0.33)),
+    ("results_display._confidence_figure", "_confidence_figure", (0.79,)),
+]
+
+
+def best_of(fn, repeat: int = 50) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def load_app_builders():
+    """Figure builders from app.py without running the app script"""
+    import streamlit as st
+    import plotly.graph_objects as go
+
+    with open(os.path.join(ROOT, "app.py"), encoding="utf-8") as source:
+        code = source.read()
+    start, end = code.index("def create_professional_gauge"), code.index("def display_professional_header")
+    namespace = {"go": go, "st": st}
+    exec(code[start:end], namespace)
+    return namespace
+
+
+def main():
+    from components import results_display
+    namespaces = {"app": load_app_builders(), "results_display": vars(results_display)}
+
+    print(f"{'builder':<42} {'build ms':>9} {'copy ms':>8} {'serialize ms':>13}")
+    for label, name, args in BUILDERS:
+        builder = namespaces[label.split(".")[0]][name]
+        build = best_of(lambda: builder(*args), repeat=20)
+        figure = builder(*args)
+        copied = best_of(lambda: copy.deepcopy(figure), repeat=20)
+        serialize = best_of(lambda: pio.to_json(figure.to_dict(), validate=False))
+        print(f"{label:<42} {build:>9.2f} {copied:>8.2f} {serialize:>13.2f}")
+
+    with StubBackend(port=5000, stage_delay=0) as backend:
+        result = backend.score({f"pss_{i}": "2" for i in range(1, 11)})
+        app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+        app.session_state["prediction_results"] = result
+        app.run()
+
+        reruns = []
+        for _ in range(10):
+            started = time.perf_counter()
+            app.run()
+            reruns.append(time.perf_counter() - started)
+
+    print(f"\nDashboard rerun (AppTest, median of 10): {sorted(reruns)[len(reruns) // 2] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Cold-start import budget for the app and its components.
+
+    python benchmarks/bench_import_time.py [--runs 5] [--budget-ms 450]
+
+Imports app.py and components/ in fresh interpreters under
+``python -X importtime`` and fails (exit status 1) if
+
+* a module that must load lazily (pandas, plotly figure builders, PIL,
+  pyarrow) is imported at startup, or
+* the median import time on top of Streamlit's own exceeds the budget.
+
+Streamlit's own import time is reported but not budgeted, since it is the
+same for any app.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_MODULES = ["app", "components.results_display", "components.file_upload",
+                   "components.utils", "components.questionnaire"]
+LAZY_MODULES = ["pandas", "plotly.graph_objects", "plotly.express", "PIL", "pyarrow"]
+DEFAULT_BUDGET_MS = 450
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_profile() -> dict:
+    """Per top-level import: cumulative time (us) and every module it pulled in.
+
+    Streamlit is imported first on its own, so modules it loads itself
+    (it pulls in parts of plotly, for instance) are not charged to the app.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import streamlit; import {', '.join(STARTUP_MODULES)}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    profile, pending, children = {}, [], {}
+    for match in LINE.finditer(result.stderr):
+        name, depth = match.group(4), len(match.group(3))
+        pending.append(name)
+        if depth == 3:
+            children[name] = int(match.group(2))
+        if depth == 1:
+            # importtime prints children before their parent; a top-level line closes the group
+            profile[name] = {"us": int(match.group(2)), "modules": set(pending), "children": children}
+            pending, children = [], {}
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Allowed import time on top of Streamlit's own")
+    args = parser.parse_args()
+
+    profiles = [import_profile() for _ in range(args.runs)]
+    own = statistics.median(sum(p[m]["us"] for m in STARTUP_MODULES if m in p) for p in profiles) / 1000
+    streamlit = statistics.median(p["streamlit"]["us"] for p in profiles) / 1000
+
+    print(f"Startup imports (median of {args.runs} runs)")
+    print(f"  streamlit      {streamlit:>8.1f} ms")
+    print(f"  app on top     {own:>8.1f} ms  (budget {args.budget_ms:.0f} ms)")
+
+    app_modules = set().union(*(p[m]["modules"] for p in profiles for m in STARTUP_MODULES if m in p))
+    last = profiles[-1]
+    print("\nPer startup module (last run):")
+    for name in STARTUP_MODULES:
+        if name in last:
+            print(f"  {name:<28} {last[name]['us'] / 1000:>8.1f} ms")
+            heaviest = sorted(last[name]["children"].items(), key=lambda item: item[1], reverse=True)[:5]
+            for child, us in heaviest:
+                if us >= 5000:
+                    print(f"    {child:<26} {us / 1000:>8.1f} ms")
+
+    failures = []
+    eager = sorted(m for m in LAZY_MODULES if m in app_modules)
+    if eager:
+        failures.append(f"imported at startup but should load lazily: {', '.join(eager)}")
+    if own > args.budget_ms:
+        failures.append(f"startup import time {own:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        print("\nFAIL: " + "\nFAIL: ".join(failures))
+        sys.exit(1)
+    print("\nOK: within the startup import budget")
+
+
+if __name__ == "__main__":
+    main()
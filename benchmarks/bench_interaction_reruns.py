@@ -0,0 +1,133 @@
+"""
+Rerun time per interaction type, full app vs tab fragments.
+
+    python benchmarks/bench_interaction_reruns.py [--repeat 15]
+
+Each tab of app.py renders in a keyed ``st.fragment``: a widget reruns only
+its own tab, and callbacks rerun the other tabs that render from the state
+they changed. AppTest always requests full-app reruns, so this script swaps
+in a script runner that scopes each interaction to the fragment holding the
+widget, the way the browser does. The full-app rerun it is compared with is
+what every interaction cost before the tabs were fragments. A stub backend on
+port 5000 keeps the app on its normal (connected) path.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit.testing.v1.app_test as app_test_module
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.element_tree import parse_tree_from_messages
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas
+
+from services.stub_backend import StubBackend
+
+
+class FragmentScopedRunner(LocalScriptRunner):
+    """LocalScriptRunner that reruns only the fragment keyed by ``scope``, if set"""
+    scope = None
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        if FragmentScopedRunner.scope is None:
+            return super().run(widget_state, query_params, timeout, page_hash)
+
+        rerun_data = RerunData(
+            widget_states=widget_state,
+            page_script_hash=page_hash,
+            fragment_id_queue=self._fragment_storage.resolve_target(FragmentScopedRunner.scope)
+        )
+        self.request_rerun(rerun_data)
+        try:
+            if not self._script_thread:
+                self.start()
+            require_widgets_deltas(self, timeout)
+        finally:
+            self.join()
+        return parse_tree_from_messages(self.forward_msgs())
+
+
+def timed(run, repeat: int, setup=None) -> float:
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        run(i)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    app_test_module.LocalScriptRunner = FragmentScopedRunner
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+
+    def interact(tab, action):
+        def run(i):
+            # Widgets are looked up in the full tree; only the rerun itself is scoped
+            widget = action(i)
+            FragmentScopedRunner.scope = tab
+            try:
+                widget.run()
+            finally:
+                FragmentScopedRunner.scope = None
+        return run
+
+    def report(i):
+        content = f"Ferritin: {20 + i} ng/mL\n".encode()
+        return app.file_uploader[0].upload(f"report_{i}.txt", content, "text/plain")
+
+    def analysis_button(i):
+        return next(button for button in app.button if "Initiate" in button.label).click()
+
+    def export_button(i):
+        return next(button for button in app.button if "Export Analysis" in button.label).click()
+
+    with StubBackend(port=5000, stage_delay=0):
+        app.run()
+        # Get results onto the dashboard so later analysis clicks are cache hits
+        analysis_button(0).run()
+        for _ in range(50):
+            if app.session_state["prediction_results"]:
+                break
+            time.sleep(0.1)
+            app.run()
+
+        full = timed(lambda i: app.run(), args.repeat)
+        interactions = [
+            ("PSS slider", "health_assessment",
+             lambda i: app.select_slider(key="pss_3").set_value(["Never", "Sometimes"][i % 2])),
+            ("Lifestyle radio", "health_assessment",
+             lambda i: app.radio(key="smoking").set_value(["Yes", "No"][i % 2])),
+            ("Age input", "health_assessment", lambda i: app.number_input(key="age").set_value(30 + i % 2)),
+            ("Report upload", "medical_report", report),
+            ("Analysis (cached)", "ai_analysis", analysis_button),
+            ("Dashboard export", "dashboard", export_button),
+        ]
+        # A scoped run's tree only holds the fragments that reran, so restore the full tree (untimed) first
+        scoped = [(label, tab, timed(interact(tab, action), args.repeat, setup=app.run))
+                  for label, tab, action in interactions]
+
+        app.run()
+        errors = [element.value for element in app.exception] + [element.value for element in app.error]
+
+    print(f"Full-app rerun (every interaction before): {full:.1f} ms (median of {args.repeat})\n")
+    print(f"{'interaction':<20} {'fragment':<18} {'rerun ms':>9} {'vs full':>8}")
+    for label, tab, ms in scoped:
+        print(f"{label:<20} {tab:<18} {ms:>9.1f} {ms / full:>8.0%}")
+    if errors:
+        print(f"\nApp reported errors: {errors[:3]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Per-call cost of the timing instrumentation, disabled vs enabled.
+
+    python benchmarks/bench_metrics_overhead.py
+
+Times a trivial function bare, wrapped with ``metrics.timed`` and inside a
+``metrics.timer`` block, with the registry disabled (the default) and
+enabled (in-memory histograms only, no export).
+"""
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.metrics import MetricsRegistry
+
+
+def work():
+    return None
+
+
+def main():
+    calls = 200_000
+    print(f"{'registry':<10} {'bare ns':>9} {'timed ns':>10} {'timer ns':>10}")
+    for enabled in (False, True):
+        registry = MetricsRegistry(enabled=enabled, prometheus_path=None, jsonl_path=None)
+        timed_work = registry.timed("work_seconds", function="work")(work)
+
+        def in_timer():
+            with registry.timer("work_seconds", function="work"):
+                work()
+
+        results = [min(timeit.repeat(fn, number=calls, repeat=5)) / calls * 1e9
+                   for fn in (work, timed_work, in_timer)]
+        print(f"{'enabled' if enabled else 'disabled':<10} {results[0]:>9.0f} {results[1]:>10.0f} {results[2]:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
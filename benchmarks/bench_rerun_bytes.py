@@ -0,0 +1,56 @@
+"""
+Bytes sent to the browser per rerun, with the stylesheet inlined vs linked.
+
+    python benchmarks/bench_rerun_bytes.py
+
+Runs app.py under AppTest twice: once with static serving disabled (the CSS
+goes out inline on every rerun, the old behaviour) and once with it enabled
+(only a ``<link>`` to the hashed static file goes out). For each run it sums
+the serialized size of every element proto in the rerun's delta stream. A
+stub backend on port 5000 keeps the app on its normal (connected) path.
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit import config as st_config
+from streamlit.testing.v1 import AppTest
+
+from services.stub_backend import StubBackend
+
+
+def element_bytes(node) -> int:
+    """Serialized size of the element protos under an AppTest node"""
+    proto = getattr(node, "proto", None)
+    total = proto.ByteSize() if proto is not None and not hasattr(node, "children") else 0
+    for child in getattr(node, "children", {}).values():
+        total += element_bytes(child)
+    return total
+
+
+def largest_markdown(app: AppTest) -> int:
+    return max((len(element.value) for element in app.markdown), default=0)
+
+
+def measure(static_serving: bool) -> tuple:
+    st_config.set_option("server.enableStaticServing", static_serving)
+    app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60).run()
+    app.run()
+    return element_bytes(app._tree), largest_markdown(app), app.markdown[0].value[:80]
+
+
+def main():
+    with StubBackend(port=5000, stage_delay=0):
+        inline = measure(static_serving=False)
+        linked = measure(static_serving=True)
+
+    print(f"{'mode':<16} {'bytes/rerun':>12} {'largest markdown':>17}  first element")
+    print(f"{'inline <style>':<16} {inline[0]:>12,} {inline[1]:>17,}  {inline[2]!r}")
+    print(f"{'hashed <link>':<16} {linked[0]:>12,} {linked[1]:>17,}  {linked[2]!r}")
+    print(f"\nSaved per rerun: {inline[0] - linked[0]:,} bytes ({(inline[0] - linked[0]) / inline[0]:.0%})")
+
+
+if __name__ == "__main__":
+    main()
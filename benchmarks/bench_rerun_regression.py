@@ -0,0 +1,204 @@
+"""
+Rerun performance regression check for app.py, built on AppTest.
+
+    python benchmarks/bench_rerun_regression.py                    # compare with the baseline
+    python benchmarks/bench_rerun_regression.py --update-baseline  # record a new baseline
+
+Scripts a clinician's session against a stub backend on port 5000: fill all
+PSS sliders, toggle the lifestyle radios, upload a 10 MB PNG report, run the
+analysis and view the dashboard. For every step it records the median rerun
+latency and the number of deltas (elements) each rerun sent, and fails
+(exit status 1) when a step is slower or sends more deltas than the baseline
+in benchmarks/baselines/rerun_regression.json allows.
+
+Latency depends on the machine, so re-record the baseline when moving the
+check to new hardware; delta counts should not change unless the UI does.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st
+import streamlit.testing.v1.app_test as app_test_module
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+from config import Config
+from services.stub_backend import StubBackend
+
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "rerun_regression.json")
+DEFAULT_LATENCY_TOLERANCE = 0.5  # allowed relative slowdown
+DEFAULT_LATENCY_SLACK_MS = 25  # absolute slack, so fast steps don't fail on noise
+DEFAULT_DELTA_TOLERANCE = 0.1  # allowed relative growth in deltas per rerun
+
+
+class CountingRunner(LocalScriptRunner):
+    """LocalScriptRunner that remembers how many deltas each run sent"""
+    deltas = []
+
+    def run(self, *args, **kwargs):
+        tree = super().run(*args, **kwargs)
+        CountingRunner.deltas.append(sum(1 for message in self.forward_msgs() if message.HasField("delta")))
+        return tree
+
+
+class Session:
+    """An AppTest session whose reruns are timed and attributed to the current step"""
+
+    def __init__(self):
+        self.app = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=60)
+        self.steps = {}
+        self.step = None
+
+    def rerun(self, widget=None):
+        started = time.perf_counter()
+        (widget or self.app).run()
+        elapsed = (time.perf_counter() - started) * 1000
+        self.steps.setdefault(self.step, []).append((elapsed, CountingRunner.deltas[-1]))
+        errors = [element.value for element in self.app.exception]
+        if errors:
+            raise RuntimeError(f"App raised during '{self.step}': {errors[0]}")
+
+    def refresh(self):
+        """Untimed full rerun; AppTest's tree only holds the fragments a scoped rerun redrew"""
+        step, self.step = self.step, None
+        self.rerun()
+        self.step = step
+
+
+def png_report(size_mb: float) -> bytes:
+    """A noise PNG of about ``size_mb`` (noise doesn't compress)"""
+    import numpy as np
+    from PIL import Image
+
+    side = int((size_mb * 2 ** 20 / 3) ** 0.5)
+    pixels = np.random.default_rng(7).integers(0, 256, (side, side, 3), dtype=np.uint8)
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format="PNG", compress_level=1)
+    return output.getvalue()
+
+
+def run_scenario(report: bytes) -> dict:
+    session = Session()
+    app = session.app
+
+    session.step = "initial_load"
+    session.rerun()
+
+    session.step = "pss_sliders"
+    for i in range(1, 11):
+        session.rerun(app.select_slider(key=f"pss_{i}").set_value(Config.PSS_SCALE[i % len(Config.PSS_SCALE)]))
+
+    session.step = "lifestyle_radios"
+    for field in Config.LIFESTYLE_FIELDS:
+        session.rerun(app.radio(key=field).set_value("Yes"))
+
+    session.step = "report_upload"
+    session.refresh()
+    session.rerun(app.file_uploader[0].upload("lab_report.png", report, "image/png"))
+
+    session.step = "run_analysis"
+    session.refresh()
+    session.rerun(next(button for button in app.button if "Initiate" in button.label).click())
+
+    # Job polling reruns are waiting on the backend, not rendering; they aren't scored
+    session.step = None
+    for _ in range(100):
+        if app.session_state["prediction_results"]:
+            break
+        time.sleep(0.05)
+        session.rerun()
+    else:
+        raise RuntimeError("Analysis did not finish")
+
+    session.step = "dashboard"
+    for _ in range(5):
+        session.rerun()
+
+    session.steps.pop(None, None)
+    return {
+        step: {"reruns": len(samples),
+               "median_ms": statistics.median(sample[0] for sample in samples),
+               "deltas_per_rerun": statistics.mean(sample[1] for sample in samples)}
+        for step, samples in session.steps.items()
+    }
+
+
+def measure(repeat: int, report: bytes) -> dict:
+    runs = []
+    for _ in range(repeat):
+        # Each repetition starts cold: no cached clients, figures or prediction results
+        st.cache_resource.clear()
+        with StubBackend(port=5000, stage_delay=0.01):
+            runs.append(run_scenario(report))
+    return {
+        step: {"reruns": runs[0][step]["reruns"],
+               "median_ms": round(statistics.median(run[step]["median_ms"] for run in runs), 1),
+               "deltas_per_rerun": round(statistics.median(run[step]["deltas_per_rerun"] for run in runs), 1)}
+        for step in runs[0]
+    }
+
+
+def compare(results: dict, baseline: dict, args) -> list:
+    failures = []
+    print(f"{'step':<18} {'reruns':>6} {'median ms':>10} {'baseline':>9} {'deltas':>7} {'baseline':>9}  status")
+    for step, result in results.items():
+        expected = baseline.get(step)
+        status = "new"
+        if expected is not None:
+            latency_limit = expected["median_ms"] * (1 + args.latency_tolerance) + args.latency_slack_ms
+            delta_limit = expected["deltas_per_rerun"] * (1 + args.delta_tolerance)
+            problems = []
+            if result["median_ms"] > latency_limit:
+                problems.append(f"median {result['median_ms']:.1f} ms > {latency_limit:.1f} ms")
+            if result["deltas_per_rerun"] > delta_limit:
+                problems.append(f"{result['deltas_per_rerun']:.1f} deltas/rerun > {delta_limit:.1f}")
+            failures.extend(f"{step}: {problem}" for problem in problems)
+            status = "FAIL" if problems else "ok"
+        print(f"{step:<18} {result['reruns']:>6} {result['median_ms']:>10.1f} "
+              f"{expected['median_ms'] if expected else float('nan'):>9.1f} {result['deltas_per_rerun']:>7.1f} "
+              f"{expected['deltas_per_rerun'] if expected else float('nan'):>9.1f}  {status}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Scenario repetitions (median is kept)")
+    parser.add_argument("--report-mb", type=float, default=10)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--latency-tolerance", type=float, default=DEFAULT_LATENCY_TOLERANCE)
+    parser.add_argument("--latency-slack-ms", type=float, default=DEFAULT_LATENCY_SLACK_MS)
+    parser.add_argument("--delta-tolerance", type=float, default=DEFAULT_DELTA_TOLERANCE)
+    args = parser.parse_args()
+
+    app_test_module.LocalScriptRunner = CountingRunner
+    results = measure(args.repeat, png_report(args.report_mb))
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2)
+            output.write("\n")
+        compare(results, results, args)
+        print(f"\nBaseline written to {os.path.relpath(args.baseline, ROOT)}")
+        return
+
+    with open(args.baseline, encoding="utf-8") as stored:
+        baseline = json.load(stored)
+    failures = compare(results, baseline, args)
+    if failures:
+        print("\nFAIL: " + "\nFAIL: ".join(failures))
+        sys.exit(1)
+    print("\nOK: every step within tolerance of the baseline")
+
+
+if __name__ == "__main__":
+    main()
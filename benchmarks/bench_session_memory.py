@@ -0,0 +1,109 @@
+"""
+Heap held by saved reports across many sessions: session state vs blob store.
+
+    python benchmarks/bench_session_memory.py [--sessions 300] [--size-mb 4]
+
+Every report arrives as an in-memory upload (like Streamlit's UploadedFile).
+"session_state" keeps those uploads, as ``st.session_state`` used to;
+"blob_store_kept" also saves them through SessionBlobStore but leaves the
+upload alive, as the uploader widget does until it is reset; "blob_store"
+saves them and then lets the upload go, as the app does (release_upload plus
+a new widget key). Each session then reads its report back (digest + full
+read, like a prediction does). Python heap is measured with tracemalloc, so
+the numbers exclude the page cache behind spilled files. A final check makes
+sure a session that only checks its report is still there (as tab reruns do)
+is not swept as idle.
+"""
+import argparse
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.session_store import SessionBlobStore
+
+
+def report_bytes(session: int, size: int) -> bytes:
+    line = f"session {session}: Ferritin 25 ng/mL, Vitamin D 30 ng/mL\n".encode()
+    return (line * (size // len(line) + 1))[:size]
+
+
+def run(mode: str, sessions: int, size: int) -> dict:
+    tracemalloc.start()
+    started = time.perf_counter()
+    spill_dir = tempfile.mkdtemp(prefix="bench-session-blobs-")
+    store = SessionBlobStore(spill_dir=spill_dir)
+    state = {}
+    uploads = []
+
+    for session in range(sessions):
+        upload = io.BytesIO(report_bytes(session, size))
+        if mode == "session_state":
+            state[session] = upload
+        else:
+            state[session] = store.put(str(session), "medical_file", upload)
+            if mode == "blob_store_kept":
+                uploads.append(upload)
+        del upload
+    saved = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for session in range(sessions):
+        if mode == "session_state":
+            hashlib.sha256(state[session].getbuffer()).hexdigest()
+        else:
+            report = store.open(state[session])
+            hashlib.sha256(report.getbuffer()).hexdigest()
+            report.read()
+            report.close()
+    read = time.perf_counter() - started
+
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = store.stats()
+    store.close()
+    os.rmdir(spill_dir)
+    return {"held_mb": current / 2 ** 20, "peak_mb": peak / 2 ** 20, "save_s": saved, "read_s": read,
+            "disk_mb": stats["disk_bytes"] / 2 ** 20}
+
+
+def check_idle_expiry(idle_timeout: float = 0.2):
+    """A session that keeps calling contains() outlives the idle timeout; an untouched one does not"""
+    store = SessionBlobStore(idle_timeout=idle_timeout, sweep_interval=3600)
+    active = store.put("active", "medical_file", b"report")
+    idle = store.put("idle", "medical_file", b"report")
+    deadline = time.monotonic() + 3 * idle_timeout
+    while time.monotonic() < deadline:
+        assert store.contains(active)
+        time.sleep(idle_timeout / 4)
+    store.sweep_idle()
+    assert store.contains(active), "an active session's report was swept as idle"
+    assert not store.contains(idle), "an idle session's report was not swept"
+    store.close()
+    print(f"\nIdle expiry OK: contains() keeps a session alive past a {idle_timeout:g} s timeout")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--size-mb", type=float, default=4)
+    args = parser.parse_args()
+    size = int(args.size_mb * 2 ** 20)
+
+    print(f"{args.sessions} sessions x {args.size_mb:g} MB report")
+    print(f"{'mode':<16} {'heap held MB':>13} {'heap peak MB':>13} {'on disk MB':>11} {'save s':>8} {'read s':>8}")
+    for mode in ["session_state", "blob_store_kept", "blob_store"]:
+        result = run(mode, args.sessions, size)
+        print(f"{mode:<16} {result['held_mb']:>13.1f} {result['peak_mb']:>13.1f} {result['disk_mb']:>11.1f} "
+              f"{result['save_s']:>8.2f} {result['read_s']:>8.2f}")
+    check_idle_expiry()
+
+
+if __name__ == "__main__":
+    main()
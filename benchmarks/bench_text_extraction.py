@@ -0,0 +1,155 @@
+"""
+Client-side report text extraction: upload size and extraction time.
+
+    python benchmarks/bench_text_extraction.py [--pages 1 4 12] [--letterhead-kb 400]
+
+Builds digitally generated lab reports (a text layer on every page plus a
+JPEG letterhead, as LIS exports usually carry) and a scanned report (page
+images only), runs them through TextExtractor and prints what would go over
+the wire: extracted text, or the original file when it has to be OCR'd.
+Finally checks that manually typed text (saved as a StringIO) and a cp1252
+TXT export go through the same path and yield biomarkers. Requires pypdf.
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from services.biomarkers import extract_biomarkers
+from services.text_extraction import TextExtractor
+
+BIOMARKERS = [
+    ("Ferritin", "ng/mL", 10, 300), ("Vitamin D, 25-Hydroxy", "ng/mL", 10, 80), ("Vitamin B12", "pg/mL", 150, 900),
+    ("Hemoglobin", "g/dL", 10, 17), ("Serum Iron", "ug/dL", 40, 180), ("TSH", "mIU/L", 0.3, 6),
+    ("Zinc", "ug/dL", 50, 130), ("Total Protein", "g/dL", 5.5, 8.5), ("ALT (SGPT)", "U/L", 5, 60),
+    ("AST (SGOT)", "U/L", 5, 50), ("Folate", "ng/mL", 2, 20), ("Testosterone, Total", "ng/dL", 200, 900),
+]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(page_streams: list, images: list) -> bytes:
+    """Minimal PDF: one content stream per page, ``images[i]`` (JPEG bytes, w, h) drawn as /Im0 on page i"""
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    number = 4
+    for stream, image in zip(page_streams, images):
+        page, content = number, number + 1
+        number += 2
+        xobjects = b""
+        if image is not None:
+            data, width, height = image
+            objects[number] = (b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB "
+                               b"/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>\nstream\n" % (width, height, len(data))
+                               + data + b"\nendstream")
+            xobjects = b"/XObject << /Im0 %d 0 R >>" % number
+            number += 1
+        objects[page] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+                         b"/Resources << /Font << /F1 3 0 R >> %s >> >>" % (content, xobjects))
+        objects[content] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        kids.append(b"%d 0 R" % page)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = {}
+    for key in sorted(objects):
+        offsets[key] = output.tell()
+        output.write(b"%d 0 obj\n" % key + objects[key] + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for key in sorted(objects):
+        output.write(b"%010d 00000 n \n" % offsets[key])
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+def noise_jpeg(kb: int, seed: int):
+    from PIL import Image
+
+    rng = random.Random(seed)
+    side = max(16, int((kb * 1024 / 1.1) ** 0.5))  # noise JPEGs at q90 run about a byte per pixel
+    image = Image.frombytes("RGB", (side, side), bytes(rng.getrandbits(8) for _ in range(side * side * 3)))
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=90)
+    return output.getvalue(), side, side
+
+
+def lab_report(pages: int, letterhead_kb: int) -> bytes:
+    rng = random.Random(pages)
+    streams, images = [], []
+    for page in range(pages):
+        lines = [f"Central Clinical Laboratory - Patient Report - Page {page + 1} of {pages}",
+                 "Patient: DOE, JANE   DOB: 1984-03-02   Collected: 2026-09-30 07:45",
+                 "Test                          Result      Units       Reference Range"]
+        for _ in range(3):
+            for name, unit, low, high in BIOMARKERS:
+                value = rng.uniform(low * 0.7, high * 1.2)
+                lines.append(f"{name:<30}{value:>8.1f}    {unit:<10}  {low} - {high}")
+        body = b"".join(b"BT /F1 9 Tf 40 %d Td (%s) Tj ET\n" % (800 - 14 * i, _escape(line).encode())
+                        for i, line in enumerate(lines))
+        letterhead = noise_jpeg(letterhead_kb // pages, page) if letterhead_kb else None
+        if letterhead:
+            body = b"q 515 0 0 60 40 770 cm /Im0 Do Q\n" + body
+        streams.append(body)
+        images.append(letterhead)
+    return build_pdf(streams, images)
+
+
+def scanned_report(pages: int, page_kb: int) -> bytes:
+    return build_pdf([b"q 595 0 0 842 0 0 cm /Im0 Do Q\n"] * pages,
+                     [noise_jpeg(page_kb, page) for page in range(pages)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 4, 12])
+    parser.add_argument("--letterhead-kb", type=int, default=400, help="Image bytes per digital report")
+    parser.add_argument("--scan-page-kb", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = [(f"lab report, {pages} page(s)", f"report_{pages}.pdf", lab_report(pages, args.letterhead_kb))
+                 for pages in args.pages]
+    documents.append(("scanned, 2 pages", "scan.pdf", scanned_report(2, args.scan_page_kb)))
+
+    extractor = TextExtractor()
+    print(f"{'document':<24} {'original KB':>12} {'sent KB':>9} {'smaller':>8} {'extract ms':>11}  sent as")
+    for label, filename, data in documents:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            extracted = extractor.extract(data, filename)
+            timings.append(time.perf_counter() - started)
+        if extracted.error:
+            sys.exit(extracted.error)
+        sent = len(extracted.data) if extracted.usable else len(data)
+        print(f"{label:<24} {len(data) / 1024:>12.1f} {sent / 1024:>9.1f} {len(data) / sent:>7.0f}x "
+              f"{min(timings) * 1000:>11.1f}  {'text' if extracted.usable else 'original (scanned)'}")
+
+    # Manual input is saved as a StringIO, not bytes, and must extract the same way
+    manual = io.StringIO("Ferritin: 25 ng/mL\nVitamin D, 25-Hydroxy 30 ng/mL\nZinc 80 ug/dL\n")
+    manual.name = "manual_input.txt"
+    extracted = extractor.get(manual)
+    found = extract_biomarkers(extracted.text) if extracted.usable else {}
+    assert {"ferritin", "vitamin_d", "zinc"} <= set(found), f"manual input yielded {sorted(found)}"
+    print(f"\nManual input OK: {len(found)} biomarkers from {extracted.original_bytes} bytes of text")
+
+    # Legacy lab systems export cp1252: "µ" must survive instead of becoming U+FFFD
+    legacy = "Zinc 80 µg/dL\r\nSerum Iron 95 µg/dL\r\n".encode("cp1252")
+    extracted = extractor.extract(legacy, "lab_export.txt")
+    found = extract_biomarkers(extracted.text)
+    assert "\ufffd" not in extracted.text, "cp1252 report decoded with replacement characters"
+    assert all(found[key].confidence == 1.0 for key in ("zinc", "iron")), f"cp1252 report yielded {found}"
+    print(f"cp1252 report OK: {extracted.text!r}")
+
+
+if __name__ == "__main__":
+    main()
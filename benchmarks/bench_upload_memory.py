@@ -0,0 +1,131 @@
+"""
+Peak client RSS per medical report upload: buffered vs. streaming multipart.
+
+    python benchmarks/bench_upload_memory.py --size-mb 16
+
+"buffered" reproduces the old client (``file.read()`` into a ``files=`` tuple,
+so requests builds the whole body in memory); "streaming" goes through
+APIClient and MultipartStream. Each mode runs in a fresh interpreter against
+the stand-in backend, and reports how far the upload pushed RSS above the
+process's resting size with the report already in memory.
+"""
+import argparse
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ["buffered", "streaming"]
+
+
+def _rss_kb(field: str) -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak():
+    # Linux resets VmHWM to the current RSS when "5" is written here
+    with open("/proc/self/clear_refs", "w") as clear_refs:
+        clear_refs.write("5")
+
+
+def run_worker(mode: str, url: str, size_mb: int):
+    import requests
+    from services.api_client import APIClient
+
+    report = io.BytesIO(os.urandom(size_mb * 1024 * 1024))
+    report.name = "report.png"
+    report.type = "image/png"
+
+    client = APIClient(url)
+    session = requests.Session()
+    client.health_check()
+    session.get(f"{url}/health")
+
+    _reset_peak()
+    baseline = _rss_kb("VmRSS")
+    started = time.perf_counter()
+
+    if mode == "buffered":
+        report.seek(0)
+        content = report.read()
+        response = session.post(
+            f"{url}/test-upload",
+            files={"medical_report": (report.name, content, report.type)}
+        )
+        result = response.json()
+        del content
+    else:
+        result = client.test_file_upload(report)
+
+    elapsed = time.perf_counter() - started
+    peak = _rss_kb("VmHWM")
+    assert result.get("success"), result
+
+    print(json.dumps({
+        "mode": mode,
+        "report_mb": size_mb,
+        "baseline_rss_mb": round(baseline / 1024, 1),
+        "peak_rss_mb": round(peak / 1024, 1),
+        "extra_peak_mb": round((peak - baseline) / 1024, 1),
+        "seconds": round(elapsed, 3)
+    }))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.url, args.size_mb)
+        return
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "services.stub_backend", "--port", str(port), "--stage-delay", "0"],
+        cwd=ROOT, stdout=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        print(f"{'mode':<10} {'report MB':>9} {'extra peak MB':>14} {'seconds':>8}")
+        for mode in MODES:
+            for _ in range(args.repeat):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, "--url", url, "--size-mb", str(args.size_mb)],
+                    cwd=ROOT, capture_output=True, text=True, check=True
+                ).stdout
+                row = json.loads(output.strip().splitlines()[-1])
+                print(f"{row['mode']:<10} {row['report_mb']:>9} {row['extra_peak_mb']:>14} {row['seconds']:>8}")
+    finally:
+        backend.terminate()
+        backend.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import streamlit as st
-from PIL import Image
 import io
 from typing import Optional
 from config import Config
 from services.data_manager import DataManager
+from services.report_store import start_report_upload
+from services.session_store import release_upload
+from services.prediction_cache import report_digest
+from services.preview_cache import build_image_preview, get_preview_cache
+from services.text_extraction import get_text_extractor
+from services.text_preview import build_text_preview
 
 class FileUploadComponent:
     """Component for handling file upload UI and logic"""
@@ -15,8 +20,9 @@ class FileUploadComponent:
         """Render the file upload component"""
         
         # Check if file already uploaded
-        completion_status = self.data_manager.get_completion_status()
+        # Opened first: a report the idle sweep deleted resets the completion flag
         existing_file = self.data_manager.get_medical_file()
+        completion_status = self.data_manager.get_completion_status()
         
         if completion_status["medical_report"]:
             st.success("✅ Medical report uploaded successfully!")
@@ -25,7 +31,7 @@ class FileUploadComponent:
             with col1:
                 st.info("You can upload a different file if needed.")
             with col2:
-                if st.button("🗑️ Remove File", use_container_width=True):
+                if st.button("🗑️ Remove File", width="stretch"):
                     self.data_manager.save_medical_file(None)
                     st.session_state.medical_report_uploaded = False
                     st.rerun()
@@ -70,7 +76,7 @@ class FileUploadComponent:
             "Choose a medical report file",
             type=Config.ALLOWED_FILE_TYPES,
             help="Upload PDF, TXT, or image files containing your medical report",
-            key="medical_file_uploader"
+            key=f"medical_file_uploader_{st.session_state.setdefault('medical_file_uploader_version', 0)}"
         )
         
         if uploaded_file is not None:
@@ -87,10 +93,15 @@ class FileUploadComponent:
                 # Save button
                 col1, col2, col3 = st.columns([1, 2, 1])
                 with col2:
-                    if st.button("💾 Save Medical Report", use_container_width=True, type="primary"):
+                    if st.button("💾 Save Medical Report", width="stretch", type="primary"):
                         # Reset file pointer
                         uploaded_file.seek(0)
                         self.data_manager.save_medical_file(uploaded_file)
+                        # Upload from the stored copy, so nothing else holds on to the uploader's buffer
+                        start_report_upload(self.data_manager.get_medical_file())
+                        # The blob store keeps the only copy; a new key resets the uploader
+                        release_upload(uploaded_file)
+                        st.session_state.medical_file_uploader_version += 1
                         st.rerun()
             else:
                 st.error(f"❌ {validation_result['error']}")
@@ -112,6 +123,7 @@ class FileUploadComponent:
                     text_file = io.StringIO(manual_text)
                     text_file.name = "manual_input.txt"
                     self.data_manager.save_medical_file(text_file)
+                    start_report_upload(self.data_manager.get_medical_file())
                     st.success("✅ Manual text saved successfully!")
                     st.rerun()
         
@@ -182,39 +194,47 @@ class FileUploadComponent:
         
         try:
             if file_type in ['png', 'jpg', 'jpeg']:
-                # Image preview
-                image = Image.open(file)
-                
-                # Resize for display
-                max_width = 600
-                if image.width > max_width:
-                    ratio = max_width / image.width
-                    new_height = int(image.height * ratio)
-                    image = image.resize((max_width, new_height))
+                # Image preview, decoded and resized once per file
+                max_width = Config.PREVIEW_MAX_WIDTH
+                preview = get_preview_cache().get_or_build(
+                    ("image", report_digest(file), max_width),
+                    lambda: build_image_preview(file.getvalue(), max_width)
+                )
                 
-                st.image(image, caption="Uploaded medical report image")
+                st.image(preview.data, caption="Uploaded medical report image")
                 
                 # Image info
-                st.info(f"📏 Image dimensions: {image.width} x {image.height} pixels")
+                width, height = preview.original_size
+                st.info(f"📏 Image dimensions: {width} x {height} pixels")
                 
             elif file_type == 'txt':
-                # Text preview
-                file_content = file.read().decode('utf-8')
-                file.seek(0)  # Reset file pointer
+                # Text preview: decode only the leading bytes, once per report
+                preview = get_preview_cache().get_or_build(
+                    ("text", report_digest(file), Config.TEXT_PREVIEW_CHARS),
+                    lambda: build_text_preview(file.getbuffer())
+                )
                 
-                preview_length = min(1000, len(file_content))
-                preview_text = file_content[:preview_length]
-                
-                if len(file_content) > preview_length:
+                preview_text = preview.text
+                if preview.truncated:
                     preview_text += "\n\n... (truncated)"
                 
                 st.text_area("Text content preview:", preview_text, height=200, disabled=True)
-                st.info(f"📝 Text length: {len(file_content)} characters")
+                st.info(f"📝 Text length: {preview.total_chars:,} characters")
                 
             elif file_type == 'pdf':
-                # PDF preview (basic info only)
-                st.info("📄 PDF file uploaded. Content will be extracted during processing.")
-                st.warning("💡 Tip: Ensure the PDF contains clear, readable text for best results.")
+                # PDF preview: the text layer, once the background extraction has it
+                extracted = get_text_extractor().get(file, timeout=0)
+                if extracted is None:
+                    st.info("📄 PDF file uploaded. Extracting its text layer...")
+                elif extracted.usable:
+                    preview_text = extracted.text[:Config.TEXT_PREVIEW_CHARS]
+                    if len(extracted.text) > Config.TEXT_PREVIEW_CHARS:
+                        preview_text += "\n\n... (truncated)"
+                    st.text_area("Extracted text preview:", preview_text, height=200, disabled=True)
+                    st.info(f"📝 {extracted.pages} page(s), {len(extracted.text):,} characters will be sent as text")
+                else:
+                    st.info("📄 No text layer found (scanned PDF). Content will be extracted during processing.")
+                    st.warning("💡 Tip: Ensure the PDF contains clear, readable text for best results.")
                 
         except Exception as e:
             st.warning(f"⚠️ Could not preview file: {str(e)}")
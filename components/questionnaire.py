@@ -77,7 +77,7 @@ class QuestionnaireComponent:
             with col1:
                 st.info("You can modify your responses and save again if needed.")
             with col2:
-                if st.button("🗑️ Clear Responses", use_container_width=True):
+                if st.button("🗑️ Clear Responses", width="stretch"):
                     self.data_manager.save_questionnaire_data({})
                     st.rerun()
         
@@ -1,9 +1,10 @@
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any
 from config import Config
 
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
 class ResultsDisplay:
     """Component for displaying prediction results"""
     
@@ -158,66 +159,21 @@ class ResultsDisplay:
     def _create_stage_chart(self, predictions: Dict[str, Any]):
         """Create stage progression chart"""
         
-        current_stage = predictions.get("stage", 0)
-        
-        # Create data for all stages
-        stages = list(range(6))  # 0-5
-        stage_labels = [f"Stage {i}" for i in stages]
-        colors = [Config.STAGE_COLORS.get(i, "#666666") for i in stages]
-        
-        # Highlight current stage
-        bar_colors = ["lightgray" if i != current_stage else colors[i] for i in stages]
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=stage_labels,
-                y=[1 if i == current_stage else 0.3 for i in stages],
-                marker_color=bar_colors,
-                text=[Config.STAGE_DESCRIPTIONS.get(i, "") for i in stages],
-                textposition="outside"
-            )
-        ])
-        
-        fig.update_layout(
-            title="Hair Fall Stage Assessment",
-            xaxis_title="Stages",
-            yaxis_title="Current Level",
-            showlegend=False,
-            height=400
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        fig = _stage_figure(predictions.get("stage", 0))
+        st.plotly_chart(fig, width="stretch")
     
     def _create_model_comparison_chart(self, predictions: Dict[str, Any]):
         """Create model comparison chart"""
         
         detailed_results = predictions.get("detailed_results", {})
         
-        models = ["Model 1 (Biochemical)", "Model 2 (Lifestyle)"]
-        confidences = [
+        fig = _model_comparison_figure(
             detailed_results.get("model1_confidence", 0.0),
-            detailed_results.get("model2_confidence", 0.0)
-        ]
-        weights = [
+            detailed_results.get("model2_confidence", 0.0),
             detailed_results.get("ensemble_weights", {}).get("model1", 0.67),
             detailed_results.get("ensemble_weights", {}).get("model2", 0.33)
-        ]
-        
-        fig = go.Figure(data=[
-            go.Bar(name='Confidence', x=models, y=confidences, yaxis='y', offsetgroup=1),
-            go.Bar(name='Weight', x=models, y=weights, yaxis='y2', offsetgroup=2)
-        ])
-        
-        fig.update_layout(
-            title='Model Performance Comparison',
-            xaxis=dict(domain=[0, 1]),
-            yaxis=dict(title='Confidence', side='left'),
-            yaxis2=dict(title='Ensemble Weight', side='right', overlaying='y'),
-            barmode='group',
-            height=400
         )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, width="stretch")
     
     def _create_confidence_chart(self, predictions: Dict[str, Any]):
         """Create confidence analysis chart"""
@@ -225,30 +181,8 @@ class ResultsDisplay:
         confidence = predictions.get("confidence", 0.0)
         
         # Create gauge chart
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = confidence * 100,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Prediction Confidence"},
-            delta = {'reference': 80},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, 60], 'color': "lightgray"},
-                    {'range': [60, 80], 'color': "yellow"},
-                    {'range': [80, 100], 'color': "green"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90
-                }
-            }
-        ))
-        
-        fig.update_layout(height=300)
-        st.plotly_chart(fig, use_container_width=True)
+        fig = _confidence_figure(confidence)
+        st.plotly_chart(fig, width="stretch")
         
         # Confidence interpretation
         if confidence > 0.8:
@@ -355,11 +289,11 @@ class ResultsDisplay:
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            if st.button("📄 Download PDF Report", use_container_width=True):
+            if st.button("📄 Download PDF Report", width="stretch"):
                 st.info("PDF export feature coming soon!")
         
         with col2:
-            if st.button("📊 Export Data (JSON)", use_container_width=True):
+            if st.button("📊 Export Data (JSON)", width="stretch"):
                 import json
                 json_data = json.dumps(results, indent=2)
                 st.download_button(
@@ -370,9 +304,94 @@ class ResultsDisplay:
                 )
         
         with col3:
-            if st.button("🔄 New Analysis", use_container_width=True):
+            if st.button("🔄 New Analysis", width="stretch"):
                 if st.confirm("Clear all data and start new analysis?"):
                     from services.data_manager import DataManager
                     data_manager = DataManager()
                     data_manager.clear_all_data()
-                    st.rerun()
\ No newline at end of file
+                    st.rerun()
+
+
+def _stage_figure(current_stage: int) -> "go.Figure":
+    """Stage progression bar chart"""
+    import plotly.graph_objects as go
+    
+    # Create data for all stages
+    stages = list(range(6))  # 0-5
+    stage_labels = [f"Stage {i}" for i in stages]
+    colors = [Config.STAGE_COLORS.get(i, "#666666") for i in stages]
+    
+    # Highlight current stage
+    bar_colors = ["lightgray" if i != current_stage else colors[i] for i in stages]
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=stage_labels,
+            y=[1 if i == current_stage else 0.3 for i in stages],
+            marker_color=bar_colors,
+            text=[Config.STAGE_DESCRIPTIONS.get(i, "") for i in stages],
+            textposition="outside"
+        )
+    ])
+    
+    fig.update_layout(
+        title="Hair Fall Stage Assessment",
+        xaxis_title="Stages",
+        yaxis_title="Current Level",
+        showlegend=False,
+        height=400
+    )
+    return fig
+
+
+def _model_comparison_figure(model1_confidence: float, model2_confidence: float,
+                             model1_weight: float, model2_weight: float) -> "go.Figure":
+    """Grouped bars of model confidence and ensemble weight"""
+    import plotly.graph_objects as go
+    
+    models = ["Model 1 (Biochemical)", "Model 2 (Lifestyle)"]
+    
+    fig = go.Figure(data=[
+        go.Bar(name='Confidence', x=models, y=[model1_confidence, model2_confidence], yaxis='y', offsetgroup=1),
+        go.Bar(name='Weight', x=models, y=[model1_weight, model2_weight], yaxis='y2', offsetgroup=2)
+    ])
+    
+    fig.update_layout(
+        title='Model Performance Comparison',
+        xaxis=dict(domain=[0, 1]),
+        yaxis=dict(title='Confidence', side='left'),
+        yaxis2=dict(title='Ensemble Weight', side='right', overlaying='y'),
+        barmode='group',
+        height=400
+    )
+    return fig
+
+
+def _confidence_figure(confidence: float) -> "go.Figure":
+    """Prediction confidence gauge"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = confidence * 100,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Prediction Confidence"},
+        delta = {'reference': 80},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 60], 'color': "lightgray"},
+                {'range': [60, 80], 'color': "yellow"},
+                {'range': [80, 100], 'color': "green"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+    
+    fig.update_layout(height=300)
+    return fig
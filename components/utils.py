@@ -1,97 +1,10 @@
 import streamlit as st
-import plotly.graph_objects as go
+from config import Config
+from services.static_assets import inject_stylesheet
 
 def load_css():
     """Load custom CSS styles"""
-    st.markdown("""
-    <style>
-    /* Main container styling */
-    .main {
-        padding-top: 2rem;
-    }
-    
-    /* Custom metric cards */
-    div[data-testid="metric-container"] {
-        background-color: #f8f9fa;
-        border: 1px solid #dee2e6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        box-shadow: 0 0.125rem 0.25rem rgba(0, 0, 0, 0.075);
-    }
-    
-    /* Progress bars */
-    .stProgress > div > div > div > div {
-        background-color: #1f77b4;
-    }
-    
-    /* Sidebar styling */
-    .css-1d391kg {
-        background-color: #f8f9fa;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        border-radius: 0.5rem;
-        border: 1px solid #1f77b4;
-        background-color: #1f77b4;
-        color: white;
-        font-weight: bold;
-    }
-    
-    .stButton > button:hover {
-        background-color: #0056b3;
-        border-color: #0056b3;
-    }
-    
-    /* Warning and info boxes */
-    .stAlert {
-        border-radius: 0.5rem;
-    }
-    
-    /* File uploader */
-    .uploadedFile {
-        border-radius: 0.5rem;
-        border: 2px dashed #1f77b4;
-    }
-    
-    /* Custom headers */
-    .custom-header {
-        background: linear-gradient(90deg, #1f77b4, #ff7f0e);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 2.5rem;
-        font-weight: bold;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    
-    /* Result cards */
-    .result-card {
-        background-color: white;
-        padding: 1.5rem;
-        border-radius: 1rem;
-        box-shadow: 0 0.5rem 1rem rgba(0, 0, 0, 0.15);
-        margin-bottom: 1rem;
-        border-left: 4px solid #1f77b4;
-    }
-    
-    /* Status indicators */
-    .status-success {
-        color: #28a745;
-        font-weight: bold;
-    }
-    
-    .status-warning {
-        color: #ffc107;
-        font-weight: bold;
-    }
-    
-    .status-danger {
-        color: #dc3545;
-        font-weight: bold;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    inject_stylesheet(Config.STYLESHEETS["components"])
 
 def create_progress_bar(current_step: int, total_steps: int = 4):
     """Create a progress bar for the application steps"""
@@ -190,6 +103,7 @@ def display_data_summary(questionnaire_completed: bool, medical_uploaded: bool):
 
 def create_feature_comparison_chart(model1_features: dict, model2_features: dict):
     """Create a comparison chart for model features"""
+    import plotly.graph_objects as go
     
     fig = go.Figure()
     
@@ -1,20 +1,117 @@
 """Frontend Configuration for Hair Fall Prediction System"""
+import os
 
 class Config:
-    # Backend API Configuration
-    BACKEND_BASE_URL = "http://localhost:5000"
+    # Backend API Configuration (HAIRFALL_BACKEND_URL points the app at another backend, e.g. the stub)
+    BACKEND_BASE_URL = os.environ.get("HAIRFALL_BACKEND_URL", "http://localhost:5000")
     
     # API Endpoints
     ENDPOINTS = {
         "health": "/health",
         "questionnaire": "/questionnaire", 
-        "predict": "/predict"
+        "predict": "/predict",
+        "predict_questionnaire": "/predict-questionnaire",
+        "test_upload": "/test-upload",
+        "jobs": "/jobs",
+        "reports": "/reports",
+        "predict_batch": "/predict-batch"
     }
-    
+
+    # API Client Settings (timeouts in seconds)
+    API_POOL_SIZE = 20
+    API_CONNECT_TIMEOUT = 3.05
+    API_READ_TIMEOUT = 30
+    API_MAX_RETRIES = 3
+    API_BACKOFF_FACTOR = 0.5
+
+    # Backend Circuit Breaker
+    CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failed or slow calls before calls fail fast
+    CIRCUIT_SLOW_CALL_SECONDS = 10  # slower responses to bodiless calls (health, job status) count as failures
+    CIRCUIT_RESET_TIMEOUT = 15  # seconds open before a single probe call is let through
+
+    # Backend Health Monitoring (seconds)
+    HEALTH_CHECK_INTERVAL = 10
+    HEALTH_CHECK_TIMEOUT = 5
+    HEALTH_STALE_AFTER = 30
+    HEALTH_INITIAL_WAIT = 2
+
+    # Prediction Progress Reporting
+    JOB_POLL_INTERVAL = 1.0  # seconds between job status checks
+    PREDICTION_STAGES = {
+        "queued": "⏳ Waiting for an available analysis worker...",
+        "upload": "📤 Uploading clinical data...",
+        "extraction": "📄 Extracting biomarkers from medical reports...",
+        "model1": "🧪 Executing biochemical analysis model...",
+        "model2": "👤 Executing lifestyle risk model...",
+        "aggregation": "📊 Compiling comprehensive analysis...",
+        "complete": "✅ Clinical analysis complete!"
+    }
+
+    # Prediction Result Cache
+    PREDICTION_CACHE_SIZE = 256  # entries
+    PREDICTION_CACHE_TTL = 3600  # seconds
+
+    # Request Coalescing (identical in-flight predictions share one backend call)
+    COALESCE_HOLD_TTL = 600  # seconds an accepted job stays joinable if nobody sees it finish
+
+    # Batch Screening
+    BATCH_CHUNK_SIZE = 100  # questionnaire rows per batch request
+    BATCH_MAX_IN_FLIGHT = 4  # concurrent batch requests
+
     # File Upload Settings
     MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # bytes read per multipart chunk
+    UPLOAD_SPOOL_MAX_MEMORY = 1024 * 1024  # larger non-buffer uploads spill to disk
+    REPORT_UPLOAD_WAIT = 10  # seconds a prediction waits for a background report upload
+    REPORT_UPLOAD_CACHE_SIZE = 256  # report digests remembered per process
     ALLOWED_FILE_TYPES = ["pdf", "txt", "png", "jpg", "jpeg"]
-    
+
+    # Session File Storage (saved reports live here, not in st.session_state)
+    SESSION_BLOB_MEMORY_BUDGET = 128 * 1024 * 1024  # bytes kept in memory across all sessions
+    SESSION_BLOB_SPILL_SIZE = 256 * 1024  # larger files go straight to a temporary file
+    SESSION_IDLE_TIMEOUT = 30 * 60  # seconds before an untouched session's files are deleted
+    SESSION_SWEEP_INTERVAL = 60  # seconds between idle-session sweeps
+
+    # Image Report Normalization (OCR pre-processing)
+    OCR_TARGET_DPI = 300
+    OCR_PAGE_LONG_EDGE_INCHES = 11.69  # A4
+    OCR_JPEG_QUALITY = 85
+    IMAGE_WORKERS = 2
+    IMAGE_CACHE_SIZE = 64  # normalized images kept per process
+
+    # Report Text Extraction (PDF text layers and TXT reports are sent as compact text)
+    TEXT_EXTRACTION_WORKERS = 4
+    TEXT_EXTRACTION_PAGE_TIMEOUT = 5  # seconds per PDF page
+    TEXT_EXTRACTION_MIN_PAGE_CHARS = 20  # pages with less text are treated as scanned
+    TEXT_EXTRACTION_CACHE_SIZE = 64  # extracted reports kept per process
+    TEXT_EXTRACTION_WAIT = 2  # seconds an analysis click waits for extraction before sending the original
+
+    # Biomarker Extraction (structured values sent alongside text reports)
+    BIOMARKER_MIN_CONFIDENCE = 0.5  # less certain values are left to the backend
+    BIOMARKER_MATCH_MIN_SIMILARITY = 0.75  # fuzzy name matches below this are ignored
+    BIOMARKER_INDEX_MEMO_SIZE = 4096  # resolved names remembered per process
+
+    # Upload Previews
+    PREVIEW_MAX_WIDTH = 600  # pixels
+    PREVIEW_JPEG_QUALITY = 80
+    PREVIEW_CACHE_SIZE = 128  # encoded previews kept per process
+    TEXT_PREVIEW_CHARS = 1000
+    TEXT_PREVIEW_CHUNK_SIZE = 64 * 1024  # bytes decoded/counted per step
+
+    # Timing Metrics (see services/metrics.py)
+    METRICS_ENABLED = os.environ.get("HAIRFALL_METRICS", "0") == "1"
+    METRICS_PROMETHEUS_PATH = os.environ.get("HAIRFALL_METRICS_PROM")  # Prometheus text file
+    METRICS_JSONL_PATH = os.environ.get("HAIRFALL_METRICS_JSONL")  # one JSON line per observation
+    METRICS_EXPORT_INTERVAL = 10  # seconds between background exports
+    METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)  # seconds
+
+    # Static Assets (stylesheets are served from static/<STATIC_ASSET_DIR> under a content hash)
+    STATIC_ASSET_DIR = "css"
+    STYLESHEETS = {
+        "main": "assets/styles/main.css",
+        "components": "assets/styles/components.css"
+    }
+
     # UI Configuration
     PAGE_TITLE = "Hair Fall Prediction System"
     PAGE_ICON = "🔬"
@@ -45,6 +142,13 @@ class Config:
     # PSS Questions Configuration
     PSS_SCALE = ["Never", "Almost Never", "Sometimes", "Fairly Often", "Very Often"]
     PSS_VALUES = [0, 1, 2, 3, 4]
+    PSS_REVERSED_ITEMS = [4, 5, 7, 8]  # positively worded, scored as max - response
+
+    # Questionnaire Features (model input order)
+    LIFESTYLE_FIELDS = ["genetics", "smoking", "hair_care", "environment", "hormonal_changes", "weight_loss"]
+    QUESTIONNAIRE_FIELDS = [f"pss_{i}" for i in range(1, 11)] + LIFESTYLE_FIELDS + ["age"]
+    BINARY_ANSWERS = {"No": 0, "Yes": 1}
+    AGE_RANGE = (1, 100)
     
     # Result Interpretation
     STAGE_DESCRIPTIONS = {
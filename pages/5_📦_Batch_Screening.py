@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+import pandas as pd
+import streamlit as st
+from config import Config
+from services.api_client import get_api_client
+from services.batch import BatchRunner, BatchSummary, open_result_writer, read_rows
+from services.session_store import adopt_session_file, open_session_file, store_session_file
+
+st.title("📦 Batch Screening")
+st.markdown(
+    "Score a whole screening campaign at once. Upload a CSV or Parquet export with one "
+    "questionnaire per row and the columns "
+    f"`{'`, `'.join(Config.QUESTIONNAIRE_FIELDS)}` (plus an optional `patient_id`)."
+)
+
+uploaded_file = st.file_uploader("Questionnaire export", type=["csv", "parquet"], key="batch_file")
+
+col1, col2 = st.columns(2)
+with col1:
+    chunk_size = st.number_input("Rows per request", min_value=1, max_value=1000,
+                                 value=Config.BATCH_CHUNK_SIZE, step=10)
+with col2:
+    max_in_flight = st.number_input("Requests in flight", min_value=1, max_value=Config.API_POOL_SIZE,
+                                    value=Config.BATCH_MAX_IN_FLIGHT)
+
+if uploaded_file is not None and st.button("🚀 Run Batch Screening", type="primary"):
+    st.session_state.pop("batch_result", None)
+    store_session_file("batch_result", None)
+
+    handle, output_path = tempfile.mkstemp(prefix="batch-results-", suffix=".csv")
+    os.close(handle)
+    status = st.empty()
+
+    def show_progress(summary: BatchSummary):
+        status.info(f"🔬 {summary.rows:,} rows scored ({summary.failed:,} failed), "
+                    f"{summary.rows_per_second:,.0f} rows/s")
+
+    runner = BatchRunner(get_api_client(Config.BACKEND_BASE_URL), int(chunk_size), int(max_in_flight))
+    summary = None
+    try:
+        with open_result_writer(output_path) as write:
+            summary = runner.run(read_rows(uploaded_file, int(chunk_size)), write, show_progress)
+    except Exception as e:
+        st.error(f"❌ Could not read {uploaded_file.name}: {str(e)}")
+    finally:
+        status.empty()
+        if summary is None:
+            # Failed, or interrupted by a rerun or stop
+            os.remove(output_path)
+
+    if summary is not None:
+        # The session's blob store owns the file from here and deletes it when the session goes idle
+        name = f"{os.path.splitext(uploaded_file.name)[0]}_results.csv"
+        st.session_state.batch_result = {
+            "ref": adopt_session_file("batch_result", output_path, name, "text/csv"),
+            "summary": summary
+        }
+
+result = st.session_state.get("batch_result")
+results_file = open_session_file(result["ref"]) if result else None
+if result and results_file is None:
+    # Expired with the idle session
+    del st.session_state.batch_result
+    st.info("ℹ️ The previous batch results have expired. Run the batch again to get them back.")
+if results_file is not None:
+    summary = result["summary"]
+    st.markdown("---")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Rows", f"{summary.rows:,}")
+    col2.metric("Scored", f"{summary.succeeded:,}")
+    col3.metric("Failed", f"{summary.failed:,}")
+    col4.metric("Throughput", f"{summary.rows_per_second:,.0f} rows/s")
+
+    if summary.failed:
+        st.warning("⚠️ Some rows could not be scored. See the `error` column for the reason per row.")
+
+    with results_file:
+        st.dataframe(pd.read_csv(results_file, nrows=200), width="stretch")
+    if summary.rows > 200:
+        st.caption(f"Showing the first 200 of {summary.rows:,} rows.")
+
+    ref = result["ref"]
+    st.download_button(
+        "📥 Download Results",
+        # Read from the store only when the download is requested
+        lambda: open_session_file(ref) or b"",
+        file_name=ref.name,
+        mime="text/csv"
+    )
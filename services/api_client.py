@@ -1,134 +1,491 @@
-# Frontend API Client Fixes
-
-# In services/api_client.py, update the make_prediction method:
-
-def make_prediction(self, questionnaire_data: Optional[Dict] = None, 
-                   medical_file: Optional[Any] = None) -> Dict[str, Any]:
-    """Make prediction using backend API"""
-    try:
-        url = f"{self.base_url}{Config.ENDPOINTS['predict']}"
-        
-        # Prepare form data
-        form_data = {}
-        files = {}
-        
-        print(f"Making prediction request to: {url}")
-        print(f"Questionnaire data: {questionnaire_data is not None}")
-        print(f"Medical file: {medical_file is not None}")
-        
-        # Add questionnaire data if available
-        if questionnaire_data:
-            form_data.update(questionnaire_data)
-            print(f"Form data keys: {list(form_data.keys())}")
-        
-        # Add medical file if available
-        if medical_file:
-            # Reset file pointer if it's a file object
-            if hasattr(medical_file, 'seek'):
-                medical_file.seek(0)
-            
-            # Handle different file types
-            if hasattr(medical_file, 'read'):
-                # It's a file-like object
-                file_content = medical_file.read()
-                if hasattr(medical_file, 'seek'):
-                    medical_file.seek(0)
-                
-                files['medical_report'] = (
-                    getattr(medical_file, 'name', 'uploaded_file'),
-                    file_content,
-                    getattr(medical_file, 'content_type', 'application/octet-stream')
-                )
-            else:
-                # It's already file content
-                files['medical_report'] = medical_file
-            
-            print(f"File prepared for upload: {list(files.keys())}")
-        
-        # Make request
-        print(f"Sending request with {len(form_data)} form fields and {len(files)} files")
-        
-        if files:
-            response = self.session.post(url, data=form_data, files=files)
-        else:
-            response = self.session.post(url, data=form_data)
-        
-        print(f"Response status: {response.status_code}")
-        
-        # Handle response
-        if response.status_code == 200:
-            result = response.json()
-            print(f"Prediction successful: {result.get('success', False)}")
-            return result
+import logging
+import mimetypes
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from config import Config
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.metrics import metrics
+from services.multipart import MultipartStream
+from services.prediction_cache import prediction_key, report_digest
+from services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Phase timestamps of the backend call running on this thread; only set while metrics are enabled
+_call_phases = threading.local()
+_ID_SEGMENT = re.compile(r"/[0-9a-f]{16,}")
+
+
+class _PhaseTimingConnection:
+    """Connection mixin that records connect time and when the request was sent and answered"""
+
+    def connect(self):
+        phases = getattr(_call_phases, "current", None)
+        if phases is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            phases["connect"] += time.perf_counter() - started
+
+    def getresponse(self):
+        phases = getattr(_call_phases, "current", None)
+        if phases is None:
+            return super().getresponse()
+        # urllib3 has written the whole request body by the time it asks for the response
+        phases["sent"] = time.perf_counter()
+        response = super().getresponse()
+        phases["headers"] = time.perf_counter()
+        return response
+
+
+class _TimedHTTPConnection(_PhaseTimingConnection, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_PhaseTimingConnection, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _PhaseTimingAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections report phase timings"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool
+        }
+
+
+class _TimedSession(requests.Session):
+    """Session that records every backend call, split into connect/upload/server/download"""
+
+    def request(self, method, url, *args, **kwargs):
+        if not metrics.enabled:
+            return super().request(method, url, *args, **kwargs)
+
+        endpoint = _ID_SEGMENT.sub("/<id>", urlsplit(url).path)
+        phases = _call_phases.current = {"connect": 0.0}
+        status = "error"
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            finished = time.perf_counter()
+            _call_phases.current = None
+            metrics.observe("backend_request_seconds", finished - started,
+                            endpoint=endpoint, method=method, status=status)
+            if "headers" in phases:
+                for phase, seconds in (
+                    ("connect", phases["connect"]),
+                    ("upload", phases["sent"] - started - phases["connect"]),
+                    ("server", phases["headers"] - phases["sent"]),
+                    ("download", finished - phases["headers"])
+                ):
+                    metrics.observe("backend_phase_seconds", max(seconds, 0.0), endpoint=endpoint, phase=phase)
+
+
+class _GuardedSession(_TimedSession):
+    """Session whose calls go through the client's circuit breaker"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        super().__init__()
+        self.breaker = breaker
+
+    def request(self, method, url, *args, **kwargs):
+        probe = self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException as e:
+            self.breaker.record(time.perf_counter() - started, type(e).__name__)
+            raise
+        except BaseException:
+            # Not the backend's fault (e.g. an unreadable upload); just free the probe slot
+            if probe:
+                self.breaker.release()
+            raise
+        if any(kwargs.get(name) for name in ("data", "files", "json", "stream")):
+            # Large reports and streamed results take as long as they take: not a sign of an unhealthy backend
+            duration = None
         else:
-            error_detail = "Unknown error"
-            try:
-                error_response = response.json()
-                error_detail = error_response.get('error', 'Server error')
-                print(f"Error response: {error_response}")
-            except:
-                error_detail = f"HTTP {response.status_code}: {response.text}"
-            
-            return {
-                "success": False,
-                "error": error_detail,
-                "status_code": response.status_code
-            }
-            
-    except requests.RequestException as e:
-        error_msg = f"Request failed: {str(e)}"
-        print(f"Request exception: {error_msg}")
-        return {"success": False, "error": error_msg}
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        print(f"Unexpected exception: {error_msg}")
-        return {"success": False, "error": error_msg}
-
-# Add a method to test questionnaire-only predictions:
-
-def make_questionnaire_prediction(self, questionnaire_data: Dict) -> Dict[str, Any]:
-    """Make prediction using only questionnaire data"""
-    try:
-        url = f"{self.base_url}/predict-questionnaire"
-        
-        print(f"Making questionnaire-only prediction to: {url}")
-        print(f"Data: {questionnaire_data}")
-        
-        response = self.session.post(url, data=questionnaire_data)
-        
-        if response.status_code == 200:
+            # A long-poll is slow on purpose; only time beyond the requested wait counts
+            params = kwargs.get("params") or {}
+            duration = time.perf_counter() - started - float(params.get("wait", 0))
+        self.breaker.record(duration, f"HTTP {response.status_code}" if response.status_code >= 500 else None)
+        return response
+
+
+class APIClient:
+    """Client for the Hair Fall Prediction backend API.
+
+    All requests go through one keep-alive connection pool. Each thread gets
+    its own lightweight ``requests.Session`` (sessions are not thread-safe),
+    but every session mounts the same adapter, so TCP connections are reused
+    across Streamlit sessions in the process. Every call also passes through
+    one ``CircuitBreaker``, so an unreachable backend fails fast instead of
+    holding script and worker threads until their timeouts.
+    """
+
+    def __init__(self, base_url: str = Config.BACKEND_BASE_URL,
+                 pool_size: int = Config.API_POOL_SIZE,
+                 connect_timeout: float = Config.API_CONNECT_TIMEOUT,
+                 read_timeout: float = Config.API_READ_TIMEOUT,
+                 max_retries: int = Config.API_MAX_RETRIES,
+                 backoff_factor: float = Config.API_BACKOFF_FACTOR):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+
+        # Only idempotent methods are retried; a POST /predict is never replayed
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False
+        )
+        self._adapter = _PhaseTimingAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True,
+            max_retries=retry
+        )
+        # Health probes run on their own schedule, so they fail fast instead of retrying
+        self._health_adapter = _PhaseTimingAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        self.breaker = CircuitBreaker()
+        # Identical predictions in flight (double clicks, several tabs) share one backend call
+        self._predictions = SingleFlight("predict")
+        self._jobs = SingleFlight("job")
+        self._job_keys: Dict[str, str] = {}
+        self._job_keys_lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api-client")
+
+    @property
+    def session(self) -> requests.Session:
+        """Get this thread's session, bound to the shared connection pool"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = _GuardedSession(self.breaker)
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            session.mount(self._url(Config.ENDPOINTS['health']), self._health_adapter)
+            self._local.session = session
+        return session
+
+    def close(self):
+        """Close all pooled connections"""
+        self._executor.shutdown(wait=False)
+        self._adapter.close()
+        self._health_adapter.close()
+
+    def submit_background(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run a client call on the client's bounded worker pool"""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def _url(self, endpoint: str) -> str:
+        return f"{self.base_url}{endpoint}"
+
+    def _timeout(self, read_timeout: Optional[float] = None) -> Tuple[float, float]:
+        if read_timeout is None:
+            return self.timeout
+        return (self.timeout[0], read_timeout)
+
+    def _prepare_file(self, medical_file: Any, default_name: str = "uploaded_file") -> Tuple:
+        """Build the multipart tuple for an uploaded report"""
+        if hasattr(medical_file, 'seek'):
+            medical_file.seek(0)
+
+        if not hasattr(medical_file, 'read'):
+            # It's already file content
+            return medical_file
+
+        name = getattr(medical_file, 'name', default_name)
+        return (
+            name,
+            medical_file,
+            getattr(medical_file, 'type', None)
+            or getattr(medical_file, 'content_type', None)
+            or mimetypes.guess_type(name)[0]
+            or 'application/octet-stream'
+        )
+
+    def _post_form(self, url: str, form_data: Dict[str, Any],
+                   files: Optional[Dict[str, Tuple]] = None) -> requests.Response:
+        """POST form fields, streaming any files as a multipart body"""
+        if not files:
+            return self.session.post(url, data=form_data, timeout=self._timeout())
+
+        with MultipartStream(form_data, files) as body:
+            return self.session.post(
+                url,
+                data=body,
+                headers={"Content-Type": body.content_type},
+                timeout=self._timeout()
+            )
+
+    def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
+        """Turn a backend response into the result dict used by the UI"""
+        if 200 <= response.status_code < 300:
             return response.json()
-        else:
-            try:
-                error_response = response.json()
-                return {"success": False, "error": error_response.get('error', 'Server error')}
-            except:
-                return {"success": False, "error": f"HTTP {response.status_code}"}
-                
-    except Exception as e:
-        return {"success": False, "error": str(e)}
-
-# Add a method to test file uploads:
-
-def test_file_upload(self, medical_file: Any) -> Dict[str, Any]:
-    """Test file upload functionality"""
-    try:
-        url = f"{self.base_url}/test-upload"
-        
+
+        try:
+            error_detail = response.json().get('error', 'Server error')
+        except ValueError:
+            error_detail = f"Server returned status {response.status_code}: {response.text}"
+
+        return {
+            "success": False,
+            "error": error_detail,
+            "status_code": response.status_code
+        }
+
+    def _handle_exception(self, e: Exception) -> Dict[str, Any]:
+        """Turn a request exception into the result dict used by the UI"""
+        if isinstance(e, CircuitOpenError):
+            return {"success": False, "error": f"Backend server is unavailable. Retrying in {e.retry_in:.0f}s.",
+                    "circuit_open": True}
+        if isinstance(e, requests.exceptions.Timeout):
+            return {"success": False, "error": "Request timed out. Please try again."}
+        if isinstance(e, requests.exceptions.ConnectionError):
+            return {"success": False, "error": "Cannot connect to backend server. Please ensure it's running."}
+        if isinstance(e, requests.RequestException):
+            return {"success": False, "error": f"Request failed: {str(e)}"}
+        return {"success": False, "error": f"Unexpected error: {str(e)}"}
+
+    def health_check(self, timeout: Optional[float] = None) -> requests.Response:
+        """Query the backend health endpoint (raises on connection errors)"""
+        return self.session.get(
+            self._url(Config.ENDPOINTS['health']),
+            timeout=self._timeout(timeout)
+        )
+
+    def make_prediction(self, questionnaire_data: Optional[Dict] = None,
+                        medical_file: Optional[Any] = None,
+                        report_id: Optional[str] = None) -> Dict[str, Any]:
+        """Make prediction using backend API and wait for the result.
+
+        With ``report_id`` (see ``upload_report``) only the id is sent in place
+        of the report bytes. The UI runs analyses as jobs instead (see
+        ``submit_prediction_job``), which report their stage while they run.
+        """
+        key = self._payload_key(questionnaire_data, medical_file, report_id)
+        return self._coalesced_prediction(key, questionnaire_data, medical_file, report_id)
+
+    def _payload_key(self, questionnaire_data: Optional[Dict], medical_file: Optional[Any],
+                     report_id: Optional[str]) -> str:
+        """Canonical key of a prediction payload: form fields plus the report's id or digest"""
+        return prediction_key(questionnaire_data, report_id or report_digest(medical_file), None)
+
+    def _coalesced_prediction(self, key: str, questionnaire_data: Optional[Dict], medical_file: Optional[Any],
+                              report_id: Optional[str]) -> Dict[str, Any]:
+        """Post a prediction, or wait for the identical one already in flight"""
+        result, _ = self._predictions.do(key, self._post_prediction, questionnaire_data, medical_file, report_id)
+        return result
+
+    def coalescing_stats(self) -> Dict[str, Dict[str, int]]:
+        """Leader/coalesced counts for synchronous predictions and job submissions"""
+        return {"predict": self._predictions.stats(), "jobs": self._jobs.stats()}
+
+    def _post_prediction(self, questionnaire_data: Optional[Dict] = None,
+                         medical_file: Optional[Any] = None,
+                         report_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send the prediction request and wait for the result"""
+        try:
+            report = "by id" if report_id else "attached" if medical_file else "none"
+            logger.debug("Sending prediction request with %d form fields, report: %s", len(questionnaire_data or {}), report)
+
+            response, resent = self._send_prediction(
+                self._url(Config.ENDPOINTS['predict']),
+                questionnaire_data,
+                medical_file,
+                report_id
+            )
+
+            logger.debug("Prediction response status: %s", response.status_code)
+            return self._prediction_result(response, resent)
+
+        except Exception as e:
+            result = self._handle_exception(e)
+            logger.warning("Prediction request failed: %s", result["error"])
+            return result
+
+    def _send_prediction(self, url: str, questionnaire_data: Optional[Dict], medical_file: Optional[Any],
+                         report_id: Optional[str] = None) -> Tuple[requests.Response, bool]:
+        """POST a prediction, referencing a stored report by id when possible.
+
+        Returns the response and whether the report bytes had to be re-sent
+        because the backend no longer held ``report_id``.
+        """
+        form_data = dict(questionnaire_data or {})
         files = {}
-        if hasattr(medical_file, 'read'):
-            file_content = medical_file.read()
-            if hasattr(medical_file, 'seek'):
-                medical_file.seek(0)
-            
-            files['medical_report'] = (
-                getattr(medical_file, 'name', 'test_file'),
-                file_content,
-                getattr(medical_file, 'content_type', 'application/octet-stream')
+        if report_id:
+            form_data['report_id'] = report_id
+        elif medical_file:
+            files['medical_report'] = self._prepare_file(medical_file)
+
+        response = self._post_form(url, form_data, files)
+
+        if report_id and medical_file and response.status_code == 404 and self._error_code(response) == "unknown_report":
+            # The backend no longer holds the report: send the bytes, which re-registers it
+            response, _ = self._send_prediction(url, questionnaire_data, medical_file)
+            return response, True
+        return response, False
+
+    def _prediction_result(self, response: requests.Response, report_resent: bool) -> Dict[str, Any]:
+        """Result dict of a prediction response; ``report_resent`` tells callers their report id went stale"""
+        result = self._handle_response(response)
+        if report_resent:
+            result["report_resent"] = True
+        return result
+
+    def _error_code(self, response: requests.Response) -> Optional[str]:
+        try:
+            return response.json().get("code")
+        except (ValueError, AttributeError):
+            return None
+
+    def upload_report(self, medical_file: Any) -> Dict[str, Any]:
+        """Upload a report once and return its server-side ``report_id``"""
+        try:
+            files = {'medical_report': self._prepare_file(medical_file)}
+            response = self._post_form(self._url(Config.ENDPOINTS['reports']), {}, files)
+            return self._handle_response(response)
+        except Exception as e:
+            return self._handle_exception(e)
+
+    def submit_prediction_job(self, questionnaire_data: Optional[Dict] = None,
+                              medical_file: Optional[Any] = None,
+                              report_id: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a prediction job on the backend and return its ``job_id``.
+
+        The request returns as soon as the backend has accepted the upload, so
+        no script thread is held while OCR and the models run. While a job is
+        running, submitting the same payload again returns the same
+        ``job_id`` with ``"coalesced": True`` instead of queueing a duplicate.
+        """
+        key = self._payload_key(questionnaire_data, medical_file, report_id)
+        result, coalesced = self._jobs.do(
+            key, self._submit_job, questionnaire_data, medical_file, report_id,
+            hold=lambda submission: submission.get("success") and submission.get("job_id")
+        )
+        if not coalesced and result.get("success") and result.get("job_id"):
+            with self._job_keys_lock:
+                self._job_keys[result["job_id"]] = key
+        return {**result, "coalesced": coalesced}
+
+    def _submit_job(self, questionnaire_data: Optional[Dict], medical_file: Optional[Any],
+                    report_id: Optional[str]) -> Dict[str, Any]:
+        try:
+            response, resent = self._send_prediction(
+                self._url(Config.ENDPOINTS['jobs']), questionnaire_data, medical_file, report_id
+            )
+            return self._prediction_result(response, resent)
+        except Exception as e:
+            return self._handle_exception(e)
+
+    def _job_finished(self, job_id: str):
+        """A job reached a final state; identical submissions start a new one from now on"""
+        with self._job_keys_lock:
+            key = self._job_keys.pop(job_id, None)
+        if key is not None:
+            self._jobs.forget(key)
+
+    def get_job_status(self, job_id: str, wait: float = 0) -> Dict[str, Any]:
+        """Get a job's ``status``/``stage``/``progress``.
+
+        With ``wait`` the backend may hold the request open (long-poll) until
+        the job changes state or ``wait`` seconds pass.
+        """
+        try:
+            response = self.session.get(
+                self._url(f"{Config.ENDPOINTS['jobs']}/{job_id}"),
+                params={"wait": wait} if wait else None,
+                timeout=self._timeout(self.timeout[1] + wait)
             )
-        
-        response = self.session.post(url, files=files)
-        return response.json()
-        
-    except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+            status = self._handle_response(response)
+        except Exception as e:
+            return self._handle_exception(e)
+        if status.get("status") in ("done", "failed") or status.get("status_code") == 404:
+            self._job_finished(job_id)
+        return status
+
+    def get_job_result(self, job_id: str) -> Dict[str, Any]:
+        """Fetch the prediction result of a finished job"""
+        try:
+            response = self.session.get(
+                self._url(f"{Config.ENDPOINTS['jobs']}/{job_id}/result"),
+                timeout=self._timeout()
+            )
+            return self._handle_response(response)
+        except Exception as e:
+            return self._handle_exception(e)
+
+    def make_questionnaire_prediction(self, questionnaire_data: Dict) -> Dict[str, Any]:
+        """Make prediction using only questionnaire data"""
+        try:
+            response = self.session.post(
+                self._url(Config.ENDPOINTS['predict_questionnaire']),
+                data=questionnaire_data,
+                timeout=self._timeout()
+            )
+            return self._handle_response(response)
+        except Exception as e:
+            return self._handle_exception(e)
+
+    def predict_batch(self, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Score a chunk of questionnaire rows in one request.
+
+        The backend answers with one ``results`` entry per row, in order, each
+        either a prediction or ``{"success": False, "error": ...}``.
+        """
+        try:
+            response = self.session.post(
+                self._url(Config.ENDPOINTS['predict_batch']),
+                json={"rows": rows},
+                timeout=self._timeout()
+            )
+            return self._handle_response(response)
+        except Exception as e:
+            return self._handle_exception(e)
+
+    def test_file_upload(self, medical_file: Any) -> Dict[str, Any]:
+        """Test file upload functionality"""
+        try:
+            files = {'medical_report': self._prepare_file(medical_file, 'test_file')}
+            response = self._post_form(self._url(Config.ENDPOINTS['test_upload']), {}, files)
+            return self._handle_response(response)
+        except Exception as e:
+            return self._handle_exception(e)
+
+
+@st.cache_resource
+def get_api_client(base_url: str = Config.BACKEND_BASE_URL) -> APIClient:
+    """Get the API client (and connection pool) shared by every session"""
+    return APIClient(base_url)
@@ -0,0 +1,236 @@
+"""
+Batch screening: score a CSV/Parquet export of questionnaire rows.
+
+Rows are encoded locally with the shared feature encoder (answers may be
+numbers or labels such as "Sometimes"/"Yes"), sent to the backend's batch
+endpoint in chunks with a bounded number of requests in flight, and written
+to the output file (CSV, or JSON lines for ``.jsonl``) in input order as
+each chunk completes:
+
+    python -m services.batch patients.csv results.csv --max-in-flight 4
+    python -m services.batch patients.parquet results.csv --stub
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from config import Config
+from services.api_client import APIClient
+from services.feature_encoder import FEATURE_NAMES, encode_features
+
+RESULT_FIELDS = ["row", "patient_id", "success", "stage", "condition", "confidence", "error"]
+ID_COLUMNS = ("patient_id", "id")
+
+
+@dataclass
+class BatchSummary:
+    """Running totals for a batch run"""
+    rows: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def _row_error(frame: pd.DataFrame, position: int, invalid: np.ndarray) -> str:
+    """Explain which answers of a row could not be encoded"""
+    errors = []
+    for field in np.asarray(FEATURE_NAMES)[invalid]:
+        value = frame[field].iat[position] if field in frame.columns else None
+        if value is None or value == "" or (isinstance(value, float) and math.isnan(value)):
+            errors.append(f"{field}: missing")
+        else:
+            errors.append(f"{field}: invalid answer {value!r}")
+    return "; ".join(errors)
+
+
+def read_rows(source: Any, chunk_size: int = Config.BATCH_CHUNK_SIZE,
+              name: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Read a CSV or Parquet file (path or file object) in chunks of ``chunk_size`` rows"""
+    name = name or getattr(source, "name", None) or str(source)
+    if name.lower().endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet files requires the 'pyarrow' package")
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        # Read as text so the encoder sees exactly what the file contains
+        yield from pd.read_csv(source, chunksize=chunk_size, dtype=str, keep_default_na=False)
+
+
+@contextmanager
+def open_result_writer(path: str):
+    """Open an output file and yield a ``write(rows)`` function that appends and flushes"""
+    jsonl = path.lower().endswith(".jsonl")
+    with open(path, "w", newline="", encoding="utf-8") as output:
+        writer = None if jsonl else csv.DictWriter(output, fieldnames=RESULT_FIELDS)
+        if writer:
+            writer.writeheader()
+
+        def write(rows: List[Dict[str, Any]]):
+            for row in rows:
+                if writer:
+                    writer.writerow(row)
+                else:
+                    output.write(json.dumps(row) + "\n")
+            output.flush()
+
+        yield write
+
+
+class BatchRunner:
+    """Scores questionnaire rows in chunks with a bounded number of requests in flight"""
+
+    def __init__(self, api_client: APIClient, chunk_size: int = Config.BATCH_CHUNK_SIZE,
+                 max_in_flight: int = Config.BATCH_MAX_IN_FLIGHT):
+        self.api_client = api_client
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+
+    def run(self, frames: Iterable[pd.DataFrame], write: Callable[[List[Dict[str, Any]]], None],
+            progress_callback: Optional[Callable[[BatchSummary], None]] = None) -> BatchSummary:
+        """Score every row and pass results to ``write`` one chunk at a time, in input order.
+
+        At most ``max_in_flight`` chunks are outstanding, so memory stays bounded
+        by ``chunk_size * max_in_flight`` rows however large the input is.
+        """
+        summary = BatchSummary()
+        started = time.perf_counter()
+        pending: Deque[Tuple[List[Dict[str, Any]], Optional[Future]]] = deque()
+
+        def drain():
+            entries, future = pending.popleft()
+            results = self._merge(entries, future.result() if future else None)
+            write(results)
+            for result in results:
+                summary.rows += 1
+                if result["success"]:
+                    summary.succeeded += 1
+                else:
+                    summary.failed += 1
+            summary.elapsed = time.perf_counter() - started
+            if progress_callback:
+                progress_callback(summary)
+
+        with ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="batch") as executor:
+            for entries in self._chunks(frames):
+                valid = [entry["fields"] for entry in entries if entry["fields"] is not None]
+                future = executor.submit(self.api_client.predict_batch, valid) if valid else None
+                pending.append((entries, future))
+                if len(pending) >= self.max_in_flight:
+                    drain()
+            while pending:
+                drain()
+
+        summary.elapsed = time.perf_counter() - started
+        return summary
+
+    def _chunks(self, frames: Iterable[pd.DataFrame]) -> Iterator[List[Dict[str, Any]]]:
+        """Encoded row entries, ``chunk_size`` at a time"""
+        chunk: List[Dict[str, Any]] = []
+        row_number = 0
+        for frame in frames:
+            frame = frame.reset_index(drop=True)
+            features = encode_features(frame)
+            invalid = np.isnan(features)
+            id_column = next((column for column in ID_COLUMNS if column in frame.columns), None)
+            for position in range(len(frame)):
+                row_number += 1
+                if invalid[position].any():
+                    fields, error = None, _row_error(frame, position, invalid[position])
+                else:
+                    fields, error = dict(zip(FEATURE_NAMES, features[position].astype(int).tolist())), None
+                chunk.append({
+                    "row": row_number,
+                    "patient_id": str(frame[id_column].iat[position]) if id_column else "",
+                    "fields": fields,
+                    "error": error
+                })
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _merge(entries: List[Dict[str, Any]], response: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Line backend results up with their input rows"""
+        valid = [entry for entry in entries if entry["fields"] is not None]
+        results = (response or {}).get("results") or []
+        if response is not None and not response.get("success", True):
+            batch_error = response.get("error", "Batch request failed")
+        elif len(results) != len(valid):
+            batch_error = f"Backend returned {len(results)} results for {len(valid)} rows"
+        else:
+            batch_error = None
+        by_row = {} if batch_error else {id(entry): result for entry, result in zip(valid, results)}
+
+        rows = []
+        for entry in entries:
+            row = {"row": entry["row"], "patient_id": entry["patient_id"], "success": False,
+                   "stage": "", "condition": "", "confidence": "", "error": entry["error"] or ""}
+            if entry["fields"] is not None:
+                result = by_row.get(id(entry), {"success": False, "error": batch_error})
+                if result.get("success"):
+                    predictions = result.get("predictions", {})
+                    row.update(success=True, stage=predictions.get("stage", ""),
+                               condition=predictions.get("condition", ""),
+                               confidence=predictions.get("confidence", ""))
+                else:
+                    row["error"] = result.get("error") or "Prediction failed"
+            rows.append(row)
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet of questionnaire rows")
+    parser.add_argument("input", help="CSV or Parquet file with one questionnaire per row")
+    parser.add_argument("output", help="Result file (.csv, or .jsonl for JSON lines)")
+    parser.add_argument("--backend", default=Config.BACKEND_BASE_URL)
+    parser.add_argument("--chunk-size", type=int, default=Config.BATCH_CHUNK_SIZE)
+    parser.add_argument("--max-in-flight", type=int, default=Config.BATCH_MAX_IN_FLIGHT)
+    parser.add_argument("--stub", action="store_true",
+                        help="Score against a local stand-in backend (offline throughput runs)")
+    args = parser.parse_args()
+
+    stub = None
+    backend_url = args.backend
+    if args.stub:
+        from services.stub_backend import StubBackend
+        stub = StubBackend().start()
+        backend_url = stub.url
+
+    client = APIClient(backend_url, pool_size=max(args.max_in_flight, 1))
+    try:
+        runner = BatchRunner(client, args.chunk_size, args.max_in_flight)
+        with open_result_writer(args.output) as write:
+            summary = runner.run(
+                read_rows(args.input, args.chunk_size), write,
+                lambda progress: print(f"\r{progress.rows} rows scored", end="", flush=True)
+            )
+    finally:
+        client.close()
+        if stub:
+            stub.stop()
+
+    print(f"\n{summary.rows} rows: {summary.succeeded} scored, {summary.failed} failed "
+          f"in {summary.elapsed:.1f}s ({summary.rows_per_second:.0f} rows/s) -> {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
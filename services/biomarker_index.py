@@ -0,0 +1,211 @@
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import streamlit as st
+from config import Config
+from services.biomarkers import MARKERS
+
+# How labs actually label the markers in services/biomarkers.py, beyond its exact patterns
+SPELLINGS = {
+    "total_protein": ["total protein", "protein total", "serum protein", "tp", "total serum protein"],
+    "albumin": ["albumin", "serum albumin", "alb"],
+    "keratin": ["keratin", "hair keratin"],
+    "vitamin_d": ["vitamin d", "vit d", "vit d3", "vitamin d3", "vitamin d total", "25 oh vitamin d",
+                  "25 hydroxy vitamin d", "vitamin d 25 hydroxy", "25 oh d", "calcidiol", "cholecalciferol"],
+    "vitamin_b12": ["vitamin b12", "vit b12", "b12", "cobalamin", "cyanocobalamin"],
+    "folate": ["folate", "folic acid", "serum folate"],
+    "biotin": ["biotin", "vitamin b7", "vit b7", "vitamin h"],
+    "ferritin": ["ferritin", "serum ferritin"],
+    "iron": ["iron", "serum iron", "iron serum", "fe"],
+    "hemoglobin": ["hemoglobin", "haemoglobin", "hgb", "hb"],
+    "zinc": ["zinc", "serum zinc", "plasma zinc", "zn"],
+    "alt": ["alt", "sgpt", "alt sgpt", "alanine aminotransferase", "alanine transaminase"],
+    "ast": ["ast", "sgot", "ast sgot", "aspartate aminotransferase", "aspartate transaminase"],
+    "alp": ["alp", "alkaline phosphatase", "alk phos"],
+    "ggt": ["ggt", "gamma gt", "gamma glutamyl transferase", "gamma glutamyltransferase"],
+    "bilirubin": ["bilirubin", "total bilirubin", "bilirubin total", "t bili"],
+    "tsh": ["tsh", "thyroid stimulating hormone", "thyrotropin"],
+    "free_t4": ["free t4", "ft4", "free thyroxine"],
+    "free_t3": ["free t3", "ft3", "free triiodothyronine"],
+    "dht": ["dht", "dihydrotestosterone"],
+    "testosterone": ["testosterone", "total testosterone", "testosterone total"],
+    "estradiol": ["estradiol", "oestradiol", "e2"],
+    "cortisol": ["cortisol", "serum cortisol", "am cortisol"],
+}
+# Analytes that look like markers but are not; they resolve to "no marker" instead of a near miss
+NOT_MARKERS = ["free testosterone", "iron binding capacity", "total iron binding capacity", "tibc",
+               "transferrin saturation", "hba1c", "hemoglobin a1c", "glucose", "creatinine", "sodium",
+               "potassium", "platelets", "prealbumin", "albumin globulin ratio", "direct bilirubin",
+               "vitamin b6", "vitamin a", "vitamin e", "free psa", "insulin"]
+
+# Characters OCR mistakes for one another; swapping them costs less than an arbitrary substitution
+OCR_CONFUSIONS = [("0", "o"), ("1", "l"), ("1", "i"), ("l", "i"), ("5", "s"), ("8", "b"), ("2", "z"),
+                  ("6", "b"), ("c", "e"), ("n", "h"), ("u", "v"), ("m", "n"), ("rn", "m"), ("cl", "d"),
+                  ("vv", "w")]
+_CONFUSION_COST = 0.4
+_CHAR_CONFUSIONS = {(a, b) for a, b in OCR_CONFUSIONS if len(a) == len(b) == 1}
+_CHAR_CONFUSIONS |= {(b, a) for a, b in _CHAR_CONFUSIONS}
+_PAIR_CONFUSIONS = {a: b for a, b in OCR_CONFUSIONS if len(a) == 2}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase words and digits separated by single spaces ("25-OH Vitamin-D" -> "25 oh vitamin d")"""
+    return _NON_WORD.sub(" ", text.lower().replace("µ", "u")).strip()
+
+
+def ocr_distance(a: str, b: str, limit: float = float("inf")) -> float:
+    """Levenshtein distance where OCR confusions (0/o, 1/l, rn/m, ...) cost less than other edits.
+
+    Gives up as soon as the distance must exceed ``limit`` and returns a value above it.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    # The "rn" of one string that may stand for the "m" of the other, looked up once per position
+    pairs_b = [None, None] + [_PAIR_CONFUSIONS.get(b[j - 2:j]) for j in range(2, len(b) + 1)]
+    previous = [float(j) for j in range(len(b) + 1)]
+    before_previous: List[float] = []
+    for i in range(1, len(a) + 1):
+        char = a[i - 1]
+        pair_a = _PAIR_CONFUSIONS.get(a[i - 2:i]) if i > 1 else None
+        current = [float(i)] + [0.0] * len(b)
+        for j in range(1, len(b) + 1):
+            if char == b[j - 1]:
+                best = previous[j - 1]
+            else:
+                best = previous[j - 1] + (_CONFUSION_COST if (char, b[j - 1]) in _CHAR_CONFUSIONS else 1.0)
+                if previous[j] + 1 < best:
+                    best = previous[j] + 1
+                if current[j - 1] + 1 < best:
+                    best = current[j - 1] + 1
+                # "rn" read for "m" (and the like): two characters for one
+                if pair_a is not None and pair_a == b[j - 1] and before_previous[j - 1] + _CONFUSION_COST < best:
+                    best = before_previous[j - 1] + _CONFUSION_COST
+                if pairs_b[j] is not None and pairs_b[j] == char and previous[j - 2] + _CONFUSION_COST < best:
+                    best = previous[j - 2] + _CONFUSION_COST
+            current[j] = best
+        # A pair confusion can reach the next row from this one's predecessor, so both bound the result
+        lower_bound = min(min(current), min(previous))
+        if lower_bound > limit:
+            return lower_bound
+        before_previous, previous = previous, current
+    return previous[-1]
+
+
+def _grams(text: str, n: int) -> List[str]:
+    padded = f" {text} "
+    return [padded[i:i + n] for i in range(len(padded) - n + 1)]
+
+
+@dataclass(frozen=True)
+class NameMatch:
+    """A noisy name resolved to a catalog spelling (``key`` is None for known non-markers)"""
+    key: Optional[str]
+    spelling: str
+    similarity: float
+
+
+class BiomarkerIndex:
+    """Character n-gram index from lab spellings to canonical marker keys.
+
+    A lookup only visits the entries that share an n-gram with the query
+    (via an inverted index), keeps the ones whose n-gram overlap could reach
+    ``min_similarity``, and verifies the best few with an OCR-aware edit
+    distance, so its cost grows with the number of similar names rather than
+    the size of the catalog.
+    """
+
+    def __init__(self, spellings: Dict[Optional[str], Iterable[str]], n: int = 3,
+                 min_similarity: float = Config.BIOMARKER_MATCH_MIN_SIMILARITY,
+                 max_verified: int = 8, memo_size: int = Config.BIOMARKER_INDEX_MEMO_SIZE):
+        self.n = n
+        self.min_similarity = min_similarity
+        self.max_verified = max_verified
+        self.memo_size = memo_size
+
+        self._entries: List[Tuple[Optional[str], str, int]] = []  # key, spelling, gram count
+        self._exact: Dict[str, Optional[str]] = {}
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for key, names in spellings.items():
+            for name in names:
+                spelling = normalize_name(name)
+                if not spelling or spelling in self._exact:
+                    continue
+                self._exact[spelling] = key
+                grams = set(_grams(spelling, n))
+                for gram in grams:
+                    self._postings[gram].append(len(self._entries))
+                self._entries.append((key, spelling, len(grams)))
+
+        self._memo: "OrderedDict[str, Optional[NameMatch]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, name: str) -> Optional[NameMatch]:
+        """Best catalog match for a (possibly misspelled or OCR-garbled) name, or None"""
+        query = normalize_name(name)
+        with self._lock:
+            if query in self._memo:
+                self._memo.move_to_end(query)
+                return self._memo[query]
+        match = self._lookup(query)
+        with self._lock:
+            self._memo[query] = match
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return match
+
+    def _lookup(self, query: str) -> Optional[NameMatch]:
+        if query in self._exact:
+            return NameMatch(self._exact[query], query, 1.0)
+        # Abbreviations are too short for n-grams to tell apart; they only match exactly
+        if len(query) < 4:
+            return None
+
+        grams = set(_grams(query, self.n))
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for entry in self._postings.get(gram, ()):
+                shared[entry] += 1
+
+        # An edit changes at most n grams, so entries sharing too few grams can't reach min_similarity
+        candidates = []
+        for entry, count in shared.items():
+            key, spelling, entry_grams = self._entries[entry]
+            max_edits = (1 - self.min_similarity) * max(len(query), len(spelling)) / _CONFUSION_COST
+            if count >= max(len(grams), entry_grams) - self.n * max_edits:
+                candidates.append((count / (len(grams) + entry_grams - count), entry))
+        candidates.sort(reverse=True)
+
+        best: Optional[NameMatch] = None
+        for _, entry in candidates[:self.max_verified]:
+            key, spelling, _ = self._entries[entry]
+            length = max(len(query), len(spelling))
+            # Only a closer match than the best so far is worth finishing the distance for
+            floor = best.similarity if best is not None else self.min_similarity
+            distance = ocr_distance(query, spelling, limit=(1 - floor) * length)
+            similarity = 1 - distance / length
+            if similarity >= self.min_similarity and (best is None or similarity > best.similarity):
+                best = NameMatch(key, spelling, round(similarity, 3))
+        return best
+
+
+def catalog_spellings() -> Dict[Optional[str], List[str]]:
+    """Every known spelling per marker key (None: look-alike analytes that are not markers)"""
+    spellings: Dict[Optional[str], List[str]] = {key: list(names) for key, names in SPELLINGS.items()}
+    for marker in MARKERS:
+        spellings.setdefault(marker.key, []).append(marker.label)
+    spellings[None] = list(NOT_MARKERS)
+    return spellings
+
+
+@st.cache_resource
+def get_biomarker_index() -> BiomarkerIndex:
+    """Get the biomarker name index shared by every session in this process"""
+    return BiomarkerIndex(catalog_spellings())
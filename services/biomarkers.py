@@ -0,0 +1,235 @@
+"""
+Client-side biomarker extraction for text reports (TXT, PDF text layers, manual input).
+
+Every marker the UI asks for (proteins, keratin, vitamins, iron/ferritin,
+zinc, liver enzymes, hormones) is matched by one precompiled pattern that
+also captures an optional comparison, the value and the unit. Values are
+converted to each marker's canonical unit and given a confidence from how
+well unit and magnitude fit the marker. The result is sent to the backend as
+a ``biomarkers`` JSON form field so it can skip its own text pipeline.
+"""
+import json
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from config import Config
+
+if TYPE_CHECKING:
+    from services.biomarker_index import BiomarkerIndex
+
+
+@dataclass(frozen=True)
+class Marker:
+    """A biomarker: how it is written, its canonical unit and plausible range"""
+    key: str
+    label: str
+    pattern: str
+    unit: Optional[str]  # canonical unit; None accepts whatever unit is reported
+    conversions: Dict[str, float]  # normalized unit -> factor to the canonical unit
+    plausible: Optional[Tuple[float, float]] = None
+
+
+MARKERS = [
+    Marker("total_protein", "Total Protein", r"total\s+protein|serum\s+protein|protein,?\s+total",
+           "g/dL", {"g/dl": 1, "g/l": 0.1}, (3, 12)),
+    Marker("albumin", "Albumin", r"(?:serum\s+)?albumin(?!\s*/)", "g/dL", {"g/dl": 1, "g/l": 0.1}, (1.5, 7)),
+    Marker("keratin", "Keratin", r"(?:hair\s+)?keratin", None, {}),
+    Marker("vitamin_d", "Vitamin D (25-OH)",
+           r"(?:25[-\s]?(?:\(oh\)|oh|hydroxy)\s*)?vitamin\s*d[23]?(?:,?\s*25[-\s]?(?:\(oh\)|oh|hydroxy))?"
+           r"|25\(oh\)\s*d|calcidiol",
+           "ng/mL", {"ng/ml": 1, "ug/l": 1, "nmol/l": 0.4006}, (3, 150)),
+    Marker("vitamin_b12", "Vitamin B12", r"vitamin\s*b[-\s]?12|cyanocobalamin|cobalamin",
+           "pg/mL", {"pg/ml": 1, "ng/l": 1, "pmol/l": 1.355}, (50, 3000)),
+    Marker("folate", "Folate", r"folate|folic\s+acid", "ng/mL", {"ng/ml": 1, "ug/l": 1, "nmol/l": 0.441}, (0.5, 40)),
+    Marker("biotin", "Biotin", r"biotin|vitamin\s*b[-\s]?7", "ng/L", {"ng/l": 1, "pg/ml": 1}, (50, 5000)),
+    Marker("ferritin", "Ferritin", r"(?:serum\s+)?ferritin",
+           "ng/mL", {"ng/ml": 1, "ug/l": 1, "pmol/l": 0.445}, (1, 5000)),
+    Marker("iron", "Serum Iron", r"(?:serum\s+)?iron(?!\s*(?:binding|saturation|sat\b))",
+           "µg/dL", {"ug/dl": 1, "umol/l": 5.585}, (5, 500)),
+    Marker("hemoglobin", "Hemoglobin", r"ha?emoglobin(?!\s*a1c)|hgb|hb(?!a1c)",
+           "g/dL", {"g/dl": 1, "g/l": 0.1, "mmol/l": 1.611}, (3, 25)),
+    Marker("zinc", "Zinc", r"(?:serum\s+|plasma\s+)?zinc|zn", "µg/dL", {"ug/dl": 1, "umol/l": 6.54}, (20, 300)),
+    Marker("alt", "ALT (SGPT)", r"alt|sgpt|alanine\s+(?:amino)?transaminase|alanine\s+aminotransferase",
+           "U/L", {"u/l": 1, "iu/l": 1}, (1, 2000)),
+    Marker("ast", "AST (SGOT)", r"ast|sgot|aspartate\s+(?:amino)?transaminase|aspartate\s+aminotransferase",
+           "U/L", {"u/l": 1, "iu/l": 1}, (1, 2000)),
+    Marker("alp", "Alkaline Phosphatase", r"alp|alkaline\s+phosphatase", "U/L", {"u/l": 1, "iu/l": 1}, (10, 2000)),
+    Marker("ggt", "GGT", r"ggt|gamma[-\s]?gt|gamma[-\s]?glutamyl\s*transferase",
+           "U/L", {"u/l": 1, "iu/l": 1}, (1, 2000)),
+    Marker("bilirubin", "Total Bilirubin", r"(?:total\s+)?bilirubin(?:,?\s*total)?",
+           "mg/dL", {"mg/dl": 1, "umol/l": 0.0585}, (0.05, 30)),
+    Marker("tsh", "TSH", r"tsh|thyroid[-\s]stimulating\s+hormone",
+           "mIU/L", {"miu/l": 1, "uiu/ml": 1}, (0.005, 100)),
+    Marker("free_t4", "Free T4", r"free\s+t4|ft4|free\s+thyroxine", "ng/dL", {"ng/dl": 1, "pmol/l": 0.0777}, (0.1, 8)),
+    Marker("free_t3", "Free T3", r"free\s+t3|ft3|free\s+triiodothyronine",
+           "pg/mL", {"pg/ml": 1, "pmol/l": 0.651}, (0.5, 20)),
+    Marker("dht", "Dihydrotestosterone", r"dht|dihydrotestosterone",
+           "pg/mL", {"pg/ml": 1, "ng/l": 1, "ng/dl": 10, "nmol/l": 290.4}, (10, 2000)),
+    Marker("testosterone", "Total Testosterone", r"(?<!free\s)(?:total\s+)?testosterone(?:,?\s*total)?",
+           "ng/dL", {"ng/dl": 1, "nmol/l": 28.84}, (2, 2000)),
+    Marker("estradiol", "Estradiol", r"o?estradiol|e2", "pg/mL", {"pg/ml": 1, "ng/l": 1, "pmol/l": 0.2724}, (1, 5000)),
+    Marker("cortisol", "Cortisol", r"cortisol", "µg/dL", {"ug/dl": 1, "nmol/l": 0.03625}, (0.5, 80)),
+]
+MARKERS_BY_KEY = {marker.key: marker for marker in MARKERS}
+
+# Name, then on the same line: up to two parenthesized notes (abbreviation,
+# specimen, reference range), filler such as ":" or "....", an optional
+# comparison, the value and an optional unit
+# Spellings start with a letter (or the 2 of "25-OH"); the lookahead lets the scanner skip
+# digits, spaces and punctuation without trying every alternative there
+_NAME_START = "a-z2"
+_VALUE = r"[^\S\n]*(?P<qualifier>[<>≤≥]=?)?[^\S\n]*(?P<value>\d+(?:[.,]\d+)?)(?![\d.,]*[-–/]\d)"
+_UNIT = r"[^\S\n]*(?P<unit>(?:[munpµμ]|mc)?(?:g|mol|iu|u)/(?:d?l|ml)\b|%)?"
+
+_REPORT_LINE_PATTERN = (
+    rf"(?=[{_NAME_START}])(?<![\w-])(?P<name>" + "|".join(f"(?P<m_{marker.key}>{marker.pattern})" for marker in MARKERS) + r")(?!\w)"
+    r"(?:[^\S\n]*\([^)\n]{0,30}\)){0,2}[^\d<>≤≥\n]{0,25}?" + _VALUE + _UNIT
+)
+# Matching lowercased text is ~2.5x faster than IGNORECASE, which case-folds every comparison
+_REPORT_LINE = re.compile(_REPORT_LINE_PATTERN)
+_REPORT_LINE_ANY_CASE = re.compile(_REPORT_LINE_PATTERN, re.IGNORECASE)
+_MARKER_GROUPS = [(marker, _REPORT_LINE.groupindex[f"m_{marker.key}"]) for marker in MARKERS]
+_markers_by_name: Dict[str, Marker] = {}  # matched spelling -> marker; reports reuse a handful of spellings
+# Fallback for lines the exact patterns miss (OCR noise, unusual spellings): a short label at
+# the start of a line, a separator, the value and an optional unit; the label goes to the name index
+_LABELLED_VALUE = re.compile(
+    r"^[^\S\n]*(?P<label>[^\W_][^\n:=<>≤≥]{0,40}?)(?:[^\S\n]*\([^)\n]{0,30}\))?"
+    r"(?:[^\S\n]*[:=.]+[^\S\n]*|[^\S\n]+)" + _VALUE + _UNIT,
+    re.MULTILINE | re.IGNORECASE)
+_THOUSANDS = re.compile(r",\d{3}$")
+
+
+@dataclass(frozen=True)
+class BiomarkerValue:
+    """One extracted measurement, converted to the marker's canonical unit"""
+    key: str
+    label: str
+    value: float
+    unit: Optional[str]
+    confidence: float
+    raw: str
+    qualifier: Optional[str] = None
+
+    def as_field(self) -> Dict[str, Any]:
+        field = {"value": self.value, "unit": self.unit, "confidence": self.confidence}
+        if self.qualifier:
+            field["qualifier"] = self.qualifier
+        return field
+
+
+def normalize_unit(unit: str) -> str:
+    normalized = unit.lower().replace("µ", "u").replace("μ", "u")
+    return "u" + normalized[2:] if normalized.startswith("mc") else normalized
+
+
+def _parse_number(text: str) -> float:
+    if "," in text:
+        text = text.replace(",", "") if _THOUSANDS.search(text) else text.replace(",", ".")
+    return float(text)
+
+
+def _score(marker: Marker, value: float, unit: Optional[str], qualifier: Optional[str]) -> Tuple[float, float, Optional[str]]:
+    """Canonical value, confidence and canonical unit of one match"""
+    confidence = 0.6
+    canonical_unit = marker.unit
+    if marker.unit is None:
+        canonical_unit = unit
+    elif unit is not None:
+        factor = marker.conversions.get(normalize_unit(unit))
+        if factor is None:
+            # A unit this marker is never reported in: probably a neighbouring column's value
+            return value, 0.2, unit
+        value *= factor
+        confidence += 0.25
+
+    if marker.plausible is not None:
+        low, high = marker.plausible
+        confidence += 0.15 if low <= value <= high else -0.3
+    if qualifier:
+        confidence -= 0.1  # "<5" is a detection limit, not a measurement
+    return value, round(min(max(confidence, 0.0), 1.0), 2), canonical_unit
+
+
+def _keep(found: Dict[str, "BiomarkerValue"], marker: Marker, text: str, match: "re.Match",
+          similarity: float = 1.0):
+    """Score one matched line and keep it if it beats the marker's previous measurement"""
+    qualifier = match.group("qualifier")
+    unit = text[match.start("unit"):match.end("unit")] if match.start("unit") != -1 else None
+    value, confidence, canonical_unit = _score(marker, _parse_number(match.group("value")), unit, qualifier)
+    confidence = round(confidence * similarity, 2)
+    previous = found.get(marker.key)
+    if previous is None or confidence > previous.confidence:
+        found[marker.key] = BiomarkerValue(
+            key=marker.key,
+            label=marker.label,
+            value=round(value, 3),
+            unit=canonical_unit,
+            confidence=confidence,
+            raw=text[match.start():match.end()].strip(),
+            qualifier=qualifier
+        )
+
+
+def extract_biomarkers(text: str, index: Optional["BiomarkerIndex"] = None) -> Dict[str, BiomarkerValue]:
+    """Best-scoring measurement of every marker found in a report's text.
+
+    With a name ``index``, lines the exact patterns miss are retried with
+    their label resolved by the index (OCR noise, unusual spellings); those
+    values' confidence is scaled by how closely the label matched.
+    """
+    found: Dict[str, BiomarkerValue] = {}
+    matched_lines = set()
+    lowered = text.lower()
+    # A few characters change length when lowercased; then spans wouldn't line up with the original text
+    matches = _REPORT_LINE.finditer(lowered) if len(lowered) == len(text) else _REPORT_LINE_ANY_CASE.finditer(text)
+    for match in matches:
+        name = match.group("name").lower()
+        marker = _markers_by_name.get(name)
+        if marker is None:
+            marker = _markers_by_name[name] = next(marker for marker, group in _MARKER_GROUPS
+                                                   if match.start(group) != -1)
+        _keep(found, marker, text, match)
+        matched_lines.add(text.rfind("\n", 0, match.start()) + 1)
+
+    if index is not None:
+        for match in _LABELLED_VALUE.finditer(text):
+            if match.start() in matched_lines:
+                continue
+            resolved = index.lookup(match.group("label"))
+            if resolved is None or resolved.key is None:
+                continue
+            _keep(found, MARKERS_BY_KEY[resolved.key], text, match, resolved.similarity)
+    return found
+
+
+def biomarker_fields(values: Dict[str, BiomarkerValue],
+                     min_confidence: float = Config.BIOMARKER_MIN_CONFIDENCE) -> Dict[str, str]:
+    """Prediction form fields for the confident measurements (empty if there are none)"""
+    confident = {key: value.as_field() for key, value in sorted(values.items()) if value.confidence >= min_confidence}
+    if not confident:
+        return {}
+    return {"biomarkers": json.dumps(confident, sort_keys=True, separators=(",", ":"))}
+
+
+def report_biomarkers(medical_file: Any, timeout: Optional[float] = None) -> Dict[str, BiomarkerValue]:
+    """Biomarkers of a TXT/PDF report whose text is available client-side.
+
+    Both the UI and the prediction payload read them from here, parsed once
+    per report digest. None are returned if extraction takes longer than
+    ``timeout``; the backend then reads the report itself.
+    """
+    from services.biomarker_index import get_biomarker_index
+    from services.prediction_cache import report_digest
+    from services.preview_cache import get_preview_cache
+    from services.text_extraction import get_text_extractor, is_text_report
+
+    if medical_file is None or not is_text_report(medical_file) or not hasattr(medical_file, 'getvalue'):
+        return {}
+    extracted = get_text_extractor().get(medical_file, timeout)
+    if extracted is None or not extracted.usable:
+        return {}
+    return get_preview_cache().get_or_build(
+        ("biomarkers", report_digest(medical_file)),
+        lambda: extract_biomarkers(extracted.text, get_biomarker_index())
+    )
@@ -0,0 +1,115 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+from config import Config
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling the backend while the circuit is open"""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"Backend circuit open; next attempt in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+@dataclass(frozen=True)
+class CircuitState:
+    """Snapshot of a circuit breaker for display"""
+    state: str
+    failures: int
+    opened_at: Optional[float] = None
+    retry_in: float = 0.0
+    last_error: Optional[str] = None
+
+    @property
+    def open(self) -> bool:
+        return self.state != CLOSED
+
+
+class CircuitBreaker:
+    """Process-wide breaker shared by every backend call.
+
+    After ``failure_threshold`` consecutive failed or slow calls the circuit
+    opens (only calls reported with a duration can be slow) and calls fail immediately with ``CircuitOpenError``. Once
+    ``reset_timeout`` seconds have passed it goes half-open: a single probe
+    call is let through, and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = Config.CIRCUIT_FAILURE_THRESHOLD,
+                 slow_call_seconds: float = Config.CIRCUIT_SLOW_CALL_SECONDS,
+                 reset_timeout: float = Config.CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def before_call(self) -> bool:
+        """Claim permission for one call; raises CircuitOpenError while open.
+
+        Returns True when the call is the half-open probe.
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            now = time.monotonic()
+            if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+            # A probe that never reported back (e.g. its thread died) doesn't hold the slot forever
+            if self._state == HALF_OPEN and (self._probe_started is None
+                                             or now - self._probe_started >= self.reset_timeout):
+                self._probe_started = now
+                return True
+            raise CircuitOpenError(self._retry_in(now))
+
+    def record(self, duration: Optional[float], error: Optional[str] = None):
+        """Report a finished call; slow calls count as failures.
+
+        ``duration`` is None for calls whose time depends on their payload
+        (uploads, predictions, streamed responses): they only count if they fail.
+        """
+        if error is None and duration is not None and duration > self.slow_call_seconds:
+            error = f"Slow response ({duration:.1f}s)"
+        with self._lock:
+            self._probe_started = None
+            if error is None:
+                self._state, self._failures, self._opened_at, self._last_error = CLOSED, 0, None, None
+                return
+            self._failures += 1
+            self._last_error = error
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state, self._opened_at = OPEN, time.monotonic()
+
+    def release(self):
+        """Give back a probe slot for a call that ended without reaching the backend"""
+        with self._lock:
+            self._probe_started = None
+
+    def snapshot(self) -> CircuitState:
+        with self._lock:
+            now = time.monotonic()
+            state = self._state
+            if state == OPEN and now - self._opened_at >= self.reset_timeout:
+                state = HALF_OPEN
+            return CircuitState(
+                state=state,
+                failures=self._failures,
+                opened_at=None if self._opened_at is None else time.time() - (now - self._opened_at),
+                retry_in=self._retry_in(now) if state == OPEN else 0.0,
+                last_error=self._last_error
+            )
+
+    def _retry_in(self, now: float) -> float:
+        if self._opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (now - self._opened_at))
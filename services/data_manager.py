@@ -1,6 +1,8 @@
 import streamlit as st
 from typing import Dict, Any, Optional
 from config import Config
+from services.feature_encoder import encode_record, pss_answered
+from services.session_store import open_session_file, store_session_file
 
 class DataManager:
     """Manage session data and state"""
@@ -36,14 +38,22 @@ class DataManager:
         return st.session_state.get(Config.SESSION_KEYS["questionnaire_data"])
     
     def save_medical_file(self, file_data: Any):
-        """Save uploaded medical file"""
-        st.session_state[Config.SESSION_KEYS["medical_file"]] = file_data
+        """Save uploaded medical file (the bytes go to the session blob store)"""
+        key = Config.SESSION_KEYS["medical_file"]
+        st.session_state[key] = store_session_file(key, file_data)
         st.session_state.medical_report_uploaded = True
         st.success("✅ Medical report uploaded successfully!")
     
     def get_medical_file(self) -> Optional[Any]:
-        """Get uploaded medical file"""
-        return st.session_state.get(Config.SESSION_KEYS["medical_file"])
+        """Get uploaded medical file as a readable handle"""
+        key = Config.SESSION_KEYS["medical_file"]
+        medical_file = open_session_file(st.session_state.get(key))
+        if medical_file is None and st.session_state.get(key) is not None:
+            # The idle sweep deleted it: stop showing the report as available
+            st.session_state[key] = None
+            st.session_state.medical_report_uploaded = False
+            st.warning("⚠️ Your saved medical report expired after a period of inactivity. Please upload it again.")
+        return medical_file
     
     def save_prediction_results(self, results: Dict[str, Any]):
         """Save prediction results"""
@@ -57,6 +67,7 @@ class DataManager:
         """Clear all session data"""
         for key in Config.SESSION_KEYS.values():
             st.session_state[key] = None
+        store_session_file(Config.SESSION_KEYS["medical_file"], None)
         
         st.session_state.questionnaire_completed = False
         st.session_state.medical_report_uploaded = False
@@ -102,8 +113,7 @@ class DataManager:
         
         if questionnaire_data:
             # Count PSS questions answered
-            pss_count = sum(1 for key in questionnaire_data.keys() if key.startswith("pss_"))
-            summary["questionnaire_questions_answered"] = pss_count
+            summary["questionnaire_questions_answered"] = int(pss_answered(encode_record(questionnaire_data))[0])
         
         if medical_file:
             summary["medical_file_name"] = getattr(medical_file, 'name', 'Unknown file')
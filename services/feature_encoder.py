@@ -0,0 +1,130 @@
+"""
+Questionnaire feature encoding shared by the UI, batch screening and benchmarks.
+
+Raw answers (PSS_SCALE labels or their index, Yes/No strings, booleans or
+0/1, age) become one float row per questionnaire in ``Config.QUESTIONNAIRE_FIELDS``
+order. PSS items in ``Config.PSS_REVERSED_ITEMS`` are reverse-scored. Missing
+or out-of-range answers encode as NaN.
+"""
+import math
+from typing import TYPE_CHECKING, Any, Dict, List, Union
+
+import numpy as np
+from config import Config
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FEATURE_NAMES: List[str] = list(Config.QUESTIONNAIRE_FIELDS)
+PSS_COLUMNS = [FEATURE_NAMES.index(f"pss_{i}") for i in range(1, 11)]
+REVERSED_COLUMNS = [FEATURE_NAMES.index(f"pss_{i}") for i in Config.PSS_REVERSED_ITEMS]
+PSS_REVERSE_TOTAL = min(Config.PSS_VALUES) + max(Config.PSS_VALUES)
+
+PSS_LABELS = {label.lower(): value for label, value in zip(Config.PSS_SCALE, Config.PSS_VALUES)}
+BINARY_LABELS = {label.lower(): value for label, value in Config.BINARY_ANSWERS.items()}
+BINARY_LABELS.update({"false": 0, "true": 1})
+
+Records = Union[Dict[str, Any], List[Dict[str, Any]], "pd.DataFrame"]
+
+
+def _field_kind(field: str) -> str:
+    if field.startswith("pss_"):
+        return "pss"
+    return "age" if field == "age" else "binary"
+
+
+_LABELS = {"pss": PSS_LABELS, "binary": BINARY_LABELS, "age": {}}
+FIELD_KINDS = [(field, _field_kind(field)) for field in FEATURE_NAMES]
+
+
+def _in_range(kind: str, values: np.ndarray) -> np.ndarray:
+    """Mask of valid answers for a column of candidate values"""
+    if kind == "pss":
+        return np.isin(values, Config.PSS_VALUES)
+    if kind == "binary":
+        return np.isin(values, list(Config.BINARY_ANSWERS.values()))
+    low, high = Config.AGE_RANGE
+    return (values >= low) & (values <= high)
+
+
+def _encode_value(kind: str, value: Any) -> float:
+    """Encode one raw answer; the single source of truth for non-numeric input"""
+    if isinstance(value, bool):
+        number = float(value)
+    else:
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = float(_LABELS[kind].get(str(value).strip().lower(), math.nan))
+
+    if kind == "age":
+        low, high = Config.AGE_RANGE
+        valid = low <= number <= high
+    else:
+        valid = number in (Config.PSS_VALUES if kind == "pss" else Config.BINARY_ANSWERS.values())
+    return number if valid else math.nan
+
+
+def _encode_column(kind: str, column: "pd.Series") -> np.ndarray:
+    """Vectorized answers -> floats for one column of many records"""
+    import pandas as pd
+
+    if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+        values = column.to_numpy(dtype=float, na_value=np.nan)
+        return np.where(_in_range(kind, values), values, np.nan)
+
+    # Free-text columns hold few distinct answers: encode each distinct value
+    # once with the scalar rules, then broadcast through the factorized codes
+    codes, uniques = pd.factorize(column, use_na_sentinel=True)
+    encoded = np.array([_encode_value(kind, value) for value in uniques] + [math.nan])
+    return encoded[codes]
+
+
+def _reverse_score(features: np.ndarray) -> np.ndarray:
+    features[:, REVERSED_COLUMNS] = PSS_REVERSE_TOTAL - features[:, REVERSED_COLUMNS]
+    return features
+
+
+def encode_record(record: Dict[str, Any]) -> np.ndarray:
+    """Feature vector for one questionnaire (no pandas, cheap enough for every rerun)"""
+    features = np.array([[_encode_value(kind, record.get(field)) for field, kind in FIELD_KINDS]])
+    return _reverse_score(features)[0]
+
+
+def encode_features(records: Records) -> np.ndarray:
+    """Feature matrix of shape ``(rows, len(FEATURE_NAMES))`` for one or many questionnaires"""
+    if isinstance(records, dict):
+        return encode_record(records)[np.newaxis, :]
+
+    # pandas is only needed for bulk input, so the UI's per-record path never loads it
+    import pandas as pd
+
+    if isinstance(records, pd.DataFrame):
+        frame = records
+    else:
+        # An explicit index keeps one row per record, even for records with no answers at all
+        frame = pd.DataFrame.from_records(records, index=range(len(records)))
+    frame = frame.reindex(columns=FEATURE_NAMES)
+    features = np.empty((len(frame), len(FEATURE_NAMES)), dtype=float)
+    for index, (field, kind) in enumerate(FIELD_KINDS):
+        features[:, index] = _encode_column(kind, frame[field])
+    return _reverse_score(features)
+
+
+def encode_form_data(record: Dict[str, Any]) -> Dict[str, int]:
+    """Backend form fields for one questionnaire; unanswered fields are left out"""
+    return {
+        field: int(value)
+        for field, value in zip(FEATURE_NAMES, encode_record(record))
+        if not math.isnan(value)
+    }
+
+
+def pss_scores(features: np.ndarray) -> np.ndarray:
+    """PSS-10 total (0-40) per row; unanswered items count as 0"""
+    return np.nansum(np.atleast_2d(features)[:, PSS_COLUMNS], axis=1)
+
+
+def pss_answered(features: np.ndarray) -> np.ndarray:
+    """Number of answered PSS items per row"""
+    return np.count_nonzero(~np.isnan(np.atleast_2d(features)[:, PSS_COLUMNS]), axis=1)
@@ -0,0 +1,131 @@
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, Any, Optional
+
+import requests
+import streamlit as st
+from config import Config
+from services.api_client import APIClient, get_api_client
+
+
+@dataclass(frozen=True)
+class HealthStatus:
+    """Snapshot of the last completed backend health probe"""
+    healthy: bool
+    checked_at: Optional[float] = None
+    error: Optional[str] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
+    stale: bool = False
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the probe completed, or None if it never ran"""
+        if self.checked_at is None:
+            return None
+        return max(0.0, time.time() - self.checked_at)
+
+    @property
+    def known(self) -> bool:
+        """Whether at least one probe has completed"""
+        return self.checked_at is not None
+
+
+class HealthMonitor:
+    """Process-wide backend health probe refreshed on a background thread.
+
+    Reruns read the last known status without touching the network; the
+    probe thread revalidates it every ``interval`` seconds.
+    """
+
+    def __init__(self, api_client: APIClient,
+                 interval: float = Config.HEALTH_CHECK_INTERVAL,
+                 timeout: float = Config.HEALTH_CHECK_TIMEOUT,
+                 stale_after: float = Config.HEALTH_STALE_AFTER):
+        self.api_client = api_client
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+        self._status = HealthStatus(healthy=False)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._first_probe = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "HealthMonitor":
+        """Start the background probe thread (idempotent)"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="backend-health-monitor", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background probe thread"""
+        self._stopped.set()
+        self._wakeup.set()
+
+    def refresh(self):
+        """Ask the probe thread to revalidate now instead of at the next interval"""
+        self._wakeup.set()
+
+    def probe(self) -> HealthStatus:
+        """Run one health probe synchronously and record its outcome"""
+        try:
+            response = self.api_client.health_check(timeout=self.timeout)
+            try:
+                payload = response.json()
+            except ValueError:
+                payload = {}
+            status = HealthStatus(
+                healthy=response.status_code == 200,
+                checked_at=time.time(),
+                error=None if response.status_code == 200 else f"HTTP {response.status_code}",
+                payload=payload if isinstance(payload, dict) else {}
+            )
+        except requests.exceptions.RequestException as e:
+            status = HealthStatus(healthy=False, checked_at=time.time(), error=str(e))
+        except Exception as e:
+            status = HealthStatus(healthy=False, checked_at=time.time(), error=f"Unexpected error: {str(e)}")
+
+        with self._lock:
+            self._status = status
+        self._first_probe.set()
+        return status
+
+    def get_status(self, wait: float = Config.HEALTH_INITIAL_WAIT) -> HealthStatus:
+        """Return the last known status immediately, flagged stale when old.
+
+        Only the very first call in a process may block, for at most ``wait``
+        seconds, while the initial probe completes.
+        """
+        self.start()
+        if not self._first_probe.is_set():
+            self._first_probe.wait(wait)
+
+        with self._lock:
+            status = self._status
+
+        age = status.age
+        if age is not None and age > self.stale_after:
+            # Stale-while-revalidate: serve the old status, nudge the prober
+            self.refresh()
+            return replace(status, stale=True)
+        return status
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self.probe()
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+
+
+@st.cache_resource
+def get_health_monitor(base_url: str = Config.BACKEND_BASE_URL) -> HealthMonitor:
+    """Get the health monitor shared by every session in this process"""
+    return HealthMonitor(get_api_client(base_url)).start()
@@ -0,0 +1,136 @@
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import streamlit as st
+from config import Config
+from services.prediction_cache import report_digest
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TYPES = {"png", "jpg", "jpeg"}
+
+
+@dataclass(frozen=True)
+class NormalizedImage:
+    """An image report re-encoded for OCR, with before/after statistics"""
+    data: bytes
+    filename: str
+    content_type: str
+    original_bytes: int
+    original_size: Tuple[int, int]
+    size: Tuple[int, int]
+    elapsed: float
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+    @property
+    def pixels_saved_ratio(self) -> float:
+        """Share of pixels the backend no longer has to run OCR over"""
+        original = self.original_size[0] * self.original_size[1]
+        return 1 - (self.size[0] * self.size[1]) / original if original else 0.0
+
+
+def is_image_report(medical_file: Any) -> bool:
+    name = getattr(medical_file, 'name', '') or ''
+    return name.rsplit('.', 1)[-1].lower() in IMAGE_TYPES if '.' in name else False
+
+
+def normalize_report_image(data: bytes, filename: str = "report.jpg",
+                           target_dpi: int = Config.OCR_TARGET_DPI) -> NormalizedImage:
+    """Orient, grayscale, downsample and re-encode a photographed report.
+
+    The long edge is capped at ``target_dpi`` times the long edge of an A4
+    page, which is all the resolution OCR needs. JPEG sources are decoded in
+    draft mode straight at (close to) the target scale. If re-encoding does not
+    make the payload smaller the original bytes are kept.
+    """
+    from PIL import Image, ImageOps  # only loaded once an image report shows up
+
+    started = time.perf_counter()
+    max_edge = int(target_dpi * Config.OCR_PAGE_LONG_EDGE_INCHES)
+
+    with Image.open(io.BytesIO(data)) as image:
+        original_size = image.size
+        source_type = Image.MIME.get(image.format, "application/octet-stream")
+        scale = max_edge / max(original_size)
+        if scale < 1:
+            image.draft("L", (int(original_size[0] * scale), int(original_size[1] * scale)))
+
+        processed = ImageOps.exif_transpose(image).convert("L")
+        if max(processed.size) > max_edge:
+            processed.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+        output = io.BytesIO()
+        processed.save(output, format="JPEG", quality=Config.OCR_JPEG_QUALITY, optimize=True)
+        size = processed.size
+
+    stem = os.path.splitext(filename)[0]
+    if output.tell() < len(data):
+        encoded, name, content_type = output.getvalue(), f"{stem}.jpg", "image/jpeg"
+    else:
+        encoded, name, content_type, size = data, filename, source_type, original_size
+
+    return NormalizedImage(
+        data=encoded,
+        filename=name,
+        content_type=content_type,
+        original_bytes=len(data),
+        original_size=original_size,
+        size=size,
+        elapsed=time.perf_counter() - started
+    )
+
+
+class ImageNormalizer:
+    """Runs image normalization on a worker pool and memoizes it by report digest"""
+
+    def __init__(self, max_workers: int = Config.IMAGE_WORKERS,
+                 max_entries: int = Config.IMAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-normalizer")
+        self._results: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, medical_file: Any, digest: Optional[str] = None) -> Future:
+        """Start normalizing an image report off the calling thread"""
+        digest = digest or report_digest(medical_file)
+        with self._lock:
+            future = self._results.get(digest)
+            if future is None:
+                # getvalue() shares the upload's bytes instead of racing on its file position
+                data = medical_file.getvalue()
+                future = self._executor.submit(
+                    normalize_report_image, data, getattr(medical_file, 'name', 'report.jpg')
+                )
+                self._results[digest] = future
+            self._results.move_to_end(digest)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return future
+
+    def get(self, medical_file: Any, timeout: Optional[float] = None) -> Optional[NormalizedImage]:
+        """Normalized image for a report; None if not ready within ``timeout`` or failed"""
+        future = self.submit(medical_file)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            logger.warning("Image normalization failed: %s", e)
+            return None
+
+
+@st.cache_resource
+def get_image_normalizer() -> ImageNormalizer:
+    """Get the image normalizer shared by every session in this process"""
+    return ImageNormalizer()
+
@@ -0,0 +1,261 @@
+"""
+Lightweight timing metrics for the app's hot paths.
+
+Enable with ``HAIRFALL_METRICS=1``. Observations are aggregated into
+Prometheus-style histograms and, if configured, exported in the background:
+
+* ``HAIRFALL_METRICS_PROM``: Prometheus text file, rewritten every
+  ``METRICS_EXPORT_INTERVAL`` seconds (e.g. for node_exporter's textfile
+  collector)
+* ``HAIRFALL_METRICS_JSONL``: one JSON line per observation, appended
+
+When disabled, ``timed`` and ``timer`` cost one attribute check per call.
+
+Summarize a JSON lines export:
+
+    python -m services.metrics summary metrics.jsonl
+"""
+import argparse
+import atexit
+import bisect
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # the last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+
+class _NullTimer:
+    """Shared no-op timer handed out while metrics are disabled"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("registry", "name", "labels", "started")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, Any]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.registry.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Thread-safe histograms of durations (seconds), keyed by metric name and labels"""
+
+    def __init__(self, enabled: bool = Config.METRICS_ENABLED,
+                 buckets: Tuple[float, ...] = Config.METRICS_BUCKETS,
+                 prometheus_path: Optional[str] = Config.METRICS_PROMETHEUS_PATH,
+                 jsonl_path: Optional[str] = Config.METRICS_JSONL_PATH,
+                 export_interval: float = Config.METRICS_EXPORT_INTERVAL,
+                 prefix: str = "hairfall"):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self.prometheus_path = prometheus_path
+        self.jsonl_path = jsonl_path
+        self.export_interval = export_interval
+        self.prefix = prefix
+
+        self._histograms: Dict[str, Dict[LabelSet, _Histogram]] = defaultdict(dict)
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._exporter: Optional[threading.Thread] = None
+
+    def observe(self, name: str, seconds: float, **labels: Any):
+        """Record one duration"""
+        if not self.enabled:
+            return
+        self._record(name, _label_set(labels), seconds)
+
+    def _record(self, name: str, label_set: LabelSet, seconds: float):
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms[name].get(label_set)
+            if histogram is None:
+                histogram = self._histograms[name][label_set] = _Histogram(len(self.buckets))
+            histogram.counts[slot] += 1
+            histogram.total += seconds
+            histogram.count += 1
+            if self.jsonl_path:
+                self._pending.append(json.dumps(
+                    {"ts": round(time.time(), 3), "metric": name, "labels": dict(label_set),
+                     "seconds": round(seconds, 6)},
+                    separators=(",", ":")
+                ))
+        if self._exporter is None and (self.prometheus_path or self.jsonl_path):
+            self._start_exporter()
+
+    def timer(self, name: str, **labels: Any):
+        """Context manager that records how long its block took"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def timed(self, name: str, **labels: Any) -> Callable[[Callable], Callable]:
+        """Decorator that records each call's duration"""
+        label_set = _label_set(labels)
+
+        def decorator(fn: Callable) -> Callable:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self._record(name, label_set, time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Dict[LabelSet, Dict[str, Any]]]:
+        """Count, sum and cumulative bucket counts of every series"""
+        with self._lock:
+            result = {}
+            for name, series in self._histograms.items():
+                result[name] = {}
+                for label_set, histogram in series.items():
+                    cumulative, running = [], 0
+                    for count in histogram.counts:
+                        running += count
+                        cumulative.append(running)
+                    result[name][label_set] = {"count": histogram.count, "sum": histogram.total,
+                                               "buckets": cumulative}
+            return result
+
+    def render_prometheus(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        lines = []
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        for name, series in sorted(self.snapshot().items()):
+            metric = f"{self.prefix}_{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for label_set, values in sorted(series.items()):
+                labels = [f'{key}="{_escape(value)}"' for key, value in label_set]
+                for bound, count in zip(bounds, values["buckets"]):
+                    bucket_labels = ",".join(labels + ['le="%s"' % bound])
+                    lines.append(f"{metric}_bucket{{{bucket_labels}}} {count}")
+                suffix = f"{{{','.join(labels)}}}" if labels else ""
+                lines.append(f"{metric}_sum{suffix} {values['sum']:.6f}")
+                lines.append(f"{metric}_count{suffix} {values['count']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self):
+        """Write the Prometheus file and flush pending JSON lines"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if self.jsonl_path and pending:
+            with open(self.jsonl_path, "a", encoding="utf-8") as output:
+                output.write("\n".join(pending) + "\n")
+        if self.prometheus_path:
+            temporary = f"{self.prometheus_path}.{os.getpid()}.tmp"
+            with open(temporary, "w", encoding="utf-8") as output:
+                output.write(self.render_prometheus())
+            os.replace(temporary, self.prometheus_path)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._pending.clear()
+
+    def _start_exporter(self):
+        with self._lock:
+            if self._exporter is not None:
+                return
+            self._exporter = threading.Thread(target=self._export_loop, name="metrics-exporter", daemon=True)
+        self._exporter.start()
+        # Short-lived processes (CLIs, benchmarks) still get their last observations out
+        atexit.register(self.export)
+
+    def _export_loop(self):
+        while True:
+            time.sleep(self.export_interval)
+            try:
+                self.export()
+            except OSError as e:
+                logger.warning("Could not export metrics: %s", e)
+
+
+def _label_set(labels: Dict[str, Any]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# One registry per process, used directly so disabled calls stay cheap
+metrics = MetricsRegistry()
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def summarize(path: str) -> List[Tuple[str, int, float, float, float, float]]:
+    """Per-series count, total and p50/p95/p99 (seconds) from a JSON lines export"""
+    samples: Dict[str, List[float]] = defaultdict(list)
+    with open(path, encoding="utf-8") as export:
+        for line in export:
+            if line.strip():
+                record = json.loads(line)
+                labels = ",".join(f"{key}={value}" for key, value in sorted(record["labels"].items()))
+                samples[f"{record['metric']}{{{labels}}}" if labels else record["metric"]].append(record["seconds"])
+
+    rows = []
+    for series, values in samples.items():
+        values.sort()
+        rows.append((series, len(values), sum(values), _percentile(values, 50), _percentile(values, 95),
+                     _percentile(values, 99)))
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize exported timing metrics")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    summary = subcommands.add_parser("summary", help="Where the time went, from a JSON lines export")
+    summary.add_argument("path")
+    args = parser.parse_args()
+
+    rows = summarize(args.path)
+    width = max([len(row[0]) for row in rows] + [6])
+    print(f"{'series':<{width}} {'count':>7} {'total s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for series, count, total, p50, p95, p99 in rows:
+        print(f"{series:<{width}} {count:>7} {total:>9.2f} {p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {p99 * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
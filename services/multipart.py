@@ -0,0 +1,156 @@
+import io
+import os
+import tempfile
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import Config
+
+
+class _BufferSource:
+    """Reads a report straight out of an in-memory buffer (no copy)"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._offset = 0
+
+    def __len__(self) -> int:
+        return self._view.nbytes
+
+    def read(self, size: int) -> bytes:
+        chunk = self._view[self._offset:self._offset + size]
+        self._offset += len(chunk)
+        return bytes(chunk)
+
+    def close(self):
+        self._view.release()
+
+
+class _FileSource:
+    """Reads a report from a seekable binary file in chunks"""
+
+    def __init__(self, fileobj, owned: bool = False):
+        self._file = fileobj
+        self._owned = owned
+        self._file.seek(0, os.SEEK_END)
+        self._size = self._file.tell()
+        self._file.seek(0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int) -> bytes:
+        return self._file.read(size)
+
+    def close(self):
+        if self._owned:
+            self._file.close()
+
+
+def _open_source(content: Any):
+    """Pick the cheapest way to stream a report's bytes"""
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return _BufferSource(content)
+    if hasattr(content, 'getbuffer'):
+        # BytesIO / Streamlit UploadedFile already hold the bytes
+        return _BufferSource(content.getbuffer())
+
+    if hasattr(content, 'read'):
+        if hasattr(content, 'seek') and not isinstance(content, io.TextIOBase):
+            return _FileSource(content)
+
+        # Text or unseekable streams are spooled so the length is known up front
+        spool = tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_MAX_MEMORY)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        while True:
+            chunk = content.read(Config.UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            spool.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return _FileSource(spool, owned=True)
+
+    return _BufferSource(str(content).encode('utf-8'))
+
+
+class MultipartStream:
+    """Streaming ``multipart/form-data`` request body.
+
+    Behaves like a read-only file with a known length, so ``requests`` sends
+    it with a ``Content-Length`` header and pulls it in chunks. Report bytes
+    are read from their original buffer (or a spooled temp file) instead of
+    being copied into one large in-memory body.
+    """
+
+    def __init__(self, fields: Optional[Dict[str, Any]] = None,
+                 files: Optional[Dict[str, Tuple[str, Any, str]]] = None,
+                 boundary: Optional[str] = None):
+        self.boundary = boundary or uuid.uuid4().hex
+        self._segments: List[Any] = []
+        self._sources = []
+
+        for name, value in (fields or {}).items():
+            self._segments.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                f'{value}\r\n'.encode('utf-8')
+            )
+
+        for name, (filename, content, content_type) in (files or {}).items():
+            source = _open_source(content)
+            self._sources.append(source)
+            self._segments.append(
+                f'--{self.boundary}\r\n'
+                f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f'Content-Type: {content_type or "application/octet-stream"}\r\n\r\n'.encode('utf-8')
+            )
+            self._segments.append(source)
+            self._segments.append(b'\r\n')
+
+        self._segments.append(f'--{self.boundary}--\r\n'.encode('utf-8'))
+        self._length = sum(len(segment) for segment in self._segments)
+        self._index = 0
+        self._offset = 0
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes of the encoded body"""
+        if size is None or size < 0:
+            size = self._length
+
+        out = bytearray()
+        while len(out) < size and self._index < len(self._segments):
+            segment = self._segments[self._index]
+            wanted = size - len(out)
+            if isinstance(segment, bytes):
+                chunk = segment[self._offset:self._offset + wanted]
+                self._offset += len(chunk)
+                exhausted = self._offset >= len(segment)
+            else:
+                chunk = segment.read(min(wanted, Config.UPLOAD_CHUNK_SIZE))
+                exhausted = not chunk
+            out += chunk
+            if exhausted:
+                self._index += 1
+                self._offset = 0
+        return bytes(out)
+
+    def close(self):
+        """Release buffer views and spooled files"""
+        for source in self._sources:
+            source.close()
+        self._sources = []
+
+    def __enter__(self) -> "MultipartStream":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,138 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import streamlit as st
+from config import Config
+
+
+# Streamlit hands out a new UploadedFile object on every rerun, but the
+# file_id stays the same for one upload, so digests are remembered by it
+_digests_by_file_id: "OrderedDict[str, str]" = OrderedDict()
+_digests_lock = threading.Lock()
+_DIGEST_MEMO_SIZE = 1024
+
+
+def report_digest(medical_file: Optional[Any]) -> Optional[str]:
+    """SHA-256 of a report's bytes without copying in-memory buffers"""
+    if medical_file is None:
+        return None
+
+    file_id = getattr(medical_file, 'file_id', None)
+    if file_id is not None:
+        with _digests_lock:
+            digest = _digests_by_file_id.get(file_id)
+        if digest is None:
+            digest = _hash_report(medical_file)
+            with _digests_lock:
+                _digests_by_file_id[file_id] = digest
+                while len(_digests_by_file_id) > _DIGEST_MEMO_SIZE:
+                    _digests_by_file_id.popitem(last=False)
+        return digest
+
+    return _hash_report(medical_file)
+
+
+def _hash_report(medical_file: Any) -> str:
+    sha = hashlib.sha256()
+    if hasattr(medical_file, 'getbuffer'):
+        # BytesIO / Streamlit UploadedFile: hash the buffer in place
+        sha.update(medical_file.getbuffer())
+    elif hasattr(medical_file, 'getvalue'):
+        value = medical_file.getvalue()
+        sha.update(value.encode('utf-8') if isinstance(value, str) else value)
+    elif hasattr(medical_file, 'read'):
+        position = medical_file.tell() if hasattr(medical_file, 'tell') else None
+        if hasattr(medical_file, 'seek'):
+            medical_file.seek(0)
+        while True:
+            chunk = medical_file.read(1024 * 1024)
+            if not chunk:
+                break
+            sha.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+        if position is not None:
+            medical_file.seek(position)
+    else:
+        sha.update(medical_file if isinstance(medical_file, bytes) else str(medical_file).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def prediction_key(questionnaire_data: Optional[Dict[str, Any]], medical_digest: Optional[str],
+                   model_version: Optional[str]) -> str:
+    """Content address of a prediction: questionnaire, report bytes and model version"""
+    canonical = json.dumps(
+        {
+            "questionnaire": questionnaire_data or {},
+            "report": medical_digest,
+            "model_version": model_version or "unknown"
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of successful prediction results with a TTL"""
+
+    def __init__(self, max_entries: int = Config.PREDICTION_CACHE_SIZE,
+                 ttl: float = Config.PREDICTION_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result, or None on a miss or expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a successful result, evicting the least recently used entry"""
+        if not result.get("success"):
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+@st.cache_resource
+def get_prediction_cache() -> PredictionCache:
+    """Get the prediction cache shared by every session in this process"""
+    return PredictionCache()
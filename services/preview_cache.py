@@ -0,0 +1,73 @@
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Tuple
+
+import streamlit as st
+from config import Config
+from services.metrics import metrics
+
+
+@dataclass(frozen=True)
+class ImagePreview:
+    """Small encoded preview of an uploaded image report"""
+    data: bytes
+    original_size: Tuple[int, int]
+    size: Tuple[int, int]
+
+
+@metrics.timed("preview_build_seconds", kind="image")
+def build_image_preview(data: bytes, max_width: int = Config.PREVIEW_MAX_WIDTH) -> ImagePreview:
+    """Decode only as much of the image as the preview needs and re-encode it small.
+
+    JPEG sources are decoded in draft mode at the nearest DCT scale (1/2, 1/4
+    or 1/8) above the preview size, so a 12 Mpx photo never gets fully decoded.
+    """
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as image:
+        original_size = image.size
+        if image.width > max_width:
+            target = (max_width, max(1, int(image.height * max_width / image.width)))
+            image.draft("RGB", target)
+            image.thumbnail(target)
+
+        output = io.BytesIO()
+        if image.mode in ("RGBA", "LA", "P"):
+            image.save(output, format="PNG", optimize=True)
+        else:
+            image.convert("RGB").save(output, format="JPEG", quality=Config.PREVIEW_JPEG_QUALITY)
+        size = image.size
+
+    return ImagePreview(data=output.getvalue(), original_size=original_size, size=size)
+
+
+class PreviewCache:
+    """Thread-safe LRU of encoded previews keyed by report digest"""
+
+    def __init__(self, max_entries: int = Config.PREVIEW_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: Tuple, build: Callable[[], Any]) -> Any:
+        """Return the cached preview for ``key``, building it on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        preview = build()
+        with self._lock:
+            self._entries[key] = preview
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return preview
+
+
+@st.cache_resource
+def get_preview_cache() -> PreviewCache:
+    """Get the preview cache shared by every session in this process"""
+    return PreviewCache()
@@ -0,0 +1,143 @@
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Optional
+
+import streamlit as st
+from config import Config
+from services.api_client import APIClient, get_api_client
+from services.image_pipeline import ImageNormalizer, get_image_normalizer, is_image_report
+from services.prediction_cache import report_digest
+from services.text_extraction import TextExtractor, get_text_extractor, is_text_report
+
+
+def prepare_report_upload(medical_file: Any, normalizer: Optional[ImageNormalizer] = None,
+                          extractor: Optional[TextExtractor] = None, timeout: Optional[float] = None) -> Any:
+    """The file to send for a report: normalized bytes for images, extracted text for
+    PDFs with a text layer and TXT files, else the original (also if not ready within ``timeout``)"""
+    if medical_file is None or not hasattr(medical_file, 'getvalue'):
+        return medical_file
+    if is_text_report(medical_file):
+        extracted = (extractor or get_text_extractor()).get(medical_file, timeout)
+        if extracted is None or not extracted.usable or len(extracted.data) >= extracted.original_bytes:
+            # Scanned PDFs (and unreadable files) go to the backend as they are, for OCR
+            return medical_file
+        upload = io.BytesIO(extracted.data)
+        upload.name = extracted.filename
+        upload.type = "text/plain"
+        return upload
+    if not is_image_report(medical_file):
+        return medical_file
+
+    normalized = (normalizer or get_image_normalizer()).get(medical_file, timeout)
+    if normalized is None:
+        return medical_file
+
+    upload = io.BytesIO(normalized.data)
+    upload.name = normalized.filename
+    upload.type = normalized.content_type
+    return upload
+
+
+class ReportUploader:
+    """Uploads each distinct report to the backend once, in the background.
+
+    Uploads are keyed by the SHA-256 of the report bytes, so a report saved
+    by several sessions (or saved again) is only sent over the wire once.
+    """
+
+    def __init__(self, api_client: APIClient, normalizer: Optional[ImageNormalizer] = None,
+                 extractor: Optional[TextExtractor] = None,
+                 max_entries: int = Config.REPORT_UPLOAD_CACHE_SIZE):
+        self.api_client = api_client
+        self.normalizer = normalizer or ImageNormalizer()
+        self.extractor = extractor or TextExtractor()
+        self.max_entries = max_entries
+        self._uploads: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, medical_file: Any, digest: Optional[str] = None) -> str:
+        """Begin uploading a report unless it is already uploaded or uploading"""
+        digest = digest or report_digest(medical_file)
+        with self._lock:
+            future = self._uploads.get(digest)
+            if future is None or (future.done() and self._report_id(future) is None):
+                future = self.api_client.submit_background(self._upload, medical_file)
+                self._uploads[digest] = future
+            self._uploads.move_to_end(digest)
+            while len(self._uploads) > self.max_entries:
+                self._uploads.popitem(last=False)
+        return digest
+
+    def report_id(self, digest: str, timeout: float = 0) -> Optional[str]:
+        """Server-side id of an uploaded report, waiting up to ``timeout`` seconds"""
+        with self._lock:
+            future = self._uploads.get(digest)
+        if future is None:
+            return None
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+        return self._report_id(future)
+
+    def forget(self, digest: str):
+        """Drop a report id the backend no longer knows; the next start() uploads again"""
+        with self._lock:
+            self._uploads.pop(digest, None)
+
+    def _upload(self, medical_file: Any):
+        # Image reports are normalized for OCR, PDFs with a text layer are sent as text
+        upload = prepare_report_upload(medical_file, self.normalizer, self.extractor)
+        return self.api_client.upload_report(upload)
+
+    @staticmethod
+    def _report_id(future: Future) -> Optional[str]:
+        if future.exception() is not None:
+            return None
+        result = future.result()
+        return result.get("report_id") if result.get("success") else None
+
+
+@st.cache_resource
+def get_report_uploader(base_url: str = Config.BACKEND_BASE_URL) -> ReportUploader:
+    """Get the report uploader shared by every session in this process"""
+    return ReportUploader(get_api_client(base_url), get_image_normalizer(), get_text_extractor())
+
+
+def start_report_upload(medical_file: Any, base_url: str = Config.BACKEND_BASE_URL):
+    """Start the upload-once step for a saved report (non-blocking)"""
+    if medical_file is None:
+        return
+    digest = report_digest(medical_file)
+    if digest not in st.session_state.setdefault("report_ids", {}):
+        get_report_uploader(base_url).start(medical_file, digest)
+
+
+def get_report_id(medical_file: Any, base_url: str = Config.BACKEND_BASE_URL,
+                  timeout: float = Config.REPORT_UPLOAD_WAIT) -> Optional[str]:
+    """Report id for a saved report, cached in the session once known"""
+    if medical_file is None:
+        return None
+
+    digest = report_digest(medical_file)
+    report_ids = st.session_state.setdefault("report_ids", {})
+    if digest in report_ids:
+        return report_ids[digest]
+
+    uploader = get_report_uploader(base_url)
+    uploader.start(medical_file, digest)
+    report_id = uploader.report_id(digest, timeout)
+    if report_id:
+        report_ids[digest] = report_id
+    return report_id
+
+
+def forget_report_id(medical_file: Any, base_url: str = Config.BACKEND_BASE_URL):
+    """Forget a report id the backend has evicted, in the session and the shared uploader"""
+    if medical_file is None:
+        return
+    digest = report_digest(medical_file)
+    st.session_state.setdefault("report_ids", {}).pop(digest, None)
+    get_report_uploader(base_url).forget(digest)
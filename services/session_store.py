@@ -0,0 +1,386 @@
+import atexit
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import streamlit as st
+from config import Config
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    """Lightweight handle to a stored file, small enough to keep in session state"""
+    session_id: str
+    key: str
+    name: str
+    size: int
+    type: Optional[str]
+    file_id: str
+
+
+class _Blob:
+    """A stored file's bytes, held in memory or in a temporary file"""
+    __slots__ = ("ref", "data", "path", "last_used")
+
+    def __init__(self, ref: BlobRef, data: Optional[bytes] = None, path: Optional[str] = None):
+        self.ref = ref
+        self.data = data
+        self.path = path
+        self.last_used = time.monotonic()
+
+
+class StoredFile(io.RawIOBase):
+    """Read-only handle on a stored blob, shaped like Streamlit's UploadedFile.
+
+    Each handle has its own file position. ``getbuffer()`` memory-maps
+    spilled blobs, so hashing and uploading them never copies the bytes onto
+    the heap.
+    """
+
+    def __init__(self, ref: BlobRef, data: Optional[bytes] = None, path: Optional[str] = None):
+        super().__init__()
+        self.name = ref.name
+        self.size = ref.size
+        self.type = ref.type
+        self.file_id = ref.file_id
+        self._data = data
+        self._path = path
+        self._stream = io.BytesIO(data) if data is not None else open(path, "rb")
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self._stream.readinto(buffer)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._stream.tell()
+
+    def getbuffer(self) -> memoryview:
+        if self._data is not None:
+            return memoryview(self._data)
+        if self.size == 0:
+            return memoryview(b"")
+        with open(self._path, "rb") as spilled:
+            return memoryview(mmap.mmap(spilled.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def getvalue(self) -> bytes:
+        if self._data is not None:
+            return self._data
+        with open(self._path, "rb") as spilled:
+            return spilled.read()
+
+    def close(self):
+        self._stream.close()
+        super().close()
+
+
+class SessionBlobStore:
+    """Per-session file storage with one memory budget for the whole process.
+
+    Blobs up to ``spill_size`` bytes are kept in memory; larger ones go
+    straight to a temporary file. When the in-memory total exceeds
+    ``memory_budget``, the least recently used blobs are moved to disk. Blobs
+    of sessions that have not touched the store for ``idle_timeout`` seconds
+    are deleted.
+    """
+
+    def __init__(self, memory_budget: int = Config.SESSION_BLOB_MEMORY_BUDGET,
+                 spill_size: int = Config.SESSION_BLOB_SPILL_SIZE,
+                 idle_timeout: float = Config.SESSION_IDLE_TIMEOUT,
+                 sweep_interval: float = Config.SESSION_SWEEP_INTERVAL,
+                 spill_dir: Optional[str] = None):
+        self.memory_budget = memory_budget
+        self.spill_size = spill_size
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+
+        self._blobs: Dict[Tuple[str, str], _Blob] = {}
+        self._in_memory: "OrderedDict[Tuple[str, str], None]" = OrderedDict()  # LRU order
+        self._sessions: Dict[str, float] = {}
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._spills = 0
+        self._expired_sessions = 0
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    def put(self, session_id: str, key: str, source: Any) -> Optional[BlobRef]:
+        """Store a file-like object (or bytes/str) under ``key``; None deletes it"""
+        if source is None:
+            self.delete(session_id, key)
+            return None
+
+        data = _read_bytes(source)
+        ref = BlobRef(
+            session_id=session_id,
+            key=key,
+            name=getattr(source, "name", None) or key,
+            size=len(data),
+            type=getattr(source, "type", None) or getattr(source, "content_type", None),
+            file_id=getattr(source, "file_id", None) or uuid.uuid4().hex
+        )
+        # Large blobs are written out before taking the lock
+        path = self._write_spill_file(data) if len(data) > self.spill_size else None
+
+        with self._lock:
+            self._discard((session_id, key))
+            if path is None:
+                blob = _Blob(ref, data=bytes(data))
+                self._in_memory[(session_id, key)] = None
+                self._memory_bytes += ref.size
+            else:
+                blob = _Blob(ref, path=path)
+                self._disk_bytes += ref.size
+            self._blobs[(session_id, key)] = blob
+            self._sessions[session_id] = blob.last_used
+            evicted = self._evict_over_budget()
+
+        for blob in evicted:
+            self._spill(blob)
+        self._maybe_sweep()
+        return ref
+
+    def adopt(self, session_id: str, key: str, path: str, name: Optional[str] = None,
+              type: Optional[str] = None) -> BlobRef:
+        """Take ownership of a file already on disk (e.g. a generated result) as a spilled blob.
+
+        The file is deleted with the session's other blobs: when it is
+        replaced, the session goes idle, or the store closes.
+        """
+        ref = BlobRef(
+            session_id=session_id,
+            key=key,
+            name=name or os.path.basename(path),
+            size=os.path.getsize(path),
+            type=type,
+            file_id=uuid.uuid4().hex
+        )
+        with self._lock:
+            self._discard((session_id, key))
+            blob = self._blobs[(session_id, key)] = _Blob(ref, path=path)
+            self._disk_bytes += ref.size
+            self._sessions[session_id] = blob.last_used
+        self._maybe_sweep()
+        return ref
+
+    def open(self, ref: Optional[BlobRef]) -> Optional[StoredFile]:
+        """Readable handle on a stored blob; None if it was deleted or expired"""
+        if ref is None:
+            return None
+        self._maybe_sweep()
+        with self._lock:
+            blob = self._blobs.get((ref.session_id, ref.key))
+            if blob is None or blob.ref != ref:
+                return None
+            blob.last_used = self._sessions[ref.session_id] = time.monotonic()
+            if blob.data is not None:
+                self._in_memory.move_to_end((ref.session_id, ref.key))
+            data, path = blob.data, blob.path
+        try:
+            return StoredFile(ref, data=data, path=path)
+        except OSError:
+            # Swept between the lookup and the open
+            return None
+
+    def contains(self, ref: Optional[BlobRef]) -> bool:
+        """Whether a ref still points at its blob (not deleted, replaced or expired).
+
+        A hit counts as session activity, like ``open``: reruns that only
+        check the report is there keep it from expiring.
+        """
+        if ref is None:
+            return False
+        self._maybe_sweep()
+        with self._lock:
+            blob = self._blobs.get((ref.session_id, ref.key))
+            if blob is None or blob.ref != ref:
+                return False
+            blob.last_used = self._sessions[ref.session_id] = time.monotonic()
+            return True
+
+    def delete(self, session_id: str, key: str):
+        with self._lock:
+            self._discard((session_id, key))
+
+    def drop_session(self, session_id: str):
+        """Delete every blob a session stored"""
+        with self._lock:
+            for blob_key in [k for k in self._blobs if k[0] == session_id]:
+                self._discard(blob_key)
+            self._sessions.pop(session_id, None)
+
+    def sweep_idle(self, now: Optional[float] = None) -> int:
+        """Delete the blobs of idle sessions; returns how many sessions were dropped"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            idle = [session_id for session_id, last_used in self._sessions.items()
+                    if now - last_used > self.idle_timeout]
+        for session_id in idle:
+            self.drop_session(session_id)
+        with self._lock:
+            self._expired_sessions += len(idle)
+        return len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "blobs": len(self._blobs),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes,
+                "spills": self._spills,
+                "expired_sessions": self._expired_sessions
+            }
+
+    def close(self):
+        """Delete every blob, and the spill directory if the store created it"""
+        with self._lock:
+            for blob_key in list(self._blobs):
+                self._discard(blob_key)
+            self._sessions.clear()
+        if self._owns_spill_dir and self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.sweep_idle()
+
+    def _evict_over_budget(self):
+        # Caller holds the lock; the LRU blobs are spilled after it is released
+        evicted = []
+        while self._memory_bytes > self.memory_budget and self._in_memory:
+            blob_key, _ = self._in_memory.popitem(last=False)
+            blob = self._blobs[blob_key]
+            self._memory_bytes -= blob.ref.size
+            self._disk_bytes += blob.ref.size
+            evicted.append(blob)
+        return evicted
+
+    def _spill(self, blob: _Blob):
+        data = blob.data
+        path = self._write_spill_file(data)
+        with self._lock:
+            if self._blobs.get((blob.ref.session_id, blob.ref.key)) is blob:
+                blob.path, blob.data = path, None
+                self._spills += 1
+                return
+        # Replaced or deleted while it was being written
+        _remove_quietly(path)
+
+    def _discard(self, blob_key: Tuple[str, str]):
+        # Caller holds the lock
+        blob = self._blobs.pop(blob_key, None)
+        if blob is None:
+            return
+        if blob_key in self._in_memory:
+            del self._in_memory[blob_key]
+            self._memory_bytes -= blob.ref.size
+        else:
+            self._disk_bytes -= blob.ref.size
+        if blob.path:
+            _remove_quietly(blob.path)
+
+    def _write_spill_file(self, data) -> str:
+        if self._spill_dir is None:
+            with self._lock:
+                if self._spill_dir is None:
+                    self._spill_dir = tempfile.mkdtemp(prefix="hairfall-session-blobs-")
+        descriptor, path = tempfile.mkstemp(dir=self._spill_dir, suffix=".blob")
+        with os.fdopen(descriptor, "wb") as spill_file:
+            spill_file.write(data)
+        return path
+
+
+def _read_bytes(source: Any):
+    """Bytes of an upload without an extra copy where the source allows it"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if isinstance(source, str):
+        return source.encode("utf-8")
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer()
+    if hasattr(source, "getvalue"):
+        value = source.getvalue()
+        return value.encode("utf-8") if isinstance(value, str) else value
+    if hasattr(source, "seek"):
+        source.seek(0)
+    value = source.read()
+    return value.encode("utf-8") if isinstance(value, str) else value
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@st.cache_resource
+def get_session_blob_store() -> SessionBlobStore:
+    """Get the session blob store shared by every session in this process"""
+    store = SessionBlobStore()
+    atexit.register(store.close)
+    return store
+
+
+def current_session_id() -> str:
+    """Id of the Streamlit session running this script (a fixed id outside one)"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "local"
+
+
+def store_session_file(key: str, source: Any) -> Optional[BlobRef]:
+    """Store a file for the current session; keep only the returned ref in session state"""
+    return get_session_blob_store().put(current_session_id(), key, source)
+
+
+def adopt_session_file(key: str, path: str, name: Optional[str] = None,
+                       type: Optional[str] = None) -> BlobRef:
+    """Hand a file on disk to the current session's storage, which deletes it with the session"""
+    return get_session_blob_store().adopt(current_session_id(), key, path, name, type)
+
+
+def open_session_file(ref: Optional[BlobRef]) -> Optional[StoredFile]:
+    """Readable handle on a file stored with ``store_session_file``"""
+    return get_session_blob_store().open(ref)
+
+
+def session_file_exists(ref: Optional[BlobRef]) -> bool:
+    """Whether a stored file is still there (the idle sweep deletes the files of inactive sessions)"""
+    return get_session_blob_store().contains(ref)
+
+
+def release_upload(uploaded_file: Any):
+    """Drop Streamlit's own copy of an uploaded file once the blob store holds it.
+
+    The uploader widget must be reset as well (e.g. by changing its key), or
+    it keeps returning the file.
+    """
+    from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    file_id = getattr(uploaded_file, "file_id", None)
+    # Only the in-memory manager can drop a single file (st.chat_input does the same)
+    if ctx is not None and file_id and isinstance(ctx.uploaded_file_mgr, MemoryUploadedFileManager):
+        ctx.uploaded_file_mgr.remove_file(session_id=ctx.session_id, file_id=file_id)
@@ -0,0 +1,79 @@
+import copy
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import Config
+from services.metrics import metrics
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight wait for it and get a copy of its result. With ``hold`` a result
+    can stay joinable after the call returns (e.g. an accepted job that is
+    still running) until ``forget`` is called or ``hold_ttl`` passes.
+    """
+
+    def __init__(self, operation: str, hold_ttl: float = Config.COALESCE_HOLD_TTL):
+        self.operation = operation
+        self.hold_ttl = hold_ttl
+        self.leaders = 0
+        self.coalesced = 0
+
+        self._calls: Dict[str, Tuple[Future, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable, *args,
+           hold: Optional[Callable[[Any], bool]] = None, **kwargs) -> Tuple[Any, bool]:
+        """Run ``fn`` or join the identical call in flight; returns (result, coalesced)"""
+        with self._lock:
+            entry = self._calls.get(key)
+            if entry is not None and entry[1] is not None and time.monotonic() > entry[1]:
+                entry = None
+            if entry is None:
+                future = Future()
+                self._calls[key] = (future, None)
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if entry is not None:
+            started = time.perf_counter()
+            try:
+                return copy.deepcopy(entry[0].result()), True
+            finally:
+                metrics.observe("coalesced_wait_seconds", time.perf_counter() - started, operation=self.operation)
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            self._finish(key, future, held=False)
+            raise
+        future.set_result(result)
+        self._finish(key, future, held=hold is not None and bool(hold(result)))
+        return result, False
+
+    def forget(self, key: str):
+        """Stop handing out a held result; the next call for ``key`` runs again"""
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+    def _finish(self, key: str, future: Future, held: bool):
+        with self._lock:
+            if self._calls.get(key, (None,))[0] is not future:
+                return
+            if held:
+                now = time.monotonic()
+                for stale in [k for k, (_, expires) in self._calls.items() if expires is not None and now > expires]:
+                    del self._calls[stale]
+                self._calls[key] = (future, now + self.hold_ttl)
+            else:
+                del self._calls[key]
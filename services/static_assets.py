@@ -0,0 +1,68 @@
+import hashlib
+import logging
+import os
+from typing import Optional
+
+import streamlit as st
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def publish_asset(source_path: str, static_dir: str = Config.STATIC_ASSET_DIR) -> str:
+    """Copy an asset into Streamlit's ``static/`` folder under a content-hashed name.
+
+    Returns the URL path the browser loads it from. Older hashed copies of
+    the same asset are removed, so the folder only holds current versions.
+    """
+    with open(source_path, "rb") as source:
+        content = source.read()
+
+    stem, extension = os.path.splitext(os.path.basename(source_path))
+    filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+    target_dir = os.path.join(APP_ROOT, "static", static_dir)
+    target = os.path.join(target_dir, filename)
+
+    if not os.path.exists(target):
+        os.makedirs(target_dir, exist_ok=True)
+        for stale in os.listdir(target_dir):
+            if stale.startswith(f"{stem}.") and stale.endswith(extension):
+                os.remove(os.path.join(target_dir, stale))
+        temporary = f"{target}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as output:
+            output.write(content)
+        os.replace(temporary, target)
+
+    return f"app/static/{static_dir}/{filename}"
+
+
+@st.cache_resource
+def _published_url(source_path: str, modified_at: float) -> Optional[str]:
+    # Keyed by mtime so an edited stylesheet gets a new hash without a restart
+    try:
+        return publish_asset(source_path)
+    except OSError as e:
+        logger.warning("Could not publish %s as a static asset: %s", source_path, e)
+        return None
+
+
+def inject_stylesheet(relative_path: str):
+    """Link a stylesheet served once as a static asset.
+
+    With ``server.enableStaticServing`` each rerun only sends a short
+    ``<link>`` to the content-hashed file, which the browser fetches once and
+    caches. Otherwise (or if the static folder is not writable) the CSS is
+    inlined as before.
+    """
+    source_path = os.path.join(APP_ROOT, relative_path)
+    url = None
+    if st.get_option("server.enableStaticServing"):
+        url = _published_url(source_path, os.path.getmtime(source_path))
+
+    if url:
+        st.markdown(f'<link rel="stylesheet" href="{url}">', unsafe_allow_html=True)
+    else:
+        with open(source_path, encoding="utf-8") as stylesheet:
+            st.markdown(f"<style>{stylesheet.read()}</style>", unsafe_allow_html=True)
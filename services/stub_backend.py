@@ -0,0 +1,557 @@
+"""
+Local stand-in for the Flask prediction backend.
+
+Implements the endpoints the frontend talks to with deterministic fake
+predictions so the client can be exercised offline:
+
+    python -m services.stub_backend --port 5000
+
+Service time and failures can be simulated per route, e.g.
+``--latency /predict-questionnaire=lognormal:0.08,0.5 --error-rate 0.02``.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+
+from config import Config
+
+# Pipeline stages reported in job status, with their completion %
+PIPELINE_STAGES = [
+    ("upload", 10),
+    ("extraction", 40),
+    ("model1", 65),
+    ("model2", 85),
+    ("aggregation", 100),
+]
+
+LIFESTYLE_FIELDS = Config.LIFESTYLE_FIELDS
+
+ALL_ROUTES = "*"
+
+
+class LatencyModel:
+    """Simulated service time drawn from a named distribution (seconds)"""
+
+    PARAMETERS = {
+        "fixed": ("seconds",),
+        "uniform": ("low", "high"),
+        "normal": ("mean", "stddev"),
+        "lognormal": ("median", "sigma"),
+        "exponential": ("mean",),
+    }
+
+    def __init__(self, kind: str, *params: float):
+        if kind not in self.PARAMETERS:
+            raise ValueError(f"Unknown latency distribution '{kind}' (expected one of {', '.join(self.PARAMETERS)})")
+        if len(params) != len(self.PARAMETERS[kind]):
+            raise ValueError(f"'{kind}' takes {', '.join(self.PARAMETERS[kind])}")
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Build a model from ``kind:param[,param]``; a bare number is a fixed delay"""
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        return cls(kind, *(float(value) for value in params.split(",")))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            delay = self.params[0]
+        elif self.kind == "uniform":
+            delay = rng.uniform(*self.params)
+        elif self.kind == "normal":
+            delay = rng.gauss(*self.params)
+        elif self.kind == "lognormal":
+            delay = rng.lognormvariate(math.log(self.params[0]), self.params[1])
+        else:
+            delay = rng.expovariate(1 / self.params[0])
+        return max(0.0, delay)
+
+    def __repr__(self) -> str:
+        return f"{self.kind}:{','.join(f'{value:g}' for value in self.params)}"
+
+
+def parse_route_option(spec: str) -> Tuple[str, str]:
+    """Split ``/route=value`` (or a bare ``value`` for every route)"""
+    route, separator, value = spec.rpartition("=")
+    return (route if separator else ALL_ROUTES), value
+
+
+def parse_form(content_type: str, body: bytes) -> Tuple[Dict[str, str], Dict[str, Tuple[str, bytes, str]]]:
+    """Parse an urlencoded or multipart request body into fields and files"""
+    fields: Dict[str, str] = {}
+    files: Dict[str, Tuple[str, bytes, str]] = {}
+
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode() + b"\r\n\r\n" + body
+        )
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            filename = part.get_filename()
+            payload = part.get_payload(decode=True) or b""
+            if filename is not None:
+                files[name] = (filename, payload, part.get_content_type())
+            else:
+                fields[name] = payload.decode("utf-8", errors="replace")
+    elif body:
+        fields = dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True))
+
+    return fields, files
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog of 5 makes concurrent clients wait out SYN retransmits
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StubBackend:
+    """Threaded HTTP server that imitates the prediction backend"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 stage_delay: float = 0.05, model_version: str = "stub-1.0",
+                 job_workers: int = 2, job_ttl: float = 600, max_reports: int = 128,
+                 batch_row_delay: float = 0.001,
+                 latency: Optional[Dict[str, LatencyModel]] = None,
+                 error_rates: Optional[Dict[str, float]] = None,
+                 error_status: int = 500,
+                 max_body: int = 2 * Config.MAX_FILE_SIZE,
+                 seed: Optional[int] = None):
+        self.stage_delay = stage_delay
+        self.batch_row_delay = batch_row_delay
+        self.model_version = model_version
+        self.job_ttl = job_ttl
+        self.max_reports = max_reports
+        self.request_counts: Dict[str, int] = {}
+        # Simulated faults, keyed by route (ALL_ROUTES applies where a route has none)
+        self.latency = latency or {}
+        self.error_rates = error_rates or {}
+        self.error_status = error_status
+        self.max_body = max_body
+        self.injected_errors = 0
+        self._rng = random.Random(seed)
+
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._reports: "OrderedDict[str, Tuple[str, bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._workers = ThreadPoolExecutor(max_workers=job_workers, thread_name_prefix="stub-job")
+        self._server = _Server((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubBackend":
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-backend", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self._server.shutdown()
+        self._server.server_close()
+        self._workers.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "StubBackend":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, path: str) -> str:
+        # Collapse ``/prefix/<id>[/suffix]`` paths so counts are per route
+        route = path
+        for prefix in (Config.ENDPOINTS["jobs"], Config.ENDPOINTS["reports"]):
+            if path.startswith(prefix + "/"):
+                rest = path[len(prefix) + 1:].split("/", 1)
+                route = f"{prefix}/<id>" + (f"/{rest[1]}" if len(rest) > 1 else "")
+        with self._lock:
+            self.request_counts[route] = self.request_counts.get(route, 0) + 1
+        return route
+
+    # Simulated service time and failures
+
+    def simulate(self, route: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Sleep for the route's sampled latency; returns an error response if one is injected"""
+        model = self.latency.get(route, self.latency.get(ALL_ROUTES))
+        error_rate = self.error_rates.get(route, self.error_rates.get(ALL_ROUTES, 0.0))
+        if model is None and not error_rate:
+            return None
+
+        with self._lock:
+            delay = model.sample(self._rng) if model is not None else 0.0
+            failed = error_rate > 0 and self._rng.random() < error_rate
+            if failed:
+                self.injected_errors += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return self.error_status, {"success": False, "error": "Injected backend error", "code": "injected"}
+        return None
+
+    # Job stage tracking
+
+    def _set_progress(self, progress_id: Optional[str], stage: str, percent: int, done: bool = False):
+        if not progress_id:
+            return
+        with self._changed:
+            self._progress[progress_id] = {"stage": stage, "progress": percent, "done": done}
+            self._changed.notify_all()
+
+    # Report store
+
+    def store_report(self, report: Tuple[str, bytes, str]) -> str:
+        """Keep a report under its content hash, evicting the oldest"""
+        report_id = hashlib.sha256(report[1]).hexdigest()
+        with self._lock:
+            self._reports[report_id] = report
+            self._reports.move_to_end(report_id)
+            while len(self._reports) > self.max_reports:
+                self._reports.popitem(last=False)
+        return report_id
+
+    def get_report(self, report_id: str) -> Optional[Tuple[str, bytes, str]]:
+        with self._lock:
+            return self._reports.get(report_id)
+
+    def resolve_report(self, fields: Dict[str, str],
+                       files: Dict[str, Tuple[str, bytes, str]]) -> Optional[Dict[str, Any]]:
+        """Swap a ``report_id`` field for the stored report; returns an error if unknown"""
+        if "medical_report" in files:
+            self.store_report(files["medical_report"])
+            return None
+
+        report_id = fields.pop("report_id", None)
+        if report_id:
+            report = self.get_report(report_id)
+            if report is None:
+                return {"success": False, "error": "Unknown report id", "code": "unknown_report"}
+            files["medical_report"] = report
+        return None
+
+    # Prediction jobs
+
+    def submit_job(self, fields: Dict[str, str], files: Dict[str, Tuple[str, bytes, str]]) -> str:
+        """Queue a prediction on the worker pool and return its job id"""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._changed:
+            expired = [key for key, job in self._jobs.items()
+                       if job["finished_at"] and now - job["finished_at"] > self.job_ttl]
+            for key in expired:
+                del self._jobs[key]
+                self._progress.pop(key, None)
+
+            self._jobs[job_id] = {"status": "queued", "result": None, "error": None, "finished_at": None}
+            self._progress[job_id] = {"stage": "upload", "progress": PIPELINE_STAGES[0][1], "done": False}
+
+        self._workers.submit(self._run_job, job_id, fields, files)
+        return job_id
+
+    def _run_job(self, job_id: str, fields: Dict[str, str], files: Dict[str, Tuple[str, bytes, str]]):
+        self._update_job(job_id, status="running")
+        try:
+            result = self.predict(fields, files, progress_id=job_id)
+            self._update_job(job_id, status="done", result=result, finished_at=time.time())
+        except Exception as e:
+            self._update_job(job_id, status="failed", error=str(e), finished_at=time.time())
+
+    def _update_job(self, job_id: str, **changes):
+        with self._changed:
+            self._jobs[job_id].update(changes)
+            self._changed.notify_all()
+
+    def _job_view(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        progress = self._progress.get(job_id, {})
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "stage": progress.get("stage"),
+            "progress": progress.get("progress", 0),
+            "error": job["error"]
+        }
+
+    def get_job(self, job_id: str, wait: float = 0) -> Optional[Dict[str, Any]]:
+        """Job status; with ``wait`` it long-polls until the status or stage changes"""
+        with self._changed:
+            initial = self._job_view(job_id)
+            if initial is None or wait <= 0 or initial["status"] in ("done", "failed"):
+                return initial
+            self._changed.wait_for(lambda: self._job_view(job_id) != initial, timeout=wait)
+            return self._job_view(job_id)
+
+    def get_job_result(self, job_id: str) -> Tuple[int, Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return 404, {"success": False, "error": "Unknown job id"}
+            if job["status"] == "failed":
+                return 200, {"success": False, "error": job["error"]}
+            if job["status"] != "done":
+                return 409, {"success": False, "error": f"Job is {job['status']}"}
+            return 200, job["result"]
+
+    # Fake model pipeline
+
+    def predict(self, fields: Dict[str, str], files: Dict[str, Tuple[str, bytes, str]],
+                progress_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run the staged fake pipeline and return a backend-shaped result"""
+        report = files.get("medical_report")
+        # Structured biomarkers from the client replace the backend's own text extraction
+        structured = self._biomarkers(fields)
+        for stage, percent in PIPELINE_STAGES:
+            if stage == "extraction" and (report is None or structured):
+                self._set_progress(progress_id, stage, percent)
+                continue
+            if stage != "upload":
+                time.sleep(self.stage_delay)
+            self._set_progress(progress_id, stage, percent)
+
+        result = self.score(fields, report is not None)
+        result["biomarkers_received"] = len(structured)
+        self._set_progress(progress_id, "complete", 100, done=True)
+        return result
+
+    @staticmethod
+    def _biomarkers(fields: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            biomarkers = json.loads(fields.get("biomarkers") or "{}")
+        except ValueError:
+            return {}
+        return biomarkers if isinstance(biomarkers, dict) else {}
+
+    def predict_batch(self, rows: Any) -> Tuple[int, Dict[str, Any]]:
+        """Score a chunk of questionnaire rows, with a per-row error for bad rows"""
+        if not isinstance(rows, list):
+            return 400, {"success": False, "error": "Expected a JSON body with a 'rows' list"}
+
+        # Model time grows with the chunk, as it would for a vectorized backend
+        time.sleep(self.batch_row_delay * len(rows))
+        results = []
+        for row in rows:
+            missing = [key for key in Config.QUESTIONNAIRE_FIELDS if not isinstance(row, dict) or key not in row]
+            if missing:
+                results.append({"success": False, "error": f"Missing fields: {', '.join(missing)}"})
+            else:
+                result = self.score({key: str(value) for key, value in row.items()})
+                results.append({"success": True, "predictions": result["predictions"]})
+        return 200, {"success": True, "results": results, "model_version": self.model_version}
+
+    def score(self, fields: Dict[str, str], has_report: bool = False) -> Dict[str, Any]:
+        """Deterministic stand-in for the two-model ensemble"""
+        def as_int(key: str) -> int:
+            try:
+                return int(float(fields.get(key, 0)))
+            except ValueError:
+                return 0
+
+        pss = sum(as_int(f"pss_{i}") for i in range(1, 11))
+        lifestyle = sum(as_int(key) for key in LIFESTYLE_FIELDS)
+        risk = 0.6 * pss / 40 + 0.4 * lifestyle / len(LIFESTYLE_FIELDS)
+
+        stage = min(5, int(round(risk * 5)))
+        condition = 1 if risk >= 0.5 else 0
+        model1_conf = round(0.70 + 0.25 * abs(risk - 0.5) * 2, 3)
+        model2_conf = round(0.65 + 0.30 * abs(risk - 0.5) * 2, 3)
+
+        return {
+            "success": True,
+            "predictions": {
+                "stage": stage,
+                "condition": "Yes" if condition else "No",
+                "confidence": round(0.67 * model1_conf + 0.33 * model2_conf, 3),
+                "interpretation": Config.STAGE_DESCRIPTIONS.get(stage, ""),
+                "detailed_results": {
+                    "model1_stage": stage,
+                    "model1_confidence": model1_conf,
+                    "model2_condition": condition,
+                    "model2_confidence": model2_conf,
+                    "ensemble_weights": {"model1": 0.67, "model2": 0.33}
+                }
+            },
+            "messages": ["Prediction generated by stub backend"],
+            "medical_report_processed": has_report,
+            "questionnaire_processed": bool(fields),
+            "model_version": self.model_version
+        }
+
+    def _make_handler(self):
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; don't let Nagle hold the body back
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any]):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _simulate(self, route: str) -> bool:
+                """Apply simulated latency; True if an injected error was sent instead"""
+                failure = backend.simulate(route)
+                if failure is None:
+                    return False
+                self._send_json(*failure)
+                return True
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if self._simulate(backend._count(path)):
+                    return
+
+                if path == Config.ENDPOINTS["health"]:
+                    self._send_json(200, {"status": "healthy", "model_version": backend.model_version})
+                elif path.startswith(Config.ENDPOINTS["reports"] + "/"):
+                    report = backend.get_report(path.rsplit("/", 1)[-1])
+                    if report is None:
+                        self._send_json(404, {"success": False, "error": "Unknown report id", "code": "unknown_report"})
+                    else:
+                        self._send_json(200, {"success": True, "filename": report[0], "size": len(report[1])})
+                elif path.startswith(Config.ENDPOINTS["jobs"] + "/"):
+                    parts = path[len(Config.ENDPOINTS["jobs"]) + 1:].split("/")
+                    if len(parts) == 2 and parts[1] == "result":
+                        self._send_json(*backend.get_job_result(parts[0]))
+                    else:
+                        query = parse_qs(urlsplit(self.path).query)
+                        wait = min(float(query.get("wait", ["0"])[0]), 30.0)
+                        job = backend.get_job(parts[0], wait)
+                        if job is None:
+                            self._send_json(404, {"success": False, "error": "Unknown job id"})
+                        else:
+                            self._send_json(200, job)
+                else:
+                    self._send_json(404, {"success": False, "error": "Not found"})
+
+            def do_POST(self):
+                path = urlsplit(self.path).path
+                route = backend._count(path)
+                if int(self.headers.get("Content-Length") or 0) > backend.max_body:
+                    # Like Flask's MAX_CONTENT_LENGTH: refuse without reading, then drop the connection
+                    self.close_connection = True
+                    self._send_json(413, {"success": False, "error": "Request body too large"})
+                    return
+                if self._simulate(route):
+                    # The body is still read so the keep-alive connection stays usable
+                    self._read_body()
+                    return
+                if path == Config.ENDPOINTS["predict_batch"]:
+                    try:
+                        rows = json.loads(self._read_body() or b"{}").get("rows")
+                    except (ValueError, AttributeError):
+                        rows = None
+                    self._send_json(*backend.predict_batch(rows))
+                    return
+
+                fields, files = parse_form(self.headers.get("Content-Type", ""), self._read_body())
+
+                if path in (Config.ENDPOINTS["predict"], Config.ENDPOINTS["jobs"]):
+                    error = backend.resolve_report(fields, files)
+                    if error is not None:
+                        self._send_json(404, error)
+                        return
+
+                if path == Config.ENDPOINTS["predict"]:
+                    self._send_json(200, backend.predict(fields, files))
+                elif path == Config.ENDPOINTS["jobs"]:
+                    job_id = backend.submit_job(fields, files)
+                    self._send_json(202, {"success": True, "job_id": job_id})
+                elif path == Config.ENDPOINTS["reports"]:
+                    report = files.get("medical_report")
+                    if report is None:
+                        self._send_json(400, {"success": False, "error": "No medical_report file"})
+                    else:
+                        self._send_json(201, {"success": True, "report_id": backend.store_report(report),
+                                              "size": len(report[1])})
+                elif path == Config.ENDPOINTS["predict_questionnaire"]:
+                    self._send_json(200, backend.score(fields))
+                elif path == Config.ENDPOINTS["test_upload"]:
+                    self._send_json(200, {
+                        "success": True,
+                        "files": {name: {"filename": f[0], "size": len(f[1]), "content_type": f[2]}
+                                  for name, f in files.items()}
+                    })
+                else:
+                    self._send_json(404, {"success": False, "error": "Not found"})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the stand-in prediction backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--stage-delay", type=float, default=0.5,
+                        help="Seconds spent in each simulated pipeline stage")
+    parser.add_argument("--job-workers", type=int, default=2,
+                        help="Size of the worker pool that runs prediction jobs")
+    parser.add_argument("--batch-row-delay", type=float, default=0.001,
+                        help="Seconds of simulated model time per batch row")
+    parser.add_argument("--latency", action="append", default=[], metavar="[ROUTE=]DIST",
+                        help="Extra service time, e.g. lognormal:0.08,0.5 or /predict=uniform:0.1,0.3 "
+                             f"({', '.join(LatencyModel.PARAMETERS)}); repeatable")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="[ROUTE=]RATE",
+                        help="Share of requests answered with an injected error; repeatable")
+    parser.add_argument("--error-status", type=int, default=500,
+                        help="HTTP status of injected errors (503 is retried by the client for GETs)")
+    parser.add_argument("--max-body-mb", type=float, default=2 * Config.MAX_FILE_SIZE / 2 ** 20,
+                        help="Larger request bodies are refused with 413")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for simulated latency and errors")
+    args = parser.parse_args()
+
+    latency = {route: LatencyModel.parse(spec) for route, spec in map(parse_route_option, args.latency)}
+    error_rates = {route: float(rate) for route, rate in map(parse_route_option, args.error_rate)}
+
+    backend = StubBackend(args.host, args.port, stage_delay=args.stage_delay,
+                          job_workers=args.job_workers, batch_row_delay=args.batch_row_delay,
+                          latency=latency, error_rates=error_rates, error_status=args.error_status,
+                          max_body=int(args.max_body_mb * 2 ** 20), seed=args.seed)
+    print(f"Stub backend listening on {backend.url}")
+    for route, model in latency.items():
+        print(f"  latency {route}: {model}")
+    for route, rate in error_rates.items():
+        print(f"  error rate {route}: {rate:.1%}")
+    try:
+        backend._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backend._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
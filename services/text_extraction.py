@@ -0,0 +1,174 @@
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import streamlit as st
+from config import Config
+from services.metrics import metrics
+from services.prediction_cache import report_digest
+from services.text_preview import decode_text
+
+TEXT_TYPES = {"pdf", "txt"}
+PAGE_SEPARATOR = "\f"
+
+_SPACES = re.compile(r"[ \t\r\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+@dataclass(frozen=True)
+class ExtractedText:
+    """Text pulled from a PDF text layer or TXT report, compacted for upload"""
+    text: str
+    filename: str
+    original_bytes: int
+    pages: int
+    scanned: bool
+    elapsed: float
+    error: Optional[str] = None
+
+    @property
+    def usable(self) -> bool:
+        """Whether the text can replace the original file (every page has a text layer)"""
+        return self.error is None and not self.scanned and bool(self.text)
+
+    @property
+    def data(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    @property
+    def reduction(self) -> float:
+        """How many times smaller the text is than the original file"""
+        return self.original_bytes / max(len(self.data), 1)
+
+
+def report_kind(medical_file: Any) -> str:
+    name = getattr(medical_file, 'name', '') or ''
+    return name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+
+
+def is_text_report(medical_file: Any) -> bool:
+    return report_kind(medical_file) in TEXT_TYPES
+
+
+def compact_text(text: str) -> str:
+    """Collapse runs of spaces and blank lines; the backend only needs the words and line structure"""
+    lines = (_SPACES.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n", "\n".join(lines)).strip()
+
+
+def _extract_page(data: bytes, page_number: int) -> str:
+    from pypdf import PdfReader  # optional dependency, loaded on the first PDF
+
+    # Readers are not thread-safe, so every page task parses its own (only the xref is read up front)
+    return PdfReader(io.BytesIO(data)).pages[page_number].extract_text() or ""
+
+
+def _page_count(data: bytes) -> int:
+    from pypdf import PdfReader
+
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+class TextExtractor:
+    """Extracts report text on a worker pool and memoizes it by report digest.
+
+    PDFs are split into one task per page, each bounded by ``page_timeout``.
+    A page that times out, fails, or carries less than ``min_page_chars`` of
+    text counts as scanned; the remaining pages are cancelled and the whole
+    report is sent as-is for OCR.
+    """
+
+    def __init__(self, max_workers: int = Config.TEXT_EXTRACTION_WORKERS,
+                 page_timeout: float = Config.TEXT_EXTRACTION_PAGE_TIMEOUT,
+                 min_page_chars: int = Config.TEXT_EXTRACTION_MIN_PAGE_CHARS,
+                 max_entries: int = Config.TEXT_EXTRACTION_CACHE_SIZE):
+        self.page_timeout = page_timeout
+        self.min_page_chars = min_page_chars
+        self.max_entries = max_entries
+        # Documents and pages get separate pools so a document task never waits on its own pages
+        self._documents = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="text-extractor")
+        self._pages = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-page")
+        self._results: "OrderedDict[str, Future]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, medical_file: Any, digest: Optional[str] = None) -> Future:
+        """Start extracting a PDF/TXT report off the calling thread"""
+        digest = digest or report_digest(medical_file)
+        with self._lock:
+            future = self._results.get(digest)
+            if future is None:
+                # getvalue() shares the upload's bytes instead of racing on its file position
+                data = medical_file.getvalue()
+                if isinstance(data, str):
+                    # Manual input is saved as a StringIO; the report is sent as UTF-8
+                    data = data.encode('utf-8')
+                future = self._documents.submit(
+                    self.extract, data, getattr(medical_file, 'name', 'report.pdf')
+                )
+                self._results[digest] = future
+            self._results.move_to_end(digest)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        return future
+
+    def get(self, medical_file: Any, timeout: Optional[float] = None) -> Optional[ExtractedText]:
+        """Extracted text for a report; None if not ready within ``timeout``"""
+        try:
+            return self.submit(medical_file).result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+
+    @metrics.timed("text_extraction_seconds")
+    def extract(self, data: bytes, filename: str) -> ExtractedText:
+        started = time.perf_counter()
+        stem = os.path.splitext(filename)[0]
+        try:
+            if filename.lower().endswith(".pdf"):
+                text, pages, scanned = self._extract_pdf(data)
+            else:
+                # Decoded as the preview is: BOM, else UTF-8, else cp1252
+                text, pages, scanned = compact_text(decode_text(data)[0]), 1, False
+            error = None
+        except ImportError:
+            text, pages, scanned, error = "", 0, False, "PDF text extraction requires the 'pypdf' package"
+        except Exception as e:
+            text, pages, scanned, error = "", 0, False, f"Could not read the document: {str(e)}"
+        return ExtractedText(
+            text=text,
+            filename=f"{stem}.txt",
+            original_bytes=len(data),
+            pages=pages,
+            scanned=scanned,
+            elapsed=time.perf_counter() - started,
+            error=error
+        )
+
+    def _extract_pdf(self, data: bytes):
+        futures = [self._pages.submit(_extract_page, data, number) for number in range(_page_count(data))]
+        texts: List[str] = []
+        for future in futures:
+            try:
+                page = compact_text(future.result(timeout=self.page_timeout))
+            except FutureTimeoutError:
+                page = ""  # the worker can't be interrupted, but nobody waits for it any longer
+            except Exception:
+                page = ""
+            if len(page.replace(" ", "")) < self.min_page_chars:
+                # One page without a text layer means the backend has to OCR the original anyway
+                for pending in futures:
+                    pending.cancel()
+                return "", len(futures), True
+            texts.append(page)
+        return PAGE_SEPARATOR.join(texts), len(futures), False
+
+
+@st.cache_resource
+def get_text_extractor() -> TextExtractor:
+    """Get the text extractor shared by every session in this process"""
+    return TextExtractor()
@@ -0,0 +1,108 @@
+import codecs
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+from config import Config
+from services.metrics import metrics
+
+# UTF-8 continuation bytes (0b10xxxxxx) never start a character
+_UTF8_CONTINUATION = bytes(range(0x80, 0xC0))
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32-le", 4),
+    (codecs.BOM_UTF32_BE, "utf-32-be", 4),
+    (codecs.BOM_UTF8, "utf-8", 1),
+    (codecs.BOM_UTF16_LE, "utf-16-le", 2),
+    (codecs.BOM_UTF16_BE, "utf-16-be", 2),
+]
+
+FALLBACK_ENCODING = "cp1252"
+
+
+@dataclass(frozen=True)
+class TextPreview:
+    """Leading characters of a text report plus its (estimated) length"""
+    text: str
+    total_chars: int
+    encoding: str
+    truncated: bool
+
+
+def detect_bom(head: bytes) -> Tuple[str, int, int]:
+    """Encoding, BOM length and bytes-per-unit from a byte-order mark"""
+    for bom, encoding, unit in _BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom), unit
+    return "utf-8", 0, 1
+
+
+def _decode_prefix(view: memoryview, encoding: str, max_chars: int, chunk_size: int) -> Tuple[str, int]:
+    """Incrementally decode until ``max_chars`` characters are available"""
+    decoder = codecs.getincrementaldecoder(encoding)(errors="strict" if encoding == "utf-8" else "replace")
+    parts = []
+    decoded = 0
+    offset = 0
+    while decoded < max_chars and offset < len(view):
+        chunk = decoder.decode(bytes(view[offset:offset + chunk_size]), final=offset + chunk_size >= len(view))
+        offset += chunk_size
+        parts.append(chunk)
+        decoded += len(chunk)
+    return "".join(parts)[:max_chars], min(offset, len(view))
+
+
+def _count_chars(view: memoryview, encoding: str, unit: int, chunk_size: int) -> int:
+    """Character count without decoding: exact for valid UTF-8 and single-byte text"""
+    if encoding == "utf-8":
+        continuation = 0
+        for offset in range(0, len(view), chunk_size):
+            chunk = bytes(view[offset:offset + chunk_size])
+            continuation += len(chunk) - len(chunk.translate(None, _UTF8_CONTINUATION))
+        return len(view) - continuation
+    return len(view) // unit
+
+
+def decode_text(buffer: Any, max_chars: Optional[int] = None,
+                chunk_size: int = Config.TEXT_PREVIEW_CHUNK_SIZE) -> Tuple[str, str, int]:
+    """Decode a text report, or only its first ``max_chars`` characters.
+
+    The encoding is taken from a BOM, else UTF-8 is tried on the bytes being
+    decoded and cp1252 is the fallback if they are not valid UTF-8. Returns
+    the text, the encoding and how many bytes after the BOM were consumed.
+    """
+    with memoryview(buffer).cast("B") as view:
+        encoding, bom_length, _ = detect_bom(bytes(view[:4]))
+        with view[bom_length:] as body:
+            limit = len(body) + 1 if max_chars is None else max_chars
+            try:
+                text, consumed = _decode_prefix(body, encoding, limit, chunk_size)
+            except UnicodeDecodeError:
+                encoding = FALLBACK_ENCODING
+                text, consumed = _decode_prefix(body, encoding, limit, chunk_size)
+    return text, encoding, consumed
+
+
+@metrics.timed("preview_build_seconds", kind="text")
+def build_text_preview(buffer: Any, max_chars: int = Config.TEXT_PREVIEW_CHARS,
+                       chunk_size: int = Config.TEXT_PREVIEW_CHUNK_SIZE) -> TextPreview:
+    """Preview a text report by decoding only the bytes the preview needs.
+
+    Decoding follows ``decode_text``, applied to the leading chunks only.
+    The total character count is derived from byte counts in fixed-size
+    chunks, so memory stays bounded whatever the file size.
+    """
+    text, encoding, consumed = decode_text(buffer, max_chars, chunk_size)
+    with memoryview(buffer).cast("B") as view:
+        _, bom_length, unit = detect_bom(bytes(view[:4]))
+        with view[bom_length:] as body:
+            if consumed >= len(body):
+                # The preview already covers the whole file
+                total_chars = len(_decode_prefix(body, encoding, len(body) + 1, chunk_size)[0])
+            else:
+                total_chars = _count_chars(body, encoding, unit, chunk_size)
+
+    return TextPreview(
+        text=text,
+        total_chars=total_chars,
+        encoding=encoding,
+        truncated=total_chars > len(text)
+    )